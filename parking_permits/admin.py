@@ -89,18 +89,27 @@ class ParkingPermitAdmin(admin.ModelAdmin):
     )
     list_select_related = ("customer", "vehicle", "parking_zone")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("parking_zone__location")
+
 
 @admin.register(ParkingZone)
 class ParkingZoneAdmin(admin.OSMGeoAdmin):
     list_display = ("id", "name", "description", "description_sv")
     ordering = ("name",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_geometry()
+
 
 @admin.register(Price)
 class PriceAdmin(admin.ModelAdmin):
     list_display = ("id", "zone", "price", "year", "type")
     list_select_related = ("zone",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("zone__location")
+
 
 @admin.register(Vehicle)
 class VehicleAdmin(admin.ModelAdmin):
@@ -144,6 +153,9 @@ class ProductAdmin(admin.ModelAdmin):
     list_select_related = ("zone",)
     readonly_fields = ("talpa_product_id",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("zone__location")
+
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
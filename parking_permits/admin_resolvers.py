@@ -17,16 +17,22 @@ from django.utils.translation import gettext_lazy as _
 from parking_permits.models import (
     Address,
     Customer,
+    JobRun,
     Order,
     ParkingPermit,
     ParkingZone,
+    PermitEvent,
+    PermitStatistics,
     Product,
     Refund,
+    RefundStatistics,
+    RevenueStatistics,
     Vehicle,
 )
 
 from .decorators import is_ad_admin
 from .exceptions import (
+    InvalidCursor,
     ObjectNotFound,
     ParkingZoneError,
     PermitLimitExceeded,
@@ -35,6 +41,7 @@ from .exceptions import (
 )
 from .models.order import OrderStatus
 from .models.parking_permit import ContractType
+from .models.permit_event import PermitEventType
 from .paginator import QuerySetPaginator
 from .reversion import EventType, get_obj_changelogs, get_reversion_comment
 from .services.dvv import get_person_info
@@ -46,14 +53,23 @@ logger = logging.getLogger("db")
 query = QueryType()
 mutation = MutationType()
 PermitDetail = ObjectType("PermitDetailNode")
-schema_bindables = [query, mutation, PermitDetail, snake_case_fallback_resolvers]
+product_node = ObjectType("ProductNode")
+schema_bindables = [
+    query,
+    mutation,
+    PermitDetail,
+    product_node,
+    snake_case_fallback_resolvers,
+]
 
 
 @query.field("permits")
 @is_ad_admin
 @convert_kwargs_to_snake_case
 def resolve_permits(obj, info, page_input, order_by=None, search_items=None):
-    permits = ParkingPermit.objects.all()
+    permits = ParkingPermit.objects.select_related(
+        "customer", "vehicle", "parking_zone"
+    ).defer("parking_zone__location")
     if order_by:
         permits = apply_ordering(permits, order_by)
     if search_items:
@@ -97,6 +113,43 @@ def resolve_zone_by_location(obj, info, location):
         raise ParkingZoneError(_("Multiple parking zones found for the location"))
 
 
+@query.field("zonesByLocations")
+@is_ad_admin
+@convert_kwargs_to_snake_case
+def resolve_zones_by_locations(obj, info, locations):
+    # the schema allows any number of coordinates, so the invalid
+    # locations are reported instead of failing the whole batch
+    valid_locations = [
+        tuple(location)
+        for location in locations
+        if location is not None and len(location) == 2 and None not in location
+    ]
+    zones_by_location = iter(ParkingZone.objects.get_for_locations(valid_locations))
+    results = []
+    for location in locations:
+        if location is None or len(location) != 2 or None in location:
+            zones = []
+            error = _("The location must have exactly two coordinates")
+        else:
+            zones = next(zones_by_location)
+            if len(zones) == 0:
+                error = _("No parking zone found for the location")
+            elif len(zones) > 1:
+                error = _("Multiple parking zones found for the location")
+            else:
+                error = None
+        results.append(
+            {
+                "location": location,
+                "zone": zones[0] if len(zones) == 1 else None,
+                "zones": zones,
+                "match_count": len(zones),
+                "error": error,
+            }
+        )
+    return results
+
+
 @query.field("customer")
 @is_ad_admin
 @convert_kwargs_to_snake_case
@@ -111,6 +164,16 @@ def resolve_customer(obj, info, national_id_number):
     return customer
 
 
+@mutation.field("prefetchCustomer")
+@is_ad_admin
+@convert_kwargs_to_snake_case
+def resolve_prefetch_customer(obj, info, national_id_number):
+    """Warm up the DVV and address caches before the customer is queried"""
+    if not Customer.objects.filter(national_id_number=national_id_number).exists():
+        get_person_info(national_id_number)
+    return {"success": True}
+
+
 @query.field("vehicle")
 @is_ad_admin
 @convert_kwargs_to_snake_case
@@ -234,6 +297,8 @@ def resolve_create_resident_permit(obj, info, permit):
     # when creating from Admin UI, it's considered the payment is completed
     # and the order status should be confirmed
     Order.objects.create_for_permits([parking_permit], status=OrderStatus.CONFIRMED)
+    PermitEvent.objects.record(PermitEventType.CREATED, parking_permit)
+    PermitEvent.objects.record(PermitEventType.PAID, parking_permit)
     return {"success": True, "permit": parking_permit}
 
 
@@ -287,6 +352,10 @@ def resolve_update_resident_permit(obj, info, permit_id, permit_info, iban=None)
 
     customer = update_or_create_customer(customer_info)
     vehicle = update_or_create_vehicle(vehicle_info)
+    if permit.parking_zone_id != parking_zone.id:
+        PermitEvent.objects.record(PermitEventType.ZONE_CHANGED, permit)
+    if permit.vehicle_id != vehicle.id:
+        PermitEvent.objects.record(PermitEventType.VEHICLE_CHANGED, permit)
     with reversion.create_revision():
         permit.status = permit_info["status"]
         permit.parking_zone = parking_zone
@@ -344,6 +413,7 @@ def resolve_end_permit(obj, info, permit_id, end_type, iban=None):
         pass
     with reversion.create_revision():
         permit.end_permit(end_type)
+        PermitEvent.objects.record(PermitEventType.ENDED, permit)
         reversion.set_user(request.user)
         comment = get_reversion_comment(EventType.CHANGED, permit)
         reversion.set_comment(comment)
@@ -367,6 +437,11 @@ def resolve_products(obj, info, page_input, order_by=None, search_items=None):
     }
 
 
+@product_node.field("zone")
+def resolve_product_zone(product, info):
+    return ParkingZone.objects.get_record(product.zone_id).name
+
+
 @query.field("product")
 @is_ad_admin
 @convert_kwargs_to_snake_case
@@ -427,6 +502,52 @@ def resolve_create_product(obj, info, product):
     return {"success": True}
 
 
+@mutation.field("registerTalpaProducts")
+@is_ad_admin
+def resolve_register_talpa_products(obj, info):
+    results = Product.objects.register_talpa_products()
+    return {
+        "success": all(error is None for product, error in results),
+        "results": [
+            {
+                "product_id": product.id,
+                "name": product.name,
+                "talpa_product_id": product.talpa_product_id,
+                "error": error,
+            }
+            for product, error in results
+        ],
+    }
+
+
+@query.field("permitEvents")
+@is_ad_admin
+def resolve_permit_events(obj, info, after=None, limit=None):
+    try:
+        cursor = int(after or 0)
+    except ValueError:
+        raise InvalidCursor(_("Invalid permit event cursor"))
+    events = PermitEvent.objects.read(after=cursor, limit=limit)
+    return {
+        "events": events,
+        "cursor": events[-1].id if events else after,
+    }
+
+
+@query.field("jobRuns")
+@is_ad_admin
+@convert_kwargs_to_snake_case
+def resolve_job_runs(obj, info, page_input, job_name=None):
+    runs = JobRun.objects.all().order_by("-started_at")
+    if job_name:
+        runs = runs.filter(job_name=job_name)
+    paginator = QuerySetPaginator(runs, page_input)
+    return {
+        "page_info": paginator.page_info,
+        "objects": paginator.object_list,
+    }
+
+
 @query.field("refunds")
 @is_ad_admin
 @convert_kwargs_to_snake_case
@@ -484,3 +605,14 @@ def resolve_orders(obj, info, page_input, order_by=None, search_items=None):
         "page_info": paginator.page_info,
         "objects": paginator.object_list,
     }
+
+
+@query.field("statistics")
+@is_ad_admin
+@convert_kwargs_to_snake_case
+def resolve_statistics(obj, info):
+    return {
+        "permits": PermitStatistics.objects.all(),
+        "revenue": RevenueStatistics.objects.all(),
+        "refunds": RefundStatistics.objects.all(),
+    }
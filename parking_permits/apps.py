@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ParkingPermitsAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "parking_permits"
+
+    def ready(self):
+        from . import signals  # noqa: F401
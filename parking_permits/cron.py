@@ -1,28 +1,137 @@
 import logging
+import uuid
 
+import reversion
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
-from parking_permits.models import Customer, ParkingPermit
+from parking_permits.customer_data import remove_obsolete_customers_data
+from parking_permits.models import (
+    JobRun,
+    OutboxEvent,
+    ParkingPermit,
+    ParkkihubiSyncState,
+    PermitEvent,
+    PermitMonthlyPrice,
+    PermitStatistics,
+    RefundStatistics,
+    RevenueStatistics,
+)
+from parking_permits.models.outbox import OutboxEventType
 from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.models.permit_event import PermitEventType
+from parking_permits.reversion import SEPARATOR, EventType, FieldChangeResolver
 
 logger = logging.getLogger("db")
 
+EXPIRATION_CHUNK_SIZE = 500
 
-def automatic_expiration_of_permits():
-    ParkingPermit.objects.filter(
-        end_time__lt=timezone.now(), status=ParkingPermitStatus.VALID
-    ).update(status=ParkingPermitStatus.CLOSED)
 
+def automatic_expiration_of_permits(chunk_size=EXPIRATION_CHUNK_SIZE):
+    """Close the valid permits whose end time has passed
 
-def automatic_remove_obsolete_customer_data():
+    The permits are closed in chunks locked with SKIP LOCKED. Each chunk
+    gets a single revision for its history and queues the Parkkihubi
+    updates in the same transaction.
+
+    Returns:
+        The ids of the closed permits.
+    """
+    now = timezone.now()
+    expired_permits = ParkingPermit.objects.filter(
+        status=ParkingPermitStatus.VALID, end_time__lt=now
+    ).order_by("end_time")
+    status_change = FieldChangeResolver(
+        ParkingPermit._meta.get_field("status"),
+        ParkingPermitStatus.VALID,
+        ParkingPermitStatus.CLOSED,
+    ).change_message
+    closed_ids = []
+    while True:
+        with transaction.atomic(), reversion.create_revision():
+            permits = list(
+                expired_permits.select_for_update(skip_locked=True)[:chunk_size]
+            )
+            if not permits:
+                break
+            permit_ids = [permit.id for permit in permits]
+            ParkingPermit.objects.filter(id__in=permit_ids).update(
+                status=ParkingPermitStatus.CLOSED, modified_at=now
+            )
+            for permit in permits:
+                permit.status = ParkingPermitStatus.CLOSED
+                permit.modified_at = now
+                reversion.add_to_revision(permit)
+            reversion.set_comment(f"{EventType.CHANGED}{SEPARATOR}{status_change}")
+            OutboxEvent.objects.enqueue_many(
+                OutboxEventType.PARKKIHUBI_UPDATE_PERMIT, permit_ids
+            )
+            PermitEvent.objects.record_many(PermitEventType.EXPIRED, permit_ids)
+        closed_ids += permit_ids
+
+    if closed_ids:
+        logger.info(f"{len(closed_ids)} expired permits are closed.")
+    return closed_ids
+
+
+def automatic_remove_obsolete_customer_data(run=None):
     logger.info("Automatically removing obsolte customer data started...")
-    qs = Customer.objects.all()
-    count = 0
-    for customer in qs:
-        if customer.can_be_deleted:
-            customer.delete_all_data()
-            count += 1
+    if run:
+        # the cursor is the id of the last removed customer
+        after = uuid.UUID(run.cursor) if run.cursor else None
+        count = remove_obsolete_customers_data(after=after, checkpoint=run.checkpoint)
+    else:
+        count = remove_obsolete_customers_data()
     logger.info(
         "Automatically removing obsolte customer data completed. "
         f"{count} customers are removed."
     )
+    return count
+
+
+def refresh_statistics():
+    logger.info("Refreshing admin statistics...")
+    for model in (PermitStatistics, RevenueStatistics, RefundStatistics):
+        model.objects.refresh()
+    logger.info("Refreshing admin statistics completed.")
+
+
+def prebill_open_ended_permits():
+    logger.info("Prebilling open-ended permits for next month...")
+    next_month = timezone.localdate().replace(day=1) + relativedelta(months=1)
+    report = PermitMonthlyPrice.objects.prebill(next_month)
+    for zone_name, error in report["catalog_errors"].items():
+        logger.error(f"Prebilling catalog error in zone {zone_name}: {error}")
+    logger.info("Prebilling open-ended permits completed.")
+    return report["priced"]
+
+
+def deliver_outbox_events():
+    delivered, failed = OutboxEvent.objects.deliver()
+    if delivered or failed:
+        logger.info(f"Delivered {delivered} outbox events, {failed} deliveries failed.")
+    return delivered
+
+
+def reconcile_parkkihubi_permits():
+    logger.info("Reconciling permits with Parkkihubi...")
+    report = ParkkihubiSyncState.objects.reconcile()
+    logger.info(
+        "Reconciling permits with Parkkihubi completed. "
+        f"{report['pushed']} permits pushed, {report['failed']} pushes failed."
+    )
+    return report["pushed"]
+
+
+def prune_permit_events():
+    older_than = timezone.now() - relativedelta(
+        days=settings.PERMIT_EVENT_RETENTION_DAYS
+    )
+    return PermitEvent.objects.prune(older_than)
+
+
+def prune_job_runs():
+    older_than = timezone.now() - relativedelta(days=settings.JOB_RUN_RETENTION_DAYS)
+    return JobRun.objects.prune(older_than)
@@ -0,0 +1,194 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from reversion.models import Version
+
+from .models import (
+    Address,
+    Company,
+    Customer,
+    DrivingLicence,
+    Order,
+    OrderItem,
+    OutboxEvent,
+    ParkingPermit,
+    ParkkihubiSyncState,
+    PermitMonthlyPrice,
+    Refund,
+    TalpaOrderEvent,
+    Vehicle,
+)
+
+logger = logging.getLogger("db")
+
+REMOVAL_CHUNK_SIZE = 500
+
+
+def get_deletion_plan(customer_ids):
+    """Return the querysets of all the data of the customers
+
+    The querysets are in dependency order, so deleting them one after the
+    other never hits a protected reference. The permit history is included,
+    as the versions contain the personal data of the permits, and so are
+    the addresses of the customers and their permits that no one else
+    refers to. The permit events and the vehicles are kept, the national
+    ids are removed from the vehicle users with remove_vehicle_users.
+    """
+    permits = ParkingPermit.objects.filter(customer_id__in=customer_ids)
+    orders = Order.objects.filter(customer_id__in=customer_ids)
+    permit_ids = [str(pk) for pk in permits.values_list("id", flat=True)]
+    customers = Customer.objects.filter(id__in=customer_ids)
+    user_ids = list(customers.exclude(user=None).values_list("user_id", flat=True))
+    address_ids = {
+        address_id
+        for address_ids in customers.values_list("primary_address", "other_address")
+        for address_id in address_ids
+        if address_id is not None
+    }
+    address_ids.update(permits.exclude(address=None).values_list("address", flat=True))
+    return [
+        OrderItem.objects.filter(Q(order__in=orders) | Q(permit__in=permits)),
+        Refund.objects.filter(order__in=orders),
+        OutboxEvent.objects.filter(permit__in=permits),
+        ParkkihubiSyncState.objects.filter(permit__in=permits),
+        PermitMonthlyPrice.objects.filter(permit__in=permits),
+        Version.objects.get_for_model(ParkingPermit).filter(object_id__in=permit_ids),
+        permits,
+        TalpaOrderEvent.objects.filter(
+            talpa_order_id__in=orders.exclude(talpa_order_id=None).values(
+                "talpa_order_id"
+            )
+        ),
+        orders,
+        DrivingLicence.driving_classes.through.objects.filter(
+            drivinglicence__customer_id__in=customer_ids
+        ),
+        DrivingLicence.objects.filter(customer_id__in=customer_ids),
+        customers,
+        get_unshared_addresses(address_ids, customer_ids),
+        get_user_model().objects.filter(id__in=user_ids),
+    ]
+
+
+def get_unshared_addresses(address_ids, customer_ids):
+    """Return the addresses not referred to by other customers or permits"""
+    other_customers = Customer.objects.filter(
+        Q(primary_address=OuterRef("pk")) | Q(other_address=OuterRef("pk"))
+    ).exclude(id__in=customer_ids)
+    other_permits = ParkingPermit.objects.filter(address=OuterRef("pk")).exclude(
+        customer_id__in=customer_ids
+    )
+    companies = Company.objects.filter(address=OuterRef("pk"))
+    return (
+        Address.objects.filter(id__in=address_ids)
+        .exclude(Exists(other_customers))
+        .exclude(Exists(other_permits))
+        .exclude(Exists(companies))
+    )
+
+
+def remove_vehicle_users(customer_ids):
+    """Remove the national ids of the customers from the vehicle users
+
+    Returns:
+        The number of updated vehicles.
+    """
+    national_ids = list(
+        Customer.objects.filter(id__in=customer_ids)
+        .exclude(national_id_number="")
+        .values_list("national_id_number", flat=True)
+    )
+    if not national_ids:
+        return 0
+    return Vehicle.objects.filter(users__overlap=national_ids).update(
+        users=RawSQL(
+            "ARRAY(SELECT u FROM unnest(users) u WHERE u <> ALL(%s))",
+            [national_ids],
+        )
+    )
+
+
+def add_counts(counts, more_counts):
+    for label, count in more_counts.items():
+        counts[label] = counts.get(label, 0) + count
+    return counts
+
+
+def count_customers_data(customer_ids):
+    """Return the number of rows of the customers data by model label"""
+    return {qs.model._meta.label: qs.count() for qs in get_deletion_plan(customer_ids)}
+
+
+def remove_customers_data(customer_ids):
+    """Remove the customers and their data with bulk deletes
+
+    The national ids are removed from the vehicle users first, then the
+    querysets of the deletion plan are deleted in order. The caller is
+    responsible for the transaction.
+
+    Returns:
+        The number of deleted rows by model label.
+    """
+    remove_vehicle_users(customer_ids)
+    deleted = {}
+    for qs in get_deletion_plan(customer_ids):
+        _, deleted_by_model = qs.delete()
+        add_counts(deleted, deleted_by_model)
+    return deleted
+
+
+def remove_obsolete_customers_data(
+    chunk_size=REMOVAL_CHUNK_SIZE, dry_run=False, after=None, checkpoint=None
+):
+    """Remove the data of the customers that can be deleted
+
+    The candidates are selected with a single query and removed in id
+    order in chunks, each in its own transaction. The deletability is
+    checked again for each chunk, as the customers may have changed
+    meanwhile.
+
+    Args:
+        dry_run: Only count the rows that would be removed.
+        after: Only the customers with a greater id are removed, e.g. to
+            resume an interrupted removal.
+        checkpoint: Called with the last id of each removed chunk and the
+            number of customers removed in it.
+
+    Returns:
+        The number of removed customers, or on a dry run the number of
+        rows that would be removed by model label.
+    """
+    customers = Customer.objects.deletable()
+    if after is not None:
+        customers = customers.filter(id__gt=after)
+    candidate_ids = list(customers.order_by("id").values_list("id", flat=True))
+    logger.info(f"Found {len(candidate_ids)} customers to remove")
+
+    if dry_run:
+        counts = {}
+        for index in range(0, len(candidate_ids), chunk_size):
+            chunk_ids = candidate_ids[index : index + chunk_size]
+            add_counts(counts, count_customers_data(chunk_ids))
+        return counts
+
+    removed = 0
+    deleted = {}
+    for index in range(0, len(candidate_ids), chunk_size):
+        chunk_ids = candidate_ids[index : index + chunk_size]
+        with transaction.atomic():
+            customer_ids = list(
+                Customer.objects.deletable()
+                .filter(id__in=chunk_ids)
+                .values_list("id", flat=True)
+            )
+            add_counts(deleted, remove_customers_data(customer_ids))
+        removed += len(customer_ids)
+        logger.info(f"Removed {removed}/{len(candidate_ids)} customers")
+        if checkpoint:
+            checkpoint(chunk_ids[-1], len(customer_ids))
+    if deleted:
+        logger.info(f"Removed customer data rows: {deleted}")
+    return removed
@@ -4,6 +4,7 @@ import reversion
 from dateutil.parser import isoparse, parse
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from django.utils import timezone as tz
 
 from .constants import LOW_EMISSION_DISCOUNT, SECONDARY_VEHICLE_PRICE_INCREASE
@@ -17,12 +18,23 @@ from .exceptions import (
     RefundError,
     TraficomFetchVehicleError,
 )
-from .models import Customer, OrderItem, ParkingPermit, ParkingZone, Refund, Vehicle
+from .models import (
+    Customer,
+    OrderItem,
+    OutboxEvent,
+    ParkingPermit,
+    ParkingZone,
+    PermitEvent,
+    Refund,
+    Vehicle,
+)
+from .models.outbox import OutboxEventType
 from .models.parking_permit import (
     ContractType,
     ParkingPermitStartType,
     ParkingPermitStatus,
 )
+from .models.permit_event import PermitEventType
 from .reversion import EventType, get_reversion_comment
 from .utils import diff_months_floor, get_end_time
 
@@ -117,6 +129,7 @@ class CustomerPermit:
                     end_time=end_time,
                     vehicle=Vehicle.objects.get(registration_number=registration),
                 )
+                PermitEvent.objects.record(PermitEventType.CREATED, permit)
                 comment = get_reversion_comment(EventType.CREATED, permit)
                 reversion.set_user(self.customer.user)
                 reversion.set_comment(comment)
@@ -223,7 +236,10 @@ class CustomerPermit:
             with reversion.create_revision():
                 permit = ParkingPermit.objects.get(id=permit_id)
                 permit.end_permit(end_type)
-                permit.update_parkkihubi_permit()
+                OutboxEvent.objects.enqueue(
+                    OutboxEventType.PARKKIHUBI_UPDATE_PERMIT, permit
+                )
+                PermitEvent.objects.record(PermitEventType.ENDED, permit)
                 if permit.can_be_refunded:
                     if not iban:
                         raise RefundError("IBAN is not provided")
@@ -251,13 +267,19 @@ class CustomerPermit:
 
     def _update_permit(self, permit, data):
         keys = data.keys()
+        zone_changed = "parking_zone_id" in keys and str(permit.parking_zone_id) != str(
+            data["parking_zone_id"]
+        )
         for key in keys:
             if isinstance(data[key], str) and key in ["start_time", "end_time"]:
                 val = isoparse(data[key])
             else:
                 val = data[key]
             setattr(permit, key, val)
-        permit.save(update_fields=keys)
+        with transaction.atomic():
+            permit.save(update_fields=keys)
+            if zone_changed:
+                PermitEvent.objects.record(PermitEventType.ZONE_CHANGED, permit)
         return permit
 
     def _calculate_prices(self, permit, product_with_qty):
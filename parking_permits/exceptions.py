@@ -66,6 +66,10 @@ class ParkkihubiPermitError(ParkingPermitBaseException):
     pass
 
 
+class ParkkihubiPermitNotFound(ParkkihubiPermitError):
+    pass
+
+
 class AddressError(ParkingPermitBaseException):
     pass
 
@@ -76,3 +80,11 @@ class TraficomFetchVehicleError(ParkingPermitBaseException):
 
 class DVVIntegrationError(ParkingPermitBaseException):
     pass
+
+
+class IntegrationUnavailable(ParkingPermitBaseException):
+    pass
+
+
+class InvalidCursor(ParkingPermitBaseException):
+    pass
@@ -1,8 +1,12 @@
+import hashlib
+import json
 import logging
 
 from django.db import transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
 
-from parking_permits.models import ParkingZone
+from parking_permits.models import Address, ParkingZone
 
 from .wfs_importer import WfsImporter
 
@@ -27,6 +31,12 @@ PARKING_ZONE_DESCRIPTION_SV = {
 }
 
 
+def get_source_hash(*values):
+    """Return a hash of the imported values to detect changed zones"""
+    data = json.dumps(values, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
 class ParkingZoneImporter(WfsImporter):
     """
     Imports parking zones data from kartta.hel.fi.
@@ -34,23 +44,106 @@ class ParkingZoneImporter(WfsImporter):
 
     wfs_typename = "Asukas_ja_yrityspysakointivyohykkeet_alue"
 
+    # zones written with a single statement, kept small as the
+    # geometries are big
+    batch_size = 50
+    updated_fields = [
+        "description",
+        "description_sv",
+        "location",
+        "source_hash",
+        "bbox",
+        "simplified_location",
+        "modified_at",
+    ]
+
     def import_parking_zones(self):
+        """Import the zones, writing only the ones that have changed
+
+        When any zone boundary has changed, the zones of the addresses are
+        recomputed.
+
+        Returns:
+            A summary with the number of created, updated, unchanged and
+            deleted zones, the names of the removed zones that are still
+            referenced and were kept, and the number of addresses whose
+            zone changed.
+        """
         parking_zone_dicts = self.download_and_parse()
-        count = self._save_parking_zones(parking_zone_dicts)
-        logger.info("Created or updated {} parking zones".format(count))
+        summary = self._save_parking_zones(parking_zone_dicts)
+        ParkingZone.objects.clear_records()
+        summary["addresses"] = 0
+        if summary["created"] or summary["updated"] or summary["deleted"]:
+            summary["addresses"] = Address.objects.assign_zones()
+        logger.info(
+            "Parking zones: {created} created, {updated} updated, "
+            "{unchanged} unchanged, {deleted} deleted, "
+            "{addresses} address zones changed".format(**summary)
+        )
+        if summary["kept"]:
+            logger.warning(
+                "Parking zones missing from the source but still in use: "
+                f"{', '.join(summary['kept'])}"
+            )
+        return summary
 
     @transaction.atomic
     def _save_parking_zones(self, parking_zone_dicts):
         logger.info("Saving parking zones.")
-        count = 0
-        parking_zone_ids = []
-        for parking_zone in parking_zone_dicts:
-            parking_zone, _ = ParkingZone.objects.update_or_create(
-                name=parking_zone["name"], defaults=parking_zone
+        existing_zones = {
+            name: (pk, source_hash)
+            for name, pk, source_hash in ParkingZone.objects.values_list(
+                "name", "id", "source_hash"
             )
-            parking_zone_ids.append(parking_zone.pk)
-            count += 1
-        ParkingZone.objects.exclude(pk__in=parking_zone_ids).delete()
+        }
+        summary = {"created": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        to_create = []
+        to_update = []
+        seen_names = set()
+        for parking_zone in parking_zone_dicts:
+            name = parking_zone["name"]
+            seen_names.add(name)
+            if name not in existing_zones:
+                to_create.append(ParkingZone(**parking_zone))
+            elif existing_zones[name][1] != parking_zone["source_hash"]:
+                pk = existing_zones[name][0]
+                to_update.append(ParkingZone(id=pk, **parking_zone))
+            else:
+                summary["unchanged"] += 1
+            if len(to_create) >= self.batch_size:
+                summary["created"] += self._create_zones(to_create)
+            if len(to_update) >= self.batch_size:
+                summary["updated"] += self._update_zones(to_update)
+        summary["created"] += self._create_zones(to_create)
+        summary["updated"] += self._update_zones(to_update)
+
+        summary["kept"] = []
+        for name in sorted(existing_zones.keys() - seen_names):
+            try:
+                with transaction.atomic():
+                    ParkingZone.objects.filter(name=name).delete()
+            except ProtectedError:
+                summary["kept"].append(name)
+            else:
+                summary["deleted"] += 1
+        return summary
+
+    def _create_zones(self, zones):
+        for zone in zones:
+            zone.update_lookup_geometries()
+        ParkingZone.objects.bulk_create(zones)
+        count = len(zones)
+        zones.clear()
+        return count
+
+    def _update_zones(self, zones):
+        now = timezone.now()
+        for zone in zones:
+            zone.update_lookup_geometries()
+            zone.modified_at = now
+        ParkingZone.objects.bulk_update(zones, self.updated_fields)
+        count = len(zones)
+        zones.clear()
         return count
 
     def _parse_feature(self, feature):
@@ -64,4 +157,7 @@ class ParkingZoneImporter(WfsImporter):
             "description": description,
             "description_sv": description_sv,
             "location": locations,
+            "source_hash": get_source_hash(
+                description, description_sv, feature["geometry"]
+            ),
         }
@@ -1,15 +1,72 @@
 import abc
+import codecs
+import json
 import logging
 
-import requests
 from django.conf import settings
 from django.contrib.gis.geos import GEOSGeometry
 
+from parking_permits.services.client import get_client
+
 logger = logging.getLogger("db")
 
+WHITESPACE_AND_COMMAS = " \t\r\n,"
+
+
+def iter_json_array_items(chunks, key):
+    """Yield the items of the array under the key of a streamed JSON object
+
+    The chunks are UTF-8 encoded bytes, e.g. from iter_content of a
+    streamed response. Only a single item is held in memory at a time,
+    so the whole document is never loaded. The first occurrence of the
+    key is taken as the array, which holds for the top-level "features"
+    of the WFS feature collections.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    token = f'"{key}"'
+    buffer = ""
+    in_array = False
+    # an incomplete item is not parsed again until the buffer has grown
+    # enough, so that big items are not parsed once per chunk
+    retry_length = 0
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        if not in_array:
+            start = buffer.find(token)
+            bracket = buffer.find("[", start) if start >= 0 else -1
+            if bracket < 0:
+                continue
+            buffer = buffer[bracket + 1 :]
+            in_array = True
+        if len(buffer) < retry_length:
+            continue
+        while True:
+            buffer = buffer.lstrip(WHITESPACE_AND_COMMAS)
+            if buffer.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                retry_length = len(buffer) * 2
+                break
+            yield item
+            buffer = buffer[end:]
+            retry_length = 0
+
+    buffer = buffer.lstrip(WHITESPACE_AND_COMMAS)
+    while in_array and buffer and not buffer.startswith("]"):
+        # the rest of the document arrived in the last chunks
+        item, end = decoder.raw_decode(buffer)
+        yield item
+        buffer = buffer[end:].lstrip(WHITESPACE_AND_COMMAS)
+    if not buffer.startswith("]"):
+        raise ValueError(f"The array {key} is missing or incomplete")
+
 
 class WfsImporter(metaclass=abc.ABCMeta):
     wfs_url = settings.KMO_URL
+    download_chunk_size = 64 * 1024
 
     @property
     @abc.abstractmethod
@@ -30,9 +87,12 @@ class WfsImporter(metaclass=abc.ABCMeta):
             "srsName": "EPSG:4326",
             "TYPENAME": self.wfs_typename,
         }
-        response = requests.get(self.wfs_url, params=params)
-        value = response.json()
-        return value["features"]
+        response = get_client("kmo").get(self.wfs_url, params=params, stream=True)
+        response.raise_for_status()
+        with response:
+            yield from iter_json_array_items(
+                response.iter_content(chunk_size=self.download_chunk_size), "features"
+            )
 
     def _parse_response(self, features):
         logger.info("Parsing Data.")
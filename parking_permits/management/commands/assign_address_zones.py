@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from parking_permits.models import Address
+
+
+class Command(BaseCommand):
+    help = "Recompute the parking zones of all the addresses from their locations."
+
+    def handle(self, *args, **options):
+        count = Address.objects.assign_zones()
+        self.stdout.write(f"Zones of {count} addresses changed.")
@@ -0,0 +1,63 @@
+import time
+
+import orjson
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from parking_permits.models import Order
+from parking_permits.talpa.order import TalpaOrderManager
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure building and serializing the Talpa order payload. Uses the "
+        "given order or the order with the most items."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--order-id", help="Id of the order to use")
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=100,
+            help="Number of times the payload is built",
+        )
+
+    def handle(self, *args, **options):
+        if options["order_id"]:
+            order_id = options["order_id"]
+        else:
+            order_id = (
+                Order.objects.annotate(item_count=Count("order_items"))
+                .order_by("-item_count")
+                .values_list("id", flat=True)
+                .first()
+            )
+        if order_id is None:
+            raise CommandError("No orders found")
+
+        order = Order.objects.select_related("customer").get(id=order_id)
+        item_count = order.order_items.count()
+
+        build_time = serialize_time = 0
+        with CaptureQueriesContext(connection) as queries:
+            TalpaOrderManager._create_order_data(order)
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            data = TalpaOrderManager._create_order_data(order)
+            build_time += time.perf_counter() - start
+            start = time.perf_counter()
+            orjson.dumps(data)
+            serialize_time += time.perf_counter() - start
+
+        repeat = options["repeat"]
+        self.stdout.write(
+            f"Order {order.id}: {item_count} items, "
+            f"{len(queries.captured_queries)} queries per payload"
+        )
+        self.stdout.write(f"Build: {build_time / repeat * 1000:.2f} ms per payload")
+        self.stdout.write(
+            f"Serialize: {serialize_time / repeat * 1000:.3f} ms per payload"
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from parking_permits.models import OutboxEvent
+
+
+class Command(BaseCommand):
+    help = "Deliver the pending outbox events to Parkkihubi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=OutboxEvent.objects.batch_size,
+            help="Number of events delivered in a single batch",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Keep delivering batches until no deliverable events are left",
+        )
+
+    def handle(self, *args, **options):
+        total_delivered = total_failed = 0
+        while True:
+            delivered, failed = OutboxEvent.objects.deliver(options["batch_size"])
+            total_delivered += delivered
+            total_failed += failed
+            if not options["all"] or delivered + failed == 0:
+                break
+        self.stdout.write(
+            f"Delivered {total_delivered} events, {total_failed} deliveries failed."
+        )
@@ -7,4 +7,10 @@ class Command(BaseCommand):
     help = "Uses the ParkingZoneImporter to import parking zones."
 
     def handle(self, *args, **options):
-        ParkingZoneImporter().import_parking_zones()
+        summary = ParkingZoneImporter().import_parking_zones()
+        self.stdout.write(
+            "{created} created, {updated} updated, {unchanged} unchanged, "
+            "{deleted} deleted, {addresses} address zones changed".format(**summary)
+        )
+        for name in summary["kept"]:
+            self.stdout.write(f"Zone {name} is missing from the source but in use")
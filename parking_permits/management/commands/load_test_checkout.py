@@ -0,0 +1,243 @@
+import math
+import random
+import string
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from parking_permits.customer_permit import CustomerPermit
+from parking_permits.models import (
+    Address,
+    Customer,
+    Order,
+    OrderItem,
+    ParkingPermit,
+    ParkingZone,
+    Product,
+    TalpaOrderEvent,
+    Vehicle,
+)
+from parking_permits.models.driving_licence import DrivingLicence
+from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.services.stand_ins import get_owner_id
+from parking_permits.talpa.order import TalpaOrderManager
+
+STEPS = ("create_permit", "create_order", "order_webhook", "resolve_price")
+PERCENTILES = (50, 95, 99)
+
+
+class StepFailed(Exception):
+    def __init__(self, step, error):
+        super().__init__(f"{step}: {error}")
+        self.step = step
+
+
+def percentile(sorted_values, p):
+    """Return the nearest-rank percentile of the sorted values"""
+    index = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the checkout scenario (create permit, create order, order "
+        "webhook, resolve price) for a number of generated customers and "
+        "report the throughput and latency percentiles. Talpa, Parkkihubi "
+        "and Traficom should point to the run_stand_ins servers, both here "
+        "and in the application server at --base-url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--base-url",
+            default="http://localhost:8000",
+            help="Application server receiving the Talpa webhooks",
+        )
+        parser.add_argument("--zone", help="Parking zone name of the customers")
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Do not remove the generated customers and permits",
+        )
+
+    def handle(self, *args, **options):
+        self.base_url = options["base_url"].rstrip("/")
+        self.sessions = threading.local()
+        self.zone = self._get_zone(options["zone"])
+        customers = self._create_customers(options["users"])
+
+        durations = defaultdict(list)
+        errors = defaultdict(list)
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+                futures = [
+                    executor.submit(self._run_scenario, customer, registration)
+                    for customer, registration in customers
+                ]
+                for future in as_completed(futures):
+                    try:
+                        for step, duration in future.result().items():
+                            durations[step].append(duration)
+                    except StepFailed as e:
+                        errors[e.step].append(str(e))
+            elapsed = time.monotonic() - started
+            self._report(len(customers), elapsed, durations, errors)
+        finally:
+            if not options["keep_data"]:
+                self._remove_customers(customers)
+
+    def _get_zone(self, zone_name):
+        today = timezone.localdate()
+        zones = ParkingZone.objects.with_geometry().filter(
+            products__in=Product.objects.for_resident().filter(
+                start_date__lte=today, end_date__gte=today
+            )
+        )
+        if zone_name:
+            zones = zones.filter(name=zone_name)
+        zone = zones.order_by("name").first()
+        if zone is None:
+            raise CommandError("No parking zone with a resident product for today")
+        return zone
+
+    @transaction.atomic
+    def _create_customers(self, count):
+        prefix = "".join(random.choices(string.ascii_uppercase, k=3))
+        location = self.zone.location.point_on_surface
+        addresses = Address.objects.bulk_create(
+            [
+                Address(
+                    street_name="Load test",
+                    street_number=str(index),
+                    city="Helsinki",
+                    location=location,
+                    _zone=self.zone,
+                )
+                for index in range(count)
+            ]
+        )
+        registrations = [f"{prefix}-{index:04d}" for index in range(count)]
+        customers = Customer.objects.bulk_create(
+            [
+                Customer(
+                    first_name="Load",
+                    last_name=f"Test {registration}",
+                    national_id_number=get_owner_id(registration),
+                    email=f"{registration.lower()}@example.com",
+                    primary_address=address,
+                )
+                for registration, address in zip(registrations, addresses)
+            ]
+        )
+        return list(zip(customers, registrations))
+
+    def _get_session(self):
+        if not hasattr(self.sessions, "session"):
+            self.sessions.session = requests.Session()
+        return self.sessions.session
+
+    def _post(self, path, data):
+        response = self._get_session().post(f"{self.base_url}{path}", json=data)
+        if response.status_code != 200:
+            raise Exception(f"{response.status_code} {response.text[:200]}")
+        return response
+
+    def _run_scenario(self, customer, registration):
+        durations = {}
+        try:
+            step = "create_permit"
+            started = time.monotonic()
+            customer.fetch_driving_licence_detail()
+            permit = CustomerPermit(customer.id).create(str(self.zone.id), registration)
+            durations[step] = time.monotonic() - started
+
+            step = "create_order"
+            started = time.monotonic()
+            permits = ParkingPermit.objects.filter(
+                customer=customer, status=ParkingPermitStatus.DRAFT
+            )
+            order = Order.objects.create_for_permits(permits)
+            TalpaOrderManager.send_to_talpa(order)
+            durations[step] = time.monotonic() - started
+
+            step = "order_webhook"
+            started = time.monotonic()
+            self._post(
+                "/api/talpa/order/",
+                {"orderId": str(order.talpa_order_id), "eventType": "PAYMENT_PAID"},
+            )
+            durations[step] = time.monotonic() - started
+
+            step = "resolve_price"
+            started = time.monotonic()
+            self._post(
+                "/api/talpa/resolve-price/",
+                {
+                    "userId": str(customer.id),
+                    "orderItem": {
+                        "meta": [{"key": "permitId", "value": str(permit.id)}]
+                    },
+                },
+            )
+            durations[step] = time.monotonic() - started
+        except Exception as e:
+            raise StepFailed(step, e)
+        finally:
+            # every worker thread has its own database connection
+            connection.close()
+        return durations
+
+    def _report(self, count, elapsed, durations, errors):
+        failed = sum(len(step_errors) for step_errors in errors.values())
+        self.stdout.write(
+            f"{count - failed} scenarios completed and {failed} failed "
+            f"in {elapsed:.1f} s ({(count - failed) / elapsed:.2f} scenarios/s)"
+        )
+        header = "".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+        self.stdout.write(f"{'step':<16}{'count':>7}{header}{'max':>9}{'errors':>8}")
+        for step in STEPS:
+            values = sorted(durations[step])
+            if values:
+                columns = "".join(
+                    f"{percentile(values, p) * 1000:>7.0f}ms" for p in PERCENTILES
+                )
+                columns += f"{values[-1] * 1000:>7.0f}ms"
+            else:
+                columns = f"{'-':>9}" * (len(PERCENTILES) + 1)
+            self.stdout.write(
+                f"{step:<16}{len(values):>7}{columns}{len(errors[step]):>8}"
+            )
+        for step in STEPS:
+            for error in errors[step][:5]:
+                self.stderr.write(error)
+
+    @transaction.atomic
+    def _remove_customers(self, customers_with_registrations):
+        customers = [customer for customer, _ in customers_with_registrations]
+        registrations = [
+            registration for _, registration in customers_with_registrations
+        ]
+        permits = ParkingPermit.objects.filter(customer__in=customers)
+        orders = Order.objects.filter(customer__in=customers)
+        TalpaOrderEvent.objects.filter(
+            talpa_order_id__in=orders.exclude(talpa_order_id=None).values(
+                "talpa_order_id"
+            )
+        ).delete()
+        OrderItem.objects.filter(order__in=orders).delete()
+        permits.delete()
+        orders.delete()
+        DrivingLicence.objects.filter(customer__in=customers).delete()
+        address_ids = [customer.primary_address_id for customer in customers]
+        Customer.objects.filter(id__in=[customer.id for customer in customers]).delete()
+        Address.objects.filter(id__in=address_ids).delete()
+        Vehicle.objects.filter(registration_number__in=registrations).delete()
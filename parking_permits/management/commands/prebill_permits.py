@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from parking_permits.models import PermitMonthlyPrice
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute and store the monthly prices of active open-ended permits "
+        "and report product catalog errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month",
+            help="Billing month as YYYY-MM, defaults to next month",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=PermitMonthlyPrice.objects.prebilling_chunk_size,
+            help="Number of permits priced in a single batch",
+        )
+
+    def handle(self, *args, **options):
+        if options["month"]:
+            try:
+                month = datetime.strptime(options["month"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("Month must be given as YYYY-MM")
+        else:
+            month = timezone.localdate().replace(day=1) + relativedelta(months=1)
+
+        report = PermitMonthlyPrice.objects.prebill(
+            month, chunk_size=options["chunk_size"]
+        )
+        self.stdout.write(
+            f"Priced {report['priced']} permits for {month:%Y-%m}, "
+            f"{report['failed']} permits could not be priced."
+        )
+        for zone_name, error in sorted(report["catalog_errors"].items()):
+            self.stderr.write(f"Zone {zone_name}: {error}")
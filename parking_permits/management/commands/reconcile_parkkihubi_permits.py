@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from parking_permits.models import ParkkihubiSyncState
+
+
+class Command(BaseCommand):
+    help = "Push the active permits that differ from the Parkkihubi state."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PARKKIHUBI_RECONCILIATION_WORKERS,
+            help="Number of concurrent requests",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=settings.PARKKIHUBI_RECONCILIATION_RATE,
+            help="Maximum number of requests per second",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=ParkkihubiSyncState.objects.chunk_size,
+            help="Number of permits compared at a time",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the permits that differ",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        report = ParkkihubiSyncState.objects.reconcile(
+            max_workers=options["workers"],
+            rate=options["rate"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+        self.stdout.write(
+            f"Checked {report['checked']} permits in "
+            f"{time.monotonic() - started:.1f} s: {report['differing']} differing, "
+            f"{report['pushed']} pushed, {report['failed']} failed."
+        )
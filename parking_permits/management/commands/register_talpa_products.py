@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from parking_permits.models import Product
+
+
+class Command(BaseCommand):
+    help = "Register the products that are missing a Talpa product id in Talpa."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.TALPA_PRODUCT_REGISTRATION_WORKERS,
+            help="Number of concurrent requests",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=settings.TALPA_PRODUCT_REGISTRATION_RATE,
+            help="Maximum number of requests per second",
+        )
+
+    def handle(self, *args, **options):
+        results = Product.objects.register_talpa_products(
+            max_workers=options["workers"], rate=options["rate"]
+        )
+        failed = 0
+        for product, error in results:
+            if error:
+                failed += 1
+                self.stderr.write(f"{product.id} {product.name}: {error}")
+            else:
+                self.stdout.write(
+                    f"{product.id} {product.name}: {product.talpa_product_id}"
+                )
+        self.stdout.write(
+            f"Registered {len(results) - failed} products, "
+            f"{failed} registrations failed."
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from parking_permits.customer_data import (
+    REMOVAL_CHUNK_SIZE,
+    remove_obsolete_customers_data,
+)
+
+
+class Command(BaseCommand):
+    help = "Remove the data of the customers that have been inactive for 2 years."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=REMOVAL_CHUNK_SIZE,
+            help="Number of customers removed in a single transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be removed by table",
+        )
+
+    def handle(self, *args, **options):
+        result = remove_obsolete_customers_data(
+            chunk_size=options["chunk_size"], dry_run=options["dry_run"]
+        )
+        if options["dry_run"]:
+            self.stdout.write("Rows that would be removed:")
+            for label, count in result.items():
+                self.stdout.write(f"  {label}: {count}")
+        else:
+            self.stdout.write(f"{result} customers removed.")
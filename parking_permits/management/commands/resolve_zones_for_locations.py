@@ -0,0 +1,68 @@
+import argparse
+import csv
+import sys
+
+from django.core.management.base import BaseCommand
+
+from parking_permits.models import ParkingZone
+from parking_permits.utils import chunked
+
+
+class Command(BaseCommand):
+    help = (
+        "Resolve parking zones for coordinates. Reads id,x,y rows from a CSV "
+        "file or stdin and writes id,x,y,zone,match_count rows to stdout. "
+        "Invalid rows, e.g. a header row, are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "file",
+            nargs="?",
+            type=argparse.FileType("r"),
+            default=sys.stdin,
+            help="CSV file with id,x,y rows, defaults to stdin",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=ParkingZone.objects.locations_chunk_size,
+            help="Number of locations resolved in a single query",
+        )
+
+    def parse_rows(self, reader, stats):
+        """Yield the valid rows with the parsed coordinates"""
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
+            try:
+                row_id, x, y = row
+                location = (float(x), float(y))
+            except ValueError:
+                self.stderr.write(f"Skipping invalid line {reader.line_num}: {row}")
+                stats["invalid"] += 1
+                continue
+            yield row_id, x, y, location
+
+    def handle(self, *args, **options):
+        writer = csv.writer(self.stdout)
+        writer.writerow(["id", "x", "y", "zone", "match_count"])
+        total = missing = multiple = 0
+        stats = {"invalid": 0}
+        rows = self.parse_rows(csv.reader(options["file"]), stats)
+        for chunk in chunked(rows, options["chunk_size"]):
+            locations = [location for *_, location in chunk]
+            zones_by_location = ParkingZone.objects.get_for_locations(locations)
+            for (row_id, x, y, _), zones in zip(chunk, zones_by_location):
+                zone_names = "|".join(zone.name for zone in zones)
+                writer.writerow([row_id, x, y, zone_names, len(zones)])
+                total += 1
+                if len(zones) == 0:
+                    missing += 1
+                elif len(zones) > 1:
+                    multiple += 1
+
+        self.stderr.write(
+            f"Resolved {total} locations: {missing} without a zone, "
+            f"{multiple} in multiple zones, {stats['invalid']} invalid rows skipped."
+        )
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from parking_permits.scheduler import JOBS, is_due, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the scheduled jobs of SCHEDULED_JOBS in this process instead of "
+        "the crontab. Each due job runs in its own thread."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--job",
+            help="Run the job once and exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["job"]:
+            if options["job"] not in JOBS:
+                raise CommandError(f"Unknown job {options['job']}")
+            run = run_job(options["job"])
+            if run is None:
+                self.stdout.write("The job is already running.")
+            else:
+                self.stdout.write(f"{run.job_name}: {run.status}, {run.rows} rows")
+            return
+
+        threads = {}
+        self.stdout.write("Scheduler started")
+        while True:
+            now = timezone.localtime().replace(second=0, microsecond=0)
+            for schedule, job_name in settings.SCHEDULED_JOBS:
+                thread = threads.get(job_name)
+                if not is_due(schedule, now) or (thread and thread.is_alive()):
+                    continue
+                threads[job_name] = threading.Thread(
+                    target=self._run_job, args=(job_name,), daemon=True
+                )
+                threads[job_name].start()
+            next_minute = now + timezone.timedelta(minutes=1)
+            time.sleep(max((next_minute - timezone.localtime()).total_seconds(), 0))
+
+    def _run_job(self, job_name):
+        try:
+            run_job(job_name)
+        finally:
+            # every job thread has its own database connection
+            connection.close()
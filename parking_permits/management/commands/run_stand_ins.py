@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from parking_permits.services.stand_ins import (
+    UPSTREAMS,
+    StandInServer,
+    UpstreamBehaviour,
+)
+
+BEHAVIOUR_OPTIONS = {
+    "latency": float,
+    "jitter": float,
+    "error_rate": float,
+    "error_status": int,
+}
+
+
+def parse_behaviour_values(values, cast):
+    """Parse values like "0.2" or "talpa=0.2" into values by upstream
+
+    A value without an upstream name applies to all the upstreams.
+    """
+    parsed = {}
+    for value in values:
+        upstream, _, setting = value.rpartition("=")
+        if upstream and upstream not in UPSTREAMS:
+            raise CommandError(f"Unknown upstream {upstream}")
+        for name in [upstream] if upstream else UPSTREAMS:
+            parsed[name] = cast(setting)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve local stand-ins for Talpa, Parkkihubi and Traficom. Point "
+        "TALPA_PRODUCT_EXPERIENCE_API to <url>/talpa/product/, "
+        "TALPA_ORDER_EXPERIENCE_API to <url>/talpa/order/, "
+        "PARKKIHUBI_OPERATOR_ENDPOINT to <url>/parkkihubi/permit/ and "
+        "TRAFICOM_ENDPOINT to <url>/traficom/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8900)
+        parser.add_argument(
+            "--latency",
+            action="append",
+            default=[],
+            help="Response latency in seconds, e.g. 0.2 or talpa=0.5",
+        )
+        parser.add_argument(
+            "--jitter",
+            action="append",
+            default=[],
+            help="Random latency in seconds added on top of the latency",
+        )
+        parser.add_argument(
+            "--error-rate",
+            action="append",
+            default=[],
+            help="Share of requests answered with an error, e.g. traficom=0.05",
+        )
+        parser.add_argument(
+            "--error-status",
+            action="append",
+            default=[],
+            help="HTTP status of the injected errors, 503 by default",
+        )
+
+    def handle(self, *args, **options):
+        behaviours = {upstream: UpstreamBehaviour() for upstream in UPSTREAMS}
+        for option, cast in BEHAVIOUR_OPTIONS.items():
+            values = parse_behaviour_values(options[option], cast)
+            for upstream, value in values.items():
+                setattr(behaviours[upstream], option, value)
+
+        server = StandInServer((options["host"], options["port"]), behaviours)
+        self.stdout.write(f"Serving stand-ins at {server.base_url}")
+        for upstream, behaviour in behaviours.items():
+            self.stdout.write(f"  {upstream}: {behaviour}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,193 @@
+# Generated by Django 3.2.13 on 2022-05-02 10:12
+
+from django.db import migrations, models
+
+
+CREATE_PERMIT_STATISTICS_SQL = """
+CREATE MATERIALIZED VIEW parking_permits_permit_statistics AS
+SELECT
+    concat_ws('|', z.id, p.status, p.contract_type) AS id,
+    z.id AS zone_id,
+    z.name AS zone_name,
+    p.status,
+    p.contract_type,
+    count(*) AS permit_count
+FROM parking_permits_parkingpermit p
+JOIN parking_permits_parkingzone z ON z.id = p.parking_zone_id
+GROUP BY z.id, z.name, p.status, p.contract_type;
+
+CREATE UNIQUE INDEX parking_permits_permit_statistics_id
+ON parking_permits_permit_statistics (id);
+"""
+
+DROP_PERMIT_STATISTICS_SQL = """
+DROP MATERIALIZED VIEW parking_permits_permit_statistics;
+"""
+
+CREATE_REVENUE_STATISTICS_SQL = """
+CREATE MATERIALIZED VIEW parking_permits_revenue_statistics AS
+SELECT
+    concat_ws('|', r.month, r.zone_id) AS id,
+    r.month,
+    r.zone_id,
+    r.zone_name,
+    count(*) AS order_item_count,
+    sum(r.total_price) AS total_price,
+    sum(r.total_price * r.vat) AS total_price_vat
+FROM (
+    SELECT
+        date_trunc(
+            'month',
+            coalesce(o.paid_time, o.created_at) AT TIME ZONE 'Europe/Helsinki'
+        )::date AS month,
+        z.id AS zone_id,
+        z.name AS zone_name,
+        i.quantity * i.payment_unit_price AS total_price,
+        i.vat
+    FROM parking_permits_orderitem i
+    JOIN parking_permits_order o ON o.id = i.order_id
+    JOIN parking_permits_product pr ON pr.id = i.product_id
+    JOIN parking_permits_parkingzone z ON z.id = pr.zone_id
+    WHERE o.status = 'CONFIRMED'
+) r
+GROUP BY r.month, r.zone_id, r.zone_name;
+
+CREATE UNIQUE INDEX parking_permits_revenue_statistics_id
+ON parking_permits_revenue_statistics (id);
+"""
+
+DROP_REVENUE_STATISTICS_SQL = """
+DROP MATERIALIZED VIEW parking_permits_revenue_statistics;
+"""
+
+CREATE_REFUND_STATISTICS_SQL = """
+CREATE MATERIALIZED VIEW parking_permits_refund_statistics AS
+SELECT
+    status,
+    count(*) AS refund_count,
+    sum(amount) AS total_amount
+FROM parking_permits_refund
+GROUP BY status;
+
+CREATE UNIQUE INDEX parking_permits_refund_statistics_status
+ON parking_permits_refund_statistics (status);
+"""
+
+DROP_REFUND_STATISTICS_SQL = """
+DROP MATERIALIZED VIEW parking_permits_refund_statistics;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0023_parkingpermit_order_add_fields"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_PERMIT_STATISTICS_SQL,
+            DROP_PERMIT_STATISTICS_SQL,
+        ),
+        migrations.RunSQL(
+            CREATE_REVENUE_STATISTICS_SQL,
+            DROP_REVENUE_STATISTICS_SQL,
+        ),
+        migrations.RunSQL(
+            CREATE_REFUND_STATISTICS_SQL,
+            DROP_REFUND_STATISTICS_SQL,
+        ),
+        migrations.CreateModel(
+            name="PermitStatistics",
+            fields=[
+                (
+                    "id",
+                    models.CharField(max_length=128, primary_key=True, serialize=False),
+                ),
+                ("zone_id", models.UUIDField(verbose_name="Zone id")),
+                (
+                    "zone_name",
+                    models.CharField(max_length=128, verbose_name="Zone name"),
+                ),
+                ("status", models.CharField(max_length=32, verbose_name="Status")),
+                (
+                    "contract_type",
+                    models.CharField(max_length=16, verbose_name="Contract type"),
+                ),
+                ("permit_count", models.IntegerField(verbose_name="Permit count")),
+            ],
+            options={
+                "verbose_name": "Permit statistics",
+                "verbose_name_plural": "Permit statistics",
+                "db_table": "parking_permits_permit_statistics",
+                "ordering": ["zone_name", "status", "contract_type"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="RevenueStatistics",
+            fields=[
+                (
+                    "id",
+                    models.CharField(max_length=128, primary_key=True, serialize=False),
+                ),
+                ("month", models.DateField(verbose_name="Month")),
+                ("zone_id", models.UUIDField(verbose_name="Zone id")),
+                (
+                    "zone_name",
+                    models.CharField(max_length=128, verbose_name="Zone name"),
+                ),
+                (
+                    "order_item_count",
+                    models.IntegerField(verbose_name="Order item count"),
+                ),
+                (
+                    "total_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Total price"
+                    ),
+                ),
+                (
+                    "total_price_vat",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Total price VAT"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Revenue statistics",
+                "verbose_name_plural": "Revenue statistics",
+                "db_table": "parking_permits_revenue_statistics",
+                "ordering": ["-month", "zone_name"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="RefundStatistics",
+            fields=[
+                (
+                    "status",
+                    models.CharField(
+                        max_length=32,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("refund_count", models.IntegerField(verbose_name="Refund count")),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Total amount"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Refund statistics",
+                "verbose_name_plural": "Refund statistics",
+                "db_table": "parking_permits_refund_statistics",
+                "ordering": ["status"],
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.13 on 2022-05-04 09:21
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0024_statistics_views"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="parkingzone",
+            options={
+                "base_manager_name": "objects",
+                "verbose_name": "Parking zone",
+                "verbose_name_plural": "Parking zones",
+            },
+        ),
+    ]
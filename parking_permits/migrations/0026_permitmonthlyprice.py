@@ -0,0 +1,82 @@
+# Generated by Django 3.2.13 on 2022-05-05 08:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0025_parkingzone_base_manager"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PermitMonthlyPrice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Time created"
+                    ),
+                ),
+                (
+                    "modified_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Time modified"),
+                ),
+                ("month", models.DateField(verbose_name="Month")),
+                (
+                    "unit_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=6, verbose_name="Unit price"
+                    ),
+                ),
+                (
+                    "vat",
+                    models.DecimalField(
+                        decimal_places=4, max_digits=6, verbose_name="VAT"
+                    ),
+                ),
+                (
+                    "is_low_emission",
+                    models.BooleanField(verbose_name="Is low emission"),
+                ),
+                (
+                    "is_secondary_vehicle",
+                    models.BooleanField(verbose_name="Is secondary vehicle"),
+                ),
+                (
+                    "permit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_prices",
+                        to="parking_permits.parkingpermit",
+                        verbose_name="Permit",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="permit_monthly_prices",
+                        to="parking_permits.product",
+                        verbose_name="Product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Permit monthly price",
+                "verbose_name_plural": "Permit monthly prices",
+                "unique_together": {("permit", "month")},
+            },
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 3.2.13 on 2022-05-06 11:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0026_permitmonthlyprice"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Time created"
+                    ),
+                ),
+                (
+                    "modified_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Time modified"),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("PARKKIHUBI_CREATE_PERMIT", "Create Parkkihubi permit"),
+                            ("PARKKIHUBI_UPDATE_PERMIT", "Update Parkkihubi permit"),
+                        ],
+                        max_length=32,
+                        verbose_name="Event type",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("DELIVERED", "Delivered"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=16,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("attempts", models.IntegerField(default=0, verbose_name="Attempts")),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Next attempt at",
+                    ),
+                ),
+                (
+                    "delivered_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Delivered at"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="Last error")),
+                (
+                    "permit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="outbox_events",
+                        to="parking_permits.parkingpermit",
+                        verbose_name="Permit",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Outbox event",
+                "verbose_name_plural": "Outbox events",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="outboxevent",
+            index=models.Index(
+                fields=["status", "next_attempt_at"],
+                name="parking_per_status_bfbaf6_idx",
+            ),
+        ),
+    ]
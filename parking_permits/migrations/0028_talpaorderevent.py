@@ -0,0 +1,43 @@
+# Generated by Django 3.2.13 on 2022-05-09 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0027_outboxevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TalpaOrderEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("talpa_order_id", models.UUIDField(verbose_name="Talpa order id")),
+                (
+                    "event_type",
+                    models.CharField(max_length=64, verbose_name="Event type"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Time created"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Talpa order event",
+                "verbose_name_plural": "Talpa order events",
+                "unique_together": {("talpa_order_id", "event_type")},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.13 on 2022-05-10 09:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0028_talpaorderevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParkkihubiSyncState",
+            fields=[
+                (
+                    "permit",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="parkkihubi_sync_state",
+                        serialize=False,
+                        to="parking_permits.parkingpermit",
+                        verbose_name="Permit",
+                    ),
+                ),
+                (
+                    "payload_hash",
+                    models.CharField(max_length=64, verbose_name="Payload hash"),
+                ),
+                ("pushed_at", models.DateTimeField(verbose_name="Pushed at")),
+            ],
+            options={
+                "verbose_name": "Parkkihubi sync state",
+                "verbose_name_plural": "Parkkihubi sync states",
+            },
+        ),
+    ]
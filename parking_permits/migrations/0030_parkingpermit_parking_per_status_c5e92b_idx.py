@@ -0,0 +1,19 @@
+# Generated by Django 3.2.13 on 2022-05-11 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0029_parkkihubisyncstate"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="parkingpermit",
+            index=models.Index(
+                fields=["status", "end_time"], name="parking_per_status_c5e92b_idx"
+            ),
+        ),
+    ]
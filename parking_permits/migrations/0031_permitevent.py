@@ -0,0 +1,63 @@
+# Generated by Django 3.2.13 on 2022-05-12 10:41
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0030_parkingpermit_parking_per_status_c5e92b_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PermitEvent",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("CREATED", "Created"),
+                            ("PAID", "Paid"),
+                            ("ZONE_CHANGED", "Zone changed"),
+                            ("VEHICLE_CHANGED", "Vehicle changed"),
+                            ("ENDED", "Ended"),
+                            ("EXPIRED", "Expired"),
+                        ],
+                        max_length=16,
+                        verbose_name="Event type",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Time created"
+                    ),
+                ),
+                (
+                    "permit",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="events",
+                        to="parking_permits.parkingpermit",
+                        verbose_name="Permit",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Permit event",
+                "verbose_name_plural": "Permit events",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="permitevent",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["created_at"], name="parking_per_created_448277_brin"
+            ),
+        ),
+    ]
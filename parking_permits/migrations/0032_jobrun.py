@@ -0,0 +1,70 @@
+# Generated by Django 3.2.13 on 2022-05-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0031_permitevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("job_name", models.CharField(max_length=64, verbose_name="Job name")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("RUNNING", "Running"),
+                            ("SUCCEEDED", "Succeeded"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="RUNNING",
+                        max_length=16,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(verbose_name="Time started")),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Time finished"
+                    ),
+                ),
+                (
+                    "rows",
+                    models.IntegerField(
+                        blank=True, null=True, verbose_name="Rows processed"
+                    ),
+                ),
+                (
+                    "cursor",
+                    models.CharField(blank=True, max_length=255, verbose_name="Cursor"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+            ],
+            options={
+                "verbose_name": "Job run",
+                "verbose_name_plural": "Job runs",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="jobrun",
+            index=models.Index(
+                fields=["job_name", "-started_at"],
+                name="parking_per_job_nam_f53b85_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.13 on 2022-05-17 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0032_jobrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="parkingzone",
+            name="source_hash",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, verbose_name="Source hash"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.13 on 2022-05-17 13:05
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0033_parkingzone_source_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="parkingzone",
+            name="bbox",
+            field=django.contrib.gis.db.models.fields.PolygonField(
+                blank=True,
+                editable=False,
+                null=True,
+                srid=4326,
+                verbose_name="Bounding box",
+            ),
+        ),
+        migrations.AddField(
+            model_name="parkingzone",
+            name="simplified_location",
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(
+                blank=True,
+                editable=False,
+                null=True,
+                srid=4326,
+                verbose_name="Simplified area",
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE parking_permits_parkingzone
+                SET bbox = ST_Envelope(location),
+                    simplified_location = ST_Multi(
+                        ST_SimplifyPreserveTopology(location, 0.0001)
+                    )
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
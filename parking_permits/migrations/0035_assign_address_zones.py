@@ -0,0 +1,28 @@
+# Generated by Django 3.2.13 on 2022-05-18 07:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0034_parkingzone_lookup_geometries"),
+    ]
+
+    operations = [
+        # the zones were assigned lazily on the first read before, so the
+        # addresses never read have no zone yet
+        migrations.RunSQL(
+            sql="""
+                UPDATE parking_permits_address a
+                SET zone = (
+                    SELECT z.id FROM parking_permits_parkingzone z
+                    WHERE ST_Intersects(z.location, a.location)
+                    ORDER BY z.name
+                    LIMIT 1
+                )
+                WHERE a.zone IS NULL AND a.location IS NOT NULL
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
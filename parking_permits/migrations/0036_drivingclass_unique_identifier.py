@@ -0,0 +1,55 @@
+# Generated by Django 3.2.13 on 2022-05-18 09:12
+
+from django.db import migrations, models
+
+DUPLICATES_SQL = """
+    SELECT id, FIRST_VALUE(id) OVER (
+        PARTITION BY identifier ORDER BY created_at, id
+    ) AS kept_id
+    FROM parking_permits_drivingclass
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parking_permits", "0035_assign_address_zones"),
+    ]
+
+    operations = [
+        # concurrent lookups may have created the same class twice, so the
+        # licences are moved to the first of the duplicates
+        migrations.RunSQL(
+            sql=[
+                f"""
+                INSERT INTO parking_permits_drivinglicence_driving_classes
+                    (drivinglicence_id, drivingclass_id)
+                SELECT DISTINCT l.drivinglicence_id, d.kept_id
+                FROM parking_permits_drivinglicence_driving_classes l
+                JOIN ({DUPLICATES_SQL}) d ON d.id = l.drivingclass_id
+                WHERE d.id <> d.kept_id
+                ON CONFLICT DO NOTHING
+                """,
+                f"""
+                DELETE FROM parking_permits_drivinglicence_driving_classes
+                WHERE drivingclass_id IN (
+                    SELECT id FROM ({DUPLICATES_SQL}) d WHERE d.id <> d.kept_id
+                )
+                """,
+                f"""
+                DELETE FROM parking_permits_drivingclass
+                WHERE id IN (
+                    SELECT id FROM ({DUPLICATES_SQL}) d WHERE d.id <> d.kept_id
+                )
+                """,
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="drivingclass",
+            name="identifier",
+            field=models.CharField(
+                max_length=32, unique=True, verbose_name="Identifier"
+            ),
+        ),
+    ]
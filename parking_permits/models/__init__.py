@@ -3,12 +3,17 @@ from .company import Company
 from .customer import Customer
 from .driving_class import DrivingClass
 from .driving_licence import DrivingLicence
-from .order import Order, OrderItem
+from .job_run import JobRun
+from .order import Order, OrderItem, TalpaOrderEvent
+from .outbox import OutboxEvent, ParkkihubiSyncState
 from .parking_permit import ParkingPermit
 from .parking_zone import ParkingZone
+from .permit_event import PermitEvent
+from .permit_monthly_price import PermitMonthlyPrice
 from .price import Price
 from .product import Product
 from .refund import Refund
+from .statistics import PermitStatistics, RefundStatistics, RevenueStatistics
 from .vehicle import LowEmissionCriteria, Vehicle
 
 __all__ = [
@@ -17,13 +22,22 @@ __all__ = [
     "Customer",
     "DrivingClass",
     "DrivingLicence",
+    "JobRun",
     "LowEmissionCriteria",
     "ParkingPermit",
     "ParkingZone",
+    "PermitEvent",
+    "PermitMonthlyPrice",
     "Price",
     "Vehicle",
     "Refund",
+    "PermitStatistics",
+    "RefundStatistics",
+    "RevenueStatistics",
     "Product",
     "Order",
     "OrderItem",
+    "OutboxEvent",
+    "ParkkihubiSyncState",
+    "TalpaOrderEvent",
 ]
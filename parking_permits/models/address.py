@@ -2,15 +2,52 @@ import logging
 
 from django.conf import settings
 from django.contrib.gis.db import models
+from django.db import connection
 from django.utils.translation import gettext_lazy as _
-from helsinki_gdpr.models import SerializableMixin
 
-from .mixins import TimestampedModelMixin, UUIDPrimaryKeyMixin
-from .parking_zone import ParkingZone
+from .mixins import SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin
+from .parking_zone import ParkingZone, get_zone_contains_sql
 
 logger = logging.getLogger("db")
 
 
+class AddressManager(SerializableMixin.SerializableManager):
+    def assign_zones(self):
+        """Recompute the zones of all the located addresses
+
+        The zones are resolved with a single spatial join, e.g. after the
+        zone boundaries have been imported. An address on the border of
+        several zones gets the first one by name, like on creation. Only
+        the addresses whose zone changes are written.
+
+        Returns:
+            The number of addresses whose zone changed.
+        """
+        table = self.model._meta.db_table
+        zone_table = ParkingZone._meta.db_table
+        sql = f"""
+            WITH resolved AS (
+                SELECT a.id, (
+                    SELECT z.id FROM {zone_table} z
+                    WHERE {get_zone_contains_sql("z", "a.location")}
+                    ORDER BY z.name
+                    LIMIT 1
+                ) AS zone_id
+                FROM {table} a
+                WHERE a.location IS NOT NULL
+            )
+            UPDATE {table} a
+            SET zone = resolved.zone_id
+            FROM resolved
+            WHERE a.id = resolved.id AND a.zone IS DISTINCT FROM resolved.zone_id
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            count = cursor.rowcount
+        logger.info(f"Zones of {count} addresses changed")
+        return count
+
+
 class Address(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
     street_name = models.CharField(_("Street name"), max_length=128)
     street_name_sv = models.CharField(_("Street name sv"), max_length=128, blank=True)
@@ -41,6 +78,8 @@ class Address(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
         {"name": "postal_code"},
     )
 
+    objects = AddressManager()
+
     class Meta:
         verbose_name = _("Address")
         verbose_name_plural = _("Addresses")
@@ -48,13 +87,27 @@ class Address(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
     def __str__(self):
         return f"{self.street_name} {self.street_number}, {self.city}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and self._zone_id is None and self.location:
+            self.assign_zone()
+        super().save(*args, **kwargs)
+
+    def assign_zone(self):
+        """Resolve the zone of the address from its location"""
+        location = self.location
+        if location.srid and location.srid != settings.SRID:
+            location = location.transform(settings.SRID, clone=True)
+        zones = ParkingZone.objects.get_for_locations([(location.x, location.y)])[0]
+        if not zones:
+            logger.warning(f"Cannot find parking zone for the address {self}")
+        self._zone = zones[0] if zones else None
+
     @property
     def zone(self):
-        """Lazy loading property for get the zone of the address"""
-        if not self._zone and self.location:
-            try:
-                self._zone = ParkingZone.objects.get_for_location(self.location)
-                self.save()
-            except ParkingZone.DoesNotExist:
-                logger.warning(f"Cannot find parking zone for the address {self}")
+        """The zone of the address
+
+        The zone is assigned when the address is created and recomputed
+        for all the addresses by AddressManager.assign_zones after the
+        zones are imported, so reading it never writes.
+        """
         return self._zone
@@ -3,16 +3,62 @@ from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth import get_user_model
 from django.contrib.gis.db import models
+from django.db.models import Exists, Max, OuterRef, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from helsinki_gdpr.models import SerializableMixin
 
 from ..services.traficom import Traficom
+from ..utils import get_serialization_lookups
 from .common import SourceSystem
 from .driving_licence import DrivingLicence
-from .mixins import TimestampedModelMixin, UUIDPrimaryKeyMixin
+from .mixins import SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin
 from .parking_permit import ParkingPermit, ParkingPermitStatus
 
+# customer data is kept for this long after the last activity
+DATA_RETENTION_PERIOD = relativedelta(years=2)
+
+
+class CustomerManager(SerializableMixin.SerializableManager):
+    def for_serialization(self):
+        """Return the customers with everything serialize() needs loaded
+
+        The GDPR export is then done with a fixed number of queries,
+        however many orders and permits the customer has.
+        """
+        select_related, prefetch_related = get_serialization_lookups(self.model)
+        return self.select_related(*select_related).prefetch_related(*prefetch_related)
+
+    def deletable(self):
+        """Return the customers whose data can be removed
+
+        A customer can be removed when:
+
+        - The last modified time of the customer is more than 2 years ago
+        - The customer does not have any valid permits
+        - The permits of the customer are ended and modified more than
+          2 years ago
+        """
+        cutoff = timezone.now() - DATA_RETENTION_PERIOD
+        valid_permits = ParkingPermit.objects.filter(
+            customer=OuterRef("pk"), status=ParkingPermitStatus.VALID
+        )
+        return (
+            self.filter(modified_at__lte=cutoff)
+            # company owners are removed together with their companies
+            .filter(company__isnull=True)
+            .exclude(Exists(valid_permits))
+            .annotate(
+                latest_permit_modified_at=Max("permits__modified_at"),
+                latest_permit_end_time=Max("permits__end_time"),
+            )
+            .filter(
+                Q(latest_permit_modified_at__isnull=True)
+                | Q(latest_permit_modified_at__lte=cutoff),
+                Q(latest_permit_end_time__isnull=True)
+                | Q(latest_permit_end_time__lte=cutoff),
+            )
+        )
+
 
 class Customer(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
     source_system = models.CharField(
@@ -73,6 +119,8 @@ class Customer(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
         {"name": "permits"},
     )
 
+    objects = CustomerManager()
+
     class Meta:
         verbose_name = _("Customer")
         verbose_name_plural = _("Customers")
@@ -101,15 +149,32 @@ class Customer(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
         licence_details = Traficom().fetch_driving_licence_details(
             self.national_id_number
         )
-        driving_licence = DrivingLicence.objects.update_or_create(
-            customer=self,
-            defaults={
-                "start_date": licence_details.get("issue_date"),
-            },
+        return self.update_driving_licence(licence_details)
+
+    def update_driving_licence(self, licence_details):
+        """Save the driving licence details, writing only if they changed"""
+        start_date = DrivingLicence._meta.get_field("start_date").to_python(
+            licence_details.get("issue_date")
         )
         driving_classes = licence_details.get("driving_classes", [])
-        driving_licence[0].driving_classes.set(driving_classes)
-        return driving_licence
+        try:
+            driving_licence = self.driving_licence
+        except DrivingLicence.DoesNotExist:
+            driving_licence = DrivingLicence.objects.create(
+                customer=self, start_date=start_date
+            )
+            driving_licence.driving_classes.set(driving_classes)
+            return driving_licence, True
+
+        if driving_licence.start_date != start_date:
+            driving_licence.start_date = start_date
+            driving_licence.save(update_fields=["start_date", "modified_at"])
+        current_class_ids = {
+            driving_class.id for driving_class in driving_licence.driving_classes.all()
+        }
+        if current_class_ids != {driving_class.id for driving_class in driving_classes}:
+            driving_licence.driving_classes.set(driving_classes)
+        return driving_licence, False
 
     def has_valid_driving_licence_for_vehicle(self, vehicle):
         return any(
@@ -124,44 +189,9 @@ class Customer(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
 
         This property can be used to check if the deleting is allowed
         via GDPR API triggered from Helsinki Profile or automatic
-        removal process. A customer that can be removed must sadifity
-        following conditions:
-
-        - The last modified time of the customer is more than 2 years ago
-        - The customer does not have any valid permits
-        - The latest permit must be ended and modified more than 2 years ago
+        removal process. The rule is defined by CustomerManager.deletable.
         """
-        now = timezone.now()
-        time_delta = relativedelta(years=2)
-        if self.modified_at + time_delta > now:
-            return False
-
-        has_valid_permits = self.permits.filter(
-            status=ParkingPermitStatus.VALID
-        ).exists()
-        if has_valid_permits:
-            return False
-
-        try:
-            latest_modified_at = self.permits.latest("modified_at").modified_at
-            latest_end_time = self.permits.latest("end_time").end_time
-            times = [latest_modified_at, latest_end_time]
-            latest_time = max([time for time in times if time])
-            if latest_time + time_delta > now:
-                return False
-        except ParkingPermit.DoesNotExist:
-            pass
-
-        return True
-
-    def delete_all_data(self):
-        """Delete all customer related data"""
-
-        self.permits.all().delete()
-        self.orders.all().delete()
-        if self.user:
-            self.user.delete()
-        self.delete()
+        return Customer.objects.deletable().filter(pk=self.pk).exists()
 
     @property
     def active_permits(self):
@@ -25,7 +25,7 @@ ALLOWED_VEHICLE_CLASSES = {
 
 
 class DrivingClass(TimestampedModelMixin, UUIDPrimaryKeyMixin):
-    identifier = models.CharField(_("Identifier"), max_length=32)
+    identifier = models.CharField(_("Identifier"), max_length=32, unique=True)
 
     class Meta:
         verbose_name = _("Driving class")
@@ -0,0 +1,94 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class JobRunStatus(models.TextChoices):
+    RUNNING = "RUNNING", _("Running")
+    SUCCEEDED = "SUCCEEDED", _("Succeeded")
+    FAILED = "FAILED", _("Failed")
+
+
+class JobRunManager(models.Manager):
+    def start(self, job_name):
+        """Record a new run of the job
+
+        The runs of the job still marked running were interrupted, as the
+        caller holds the lock of the job. They are marked failed, and the
+        new run continues from the cursor of the latest failed run.
+        """
+        now = timezone.now()
+        self.filter(job_name=job_name, status=JobRunStatus.RUNNING).update(
+            status=JobRunStatus.FAILED, finished_at=now, error="Interrupted"
+        )
+        last_run = (
+            self.filter(job_name=job_name)
+            .exclude(status=JobRunStatus.RUNNING)
+            .order_by("-started_at")
+            .first()
+        )
+        cursor = ""
+        if last_run and last_run.status == JobRunStatus.FAILED:
+            cursor = last_run.cursor
+        return self.create(job_name=job_name, started_at=now, cursor=cursor)
+
+    def prune(self, older_than):
+        deleted, _ = self.filter(started_at__lt=older_than).delete()
+        return deleted
+
+
+class JobRun(models.Model):
+    """A single run of a scheduled job"""
+
+    job_name = models.CharField(_("Job name"), max_length=64)
+    status = models.CharField(
+        _("Status"),
+        max_length=16,
+        choices=JobRunStatus.choices,
+        default=JobRunStatus.RUNNING,
+    )
+    started_at = models.DateTimeField(_("Time started"))
+    finished_at = models.DateTimeField(_("Time finished"), null=True, blank=True)
+    rows = models.IntegerField(_("Rows processed"), null=True, blank=True)
+    cursor = models.CharField(_("Cursor"), max_length=255, blank=True)
+    error = models.TextField(_("Error"), blank=True)
+
+    objects = JobRunManager()
+
+    class Meta:
+        verbose_name = _("Job run")
+        verbose_name_plural = _("Job runs")
+        indexes = [models.Index(fields=["job_name", "-started_at"])]
+
+    def __str__(self):
+        return f"{self.job_name} {self.started_at} {self.status}"
+
+    @property
+    def duration(self):
+        """Duration of the finished run in seconds"""
+        if self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+    def checkpoint(self, cursor, rows=None):
+        """Save the progress of a chunked job
+
+        A failed run is resumed from the cursor of its last checkpoint.
+        """
+        self.cursor = str(cursor)
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+        self.save(update_fields=["cursor", "rows"])
+
+    def finish(self, rows=None):
+        self.status = JobRunStatus.SUCCEEDED
+        self.finished_at = timezone.now()
+        if rows is not None:
+            self.rows = rows
+        self.save(update_fields=["status", "finished_at", "rows"])
+
+    def fail(self, error):
+        self.status = JobRunStatus.FAILED
+        self.finished_at = timezone.now()
+        self.error = error
+        self.save(update_fields=["status", "finished_at", "error"])
@@ -3,6 +3,7 @@ import uuid
 from django.conf import settings
 from django.contrib.gis.db import models
 from django.utils.translation import gettext_lazy as _
+from helsinki_gdpr.models import SerializableMixin as BaseSerializableMixin
 
 
 class TimestampedModelMixin(models.Model):
@@ -42,3 +43,29 @@ class UUIDPrimaryKeyMixin(models.Model):
 
     class Meta:
         abstract = True
+
+
+class SerializableMixin(BaseSerializableMixin):
+    """GDPR serialization that uses the prefetched relations
+
+    helsinki_gdpr serializes a relation through get_queryset().all(), which
+    drops the prefetched objects, and resolves every field twice.
+    """
+
+    class SerializableManager(BaseSerializableMixin.SerializableManager):
+        def serialize(self):
+            # all() of a related manager returns the prefetched objects
+            return [obj.serialize() for obj in self.all()]
+
+    objects = SerializableManager()
+
+    class Meta:
+        abstract = True
+
+    def serialize(self):
+        children = []
+        for field in self.serialize_fields:
+            value = self._resolve_field(self, field)
+            if value is not None:
+                children.append(value)
+        return {"key": self._meta.model_name.upper(), "children": children}
@@ -5,13 +5,13 @@ from django.db import models, transaction
 from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from helsinki_gdpr.models import SerializableMixin
 
 from parking_permits.mixins import TimestampedModelMixin, UUIDPrimaryKeyMixin
 
 from ..exceptions import OrderCreationFailed
 from ..utils import diff_months_ceil
 from .customer import Customer
+from .mixins import SerializableMixin
 from .parking_permit import ContractType, ParkingPermit, ParkingPermitStatus
 from .product import Product
 
@@ -290,6 +290,26 @@ class Order(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
         return sum([item.total_payment_price_vat for item in self.order_items.all()])
 
 
+class TalpaOrderEvent(models.Model):
+    """Ledger of the processed Talpa order notifications
+
+    Talpa may deliver the same notification several times, and only the
+    first delivery of each event is processed.
+    """
+
+    talpa_order_id = models.UUIDField(_("Talpa order id"))
+    event_type = models.CharField(_("Event type"), max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Time created"))
+
+    class Meta:
+        unique_together = ["talpa_order_id", "event_type"]
+        verbose_name = _("Talpa order event")
+        verbose_name_plural = _("Talpa order events")
+
+    def __str__(self):
+        return f"{self.talpa_order_id} {self.event_type}"
+
+
 class OrderItem(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin):
     talpa_order_item_id = models.UUIDField(
         _("Talpa order item id"), unique=True, editable=False, null=True, blank=True
@@ -0,0 +1,322 @@
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from ..services.client import RateLimiter
+from .mixins import TimestampedModelMixin
+from .parking_permit import ParkingPermit
+
+logger = logging.getLogger("db")
+
+
+class OutboxEventType(models.TextChoices):
+    PARKKIHUBI_CREATE_PERMIT = "PARKKIHUBI_CREATE_PERMIT", _("Create Parkkihubi permit")
+    PARKKIHUBI_UPDATE_PERMIT = "PARKKIHUBI_UPDATE_PERMIT", _("Update Parkkihubi permit")
+
+
+class OutboxEventStatus(models.TextChoices):
+    PENDING = "PENDING", _("Pending")
+    DELIVERED = "DELIVERED", _("Delivered")
+    FAILED = "FAILED", _("Failed")
+
+
+class OutboxEventManager(models.Manager):
+    batch_size = 100
+    max_attempts = 10
+    # seconds to wait before the first retry, doubled for each attempt
+    retry_delay = 30
+    max_retry_delay = 60 * 60
+
+    def enqueue(self, event_type, permit):
+        """Record an event to be delivered after the current transaction
+
+        The event is written in the same transaction as the permit change,
+        so it is delivered if and only if the change is committed.
+        """
+        return self.create(event_type=event_type, permit=permit)
+
+    def enqueue_many(self, event_type, permit_ids):
+        return self.bulk_create(
+            [self.model(event_type=event_type, permit_id=pk) for pk in permit_ids]
+        )
+
+    def _get_deliverable(self):
+        # an event is delivered only after the earlier events of the
+        # same permit, so that the upstream sees the changes in order
+        earlier_pending = self.filter(
+            permit_id=OuterRef("permit_id"),
+            status=OutboxEventStatus.PENDING,
+            id__lt=OuterRef("id"),
+        )
+        return (
+            self.filter(
+                status=OutboxEventStatus.PENDING,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .exclude(Exists(earlier_pending))
+            .order_by("id")
+        )
+
+    def deliver(self, batch_size=None):
+        """Deliver a batch of pending events
+
+        Each event is locked with SKIP LOCKED and delivered in its own
+        transaction, so several workers can run at the same time without
+        delivering the same events, and a delivered event stays delivered
+        whatever happens to the rest of the batch.
+
+        Returns:
+            The number of delivered and failed events.
+        """
+        batch_size = batch_size or self.batch_size
+        delivered = failed = 0
+        while delivered + failed < batch_size:
+            with transaction.atomic():
+                event = (
+                    self._get_deliverable().select_for_update(skip_locked=True).first()
+                )
+                if event is None:
+                    break
+                if event.deliver():
+                    delivered += 1
+                else:
+                    failed += 1
+        return delivered, failed
+
+    def get_retry_delay(self, attempts):
+        return min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+
+
+class OutboxEvent(TimestampedModelMixin):
+    event_type = models.CharField(
+        _("Event type"), max_length=32, choices=OutboxEventType.choices
+    )
+    permit = models.ForeignKey(
+        ParkingPermit,
+        verbose_name=_("Permit"),
+        related_name="outbox_events",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        _("Status"),
+        max_length=16,
+        choices=OutboxEventStatus.choices,
+        default=OutboxEventStatus.PENDING,
+    )
+    attempts = models.IntegerField(_("Attempts"), default=0)
+    next_attempt_at = models.DateTimeField(_("Next attempt at"), default=timezone.now)
+    delivered_at = models.DateTimeField(_("Delivered at"), null=True, blank=True)
+    last_error = models.TextField(_("Last error"), blank=True)
+
+    objects = OutboxEventManager()
+
+    class Meta:
+        verbose_name = _("Outbox event")
+        verbose_name_plural = _("Outbox events")
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.event_type} {self.permit_id} ({self.status})"
+
+    def _send(self):
+        data = self.permit._get_parkkihubi_data()
+        if self.event_type == OutboxEventType.PARKKIHUBI_CREATE_PERMIT:
+            if self.attempts > 1:
+                # an earlier attempt may have created the permit even if
+                # it was not recorded, so it is updated if it exists
+                self.permit.sync_parkkihubi_permit(data)
+            else:
+                self.permit.create_parkkihubi_permit(data)
+        elif self.event_type == OutboxEventType.PARKKIHUBI_UPDATE_PERMIT:
+            self.permit.update_parkkihubi_permit(data)
+        ParkkihubiSyncState.objects.record(self.permit_id, data)
+
+    def deliver(self):
+        """Send the event and record the outcome
+
+        The permit data is read at delivery time, so the pending updates
+        of the same permit that are already committed at that point are
+        covered by this delivery as well.
+        """
+        # taken before the permit is loaded, so that the covered updates
+        # cannot contain changes that are missing from the sent data
+        covered_update_ids = list(
+            OutboxEvent.objects.filter(
+                permit_id=self.permit_id,
+                event_type=OutboxEventType.PARKKIHUBI_UPDATE_PERMIT,
+                status=OutboxEventStatus.PENDING,
+                id__gt=self.id,
+            ).values_list("id", flat=True)
+        )
+        now = timezone.now()
+        self.attempts += 1
+        try:
+            self._send()
+        except Exception as e:
+            logger.error(f"Delivering outbox event {self.id} failed: {e}")
+            self.last_error = str(e)
+            if self.attempts >= OutboxEvent.objects.max_attempts:
+                self.status = OutboxEventStatus.FAILED
+            else:
+                delay = OutboxEvent.objects.get_retry_delay(self.attempts)
+                self.next_attempt_at = now + timezone.timedelta(seconds=delay)
+            self.save()
+            return False
+
+        self.status = OutboxEventStatus.DELIVERED
+        self.delivered_at = now
+        self.last_error = ""
+        self.save()
+        OutboxEvent.objects.filter(id__in=covered_update_ids).update(
+            status=OutboxEventStatus.DELIVERED, delivered_at=now
+        )
+        return True
+
+
+def get_payload_hash(data):
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ParkkihubiSyncStateManager(models.Manager):
+    chunk_size = 500
+
+    def record(self, permit_id, data):
+        """Store the hash of the payload last pushed to Parkkihubi"""
+        self.update_or_create(
+            permit_id=permit_id,
+            defaults={
+                "payload_hash": get_payload_hash(data),
+                "pushed_at": timezone.now(),
+            },
+        )
+
+    def reconcile(self, max_workers=None, rate=None, chunk_size=None, dry_run=False):
+        """Push the active permits that differ from what Parkkihubi last got
+
+        The active permits are walked through in chunks and the payload
+        of each permit is compared with the hash of the last pushed
+        payload. Only the differing permits are pushed, concurrently and
+        at most rate requests per second. Permits with pending outbox
+        events are left to the outbox worker.
+
+        A push may race with an outbox delivery of the same permit, but
+        the recorded hash is then that of the older payload, so the next
+        run pushes the permit again.
+
+        Returns:
+            A report with the number of checked, differing, pushed and
+            failed permits.
+        """
+        max_workers = max_workers or settings.PARKKIHUBI_RECONCILIATION_WORKERS
+        rate_limiter = RateLimiter(rate or settings.PARKKIHUBI_RECONCILIATION_RATE)
+        chunk_size = chunk_size or self.chunk_size
+        report = {"checked": 0, "differing": 0, "pushed": 0, "failed": 0}
+
+        pending_events = OutboxEvent.objects.filter(
+            permit_id=OuterRef("id"), status=OutboxEventStatus.PENDING
+        )
+        permits = (
+            ParkingPermit.objects.active()
+            .exclude(Exists(pending_events))
+            .select_related("vehicle")
+            .order_by("id")
+        )
+
+        def push(permit, data):
+            rate_limiter.wait()
+            permit.sync_parkkihubi_permit(data)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            last_id = None
+            while True:
+                qs = permits if last_id is None else permits.filter(id__gt=last_id)
+                chunk = list(qs[:chunk_size])
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+
+                pushed_hashes = dict(
+                    self.filter(permit__in=chunk).values_list(
+                        "permit_id", "payload_hash"
+                    )
+                )
+                differing = []
+                for permit in chunk:
+                    data = permit._get_parkkihubi_data()
+                    payload_hash = get_payload_hash(data)
+                    if pushed_hashes.get(permit.id) != payload_hash:
+                        differing.append((permit, data, payload_hash))
+                report["checked"] += len(chunk)
+                report["differing"] += len(differing)
+                if dry_run or not differing:
+                    continue
+
+                futures = {
+                    executor.submit(push, permit, data): (permit, payload_hash)
+                    for permit, data, payload_hash in differing
+                }
+                pushed = {}
+                for future in as_completed(futures):
+                    permit, payload_hash = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(
+                            f"Pushing permit {permit.id} to Parkkihubi failed: {e}"
+                        )
+                        report["failed"] += 1
+                    else:
+                        pushed[permit.id] = payload_hash
+                self._save_hashes(pushed, pushed_hashes)
+                report["pushed"] += len(pushed)
+
+        logger.info(
+            f"Parkkihubi reconciliation checked {report['checked']} permits, "
+            f"pushed {report['pushed']} and failed {report['failed']}"
+        )
+        return report
+
+    def _save_hashes(self, hashes, existing_hashes):
+        now = timezone.now()
+        states = [
+            self.model(permit_id=permit_id, payload_hash=payload_hash, pushed_at=now)
+            for permit_id, payload_hash in hashes.items()
+        ]
+        self.bulk_update(
+            [state for state in states if state.permit_id in existing_hashes],
+            ["payload_hash", "pushed_at"],
+        )
+        # a concurrent outbox delivery may have recorded the permit already
+        self.bulk_create(
+            [state for state in states if state.permit_id not in existing_hashes],
+            ignore_conflicts=True,
+        )
+
+
+class ParkkihubiSyncState(models.Model):
+    permit = models.OneToOneField(
+        ParkingPermit,
+        verbose_name=_("Permit"),
+        related_name="parkkihubi_sync_state",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    payload_hash = models.CharField(_("Payload hash"), max_length=64)
+    pushed_at = models.DateTimeField(_("Pushed at"))
+
+    objects = ParkkihubiSyncStateManager()
+
+    class Meta:
+        verbose_name = _("Parkkihubi sync state")
+        verbose_name_plural = _("Parkkihubi sync states")
+
+    def __str__(self):
+        return f"{self.permit_id} ({self.pushed_at})"
@@ -2,7 +2,6 @@ import json
 import logging
 from decimal import Decimal
 
-import requests
 import reversion
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
@@ -10,7 +9,6 @@ from django.contrib.gis.db import models
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from helsinki_gdpr.models import SerializableMixin
 
 from ..constants import (
     LOW_EMISSION_DISCOUNT,
@@ -20,11 +18,13 @@ from ..constants import (
 from ..exceptions import (
     InvalidContractType,
     ParkkihubiPermitError,
+    ParkkihubiPermitNotFound,
     PermitCanNotBeEnded,
     RefundError,
 )
+from ..services.client import get_client
 from ..utils import diff_months_ceil, get_end_time
-from .mixins import TimestampedModelMixin, UUIDPrimaryKeyMixin
+from .mixins import SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixin
 from .parking_zone import ParkingZone
 from .vehicle import Vehicle
 
@@ -171,6 +171,7 @@ class ParkingPermit(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixi
         ordering = ["-identifier"]
         verbose_name = _("Parking permit")
         verbose_name_plural = _("Parking permits")
+        indexes = [models.Index(fields=["status", "end_time"])]
 
     def __str__(self):
         return "%s" % self.identifier
@@ -474,15 +475,19 @@ class ParkingPermit(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixi
             permit_end_date = timezone.localdate(self.end_time)
             return qs.get_products_with_quantities(permit_start_date, permit_end_date)
 
-    def update_parkkihubi_permit(self):
-        response = requests.patch(
+    def update_parkkihubi_permit(self, data=None):
+        response = get_client("parkkihubi").patch(
             f"{settings.PARKKIHUBI_OPERATOR_ENDPOINT}{str(self.id)}/",
-            data=json.dumps(self._get_parkkihubi_data()),
+            data=json.dumps(data or self._get_parkkihubi_data()),
             headers=self._get_parkkihubi_headers(),
         )
 
         if response.status_code == 200:
             logger.info("Parkkihubi update permit")
+        elif response.status_code == 404:
+            raise ParkkihubiPermitNotFound(
+                f"Permit {self.id} does not exist in Parkkihubi."
+            )
         else:
             logger.error(
                 "Failed to update permit to pakkihubi."
@@ -494,10 +499,10 @@ class ParkingPermit(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixi
                 f"Error: {response.status_code} {response.reason}."
             )
 
-    def create_parkkihubi_permit(self):
-        response = requests.post(
+    def create_parkkihubi_permit(self, data=None):
+        response = get_client("parkkihubi").post(
             settings.PARKKIHUBI_OPERATOR_ENDPOINT,
-            data=json.dumps(self._get_parkkihubi_data()),
+            data=json.dumps(data or self._get_parkkihubi_data()),
             headers=self._get_parkkihubi_headers(),
         )
         if response.status_code == 201:
@@ -513,6 +518,18 @@ class ParkingPermit(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixi
                 f"Error: {response.status_code} {response.reason}."
             )
 
+    def sync_parkkihubi_permit(self, data=None):
+        """Update the permit in Parkkihubi, creating it if it is missing there
+
+        Only the HTTP requests are made here when the data is given, so
+        this is safe to call from the worker threads of a reconciliation.
+        """
+        data = data or self._get_parkkihubi_data()
+        try:
+            self.update_parkkihubi_permit(data)
+        except ParkkihubiPermitNotFound:
+            self.create_parkkihubi_permit(data)
+
     def _get_parkkihubi_headers(self):
         return {
             "Authorization": f"ApiKey {settings.PARKKIHUBI_TOKEN}",
@@ -541,7 +558,7 @@ class ParkingPermit(SerializableMixin, TimestampedModelMixin, UUIDPrimaryKeyMixi
                 {
                     "start_time": start_time,
                     "end_time": end_time,
-                    "area": self.parking_zone.name,
+                    "area": ParkingZone.objects.get_record(self.parking_zone_id).name,
                 }
             ],
         }
@@ -1,8 +1,12 @@
 import logging
+import time
+from collections import namedtuple
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.db import connection
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -12,10 +16,139 @@ from .price import Price, PriceType
 
 logger = logging.getLogger("db")
 
+# Tolerance (in degrees of settings.SRID) of the simplified zone geometries.
+# The simplified boundary is within the tolerance of the exact one, so a
+# point further away from it than the margin is inside the exact zone if
+# and only if it is inside the simplified zone.
+SIMPLIFY_TOLERANCE = 0.0001
+SIMPLIFY_MARGIN = 2 * SIMPLIFY_TOLERANCE
+
+
+def get_zone_contains_sql(zone, point):
+    """Return the SQL condition of the zone table alias containing the point
+
+    The bounding boxes select the candidate zones with the spatial index,
+    and the simplified geometries decide all the points that are not near
+    the zone boundary. The exact geometry is only tested for the rest.
+    """
+    return f"""
+        {zone}.bbox && {point}
+        AND CASE
+            WHEN ST_DWithin(
+                ST_Boundary({zone}.simplified_location), {point}, {SIMPLIFY_MARGIN}
+            )
+            THEN ST_Intersects({zone}.location, {point})
+            ELSE ST_Intersects({zone}.simplified_location, {point})
+        END
+    """
+
+
+ZoneRecord = namedtuple(
+    "ZoneRecord", ["id", "name", "description", "description_sv", "shared_product_id"]
+)
+
+
+class ParkingZoneQuerySet(models.QuerySet):
+    def with_geometry(self):
+        """Load the zone geometries, which are deferred by default"""
+        return self.defer(None)
+
+
+class ParkingZoneManager(models.Manager.from_queryset(ParkingZoneQuerySet)):
+    # number of points resolved with a single spatial join
+    locations_chunk_size = 5000
+    # seconds the light zone records are kept in the process cache
+    records_timeout = 300
+
+    _records = {}
+    _records_loaded_at = None
+
+    def get_queryset(self):
+        # The geometries are big and only needed for spatial queries and
+        # map views, so they are not loaded unless explicitly requested
+        # with with_geometry()
+        return super().get_queryset().defer("location", "bbox", "simplified_location")
+
+    def get_record(self, zone_id):
+        """Return a light, process-wide cached record of the zone
+
+        The record contains only the non-spatial fields that are used
+        when listing permits and products. The records are reloaded when
+        they expire or the zone is not found in them.
+
+        Raises:
+            ParkingZone.DoesNotExist: The zone does not exist.
+        """
+        if zone_id is None:
+            raise self.model.DoesNotExist("Parking zone id is missing")
+        cls = type(self)
+        now = time.monotonic()
+        expired = (
+            cls._records_loaded_at is None
+            or now - cls._records_loaded_at > self.records_timeout
+        )
+        if expired or zone_id not in cls._records:
+            cls._records = {
+                record[0]: ZoneRecord(*record)
+                for record in self.get_queryset().values_list(*ZoneRecord._fields)
+            }
+            cls._records_loaded_at = now
+        try:
+            return cls._records[zone_id]
+        except KeyError:
+            raise self.model.DoesNotExist(f"Parking zone {zone_id} does not exist")
+
+    def clear_records(self):
+        """Reload the records on the next lookup, e.g. after a zone change"""
+        type(self)._records_loaded_at = None
 
-class ParkingZoneManager(models.Manager):
     def get_for_location(self, location):
-        return self.get(location__intersects=location)
+        if location.srid and location.srid != settings.SRID:
+            location = location.transform(settings.SRID, clone=True)
+        zone_ids = self._get_zone_ids_for_locations([(location.x, location.y)])[0]
+        return self.get(id__in=zone_ids)
+
+    def _get_zone_ids_for_locations(self, locations):
+        table = self.model._meta.db_table
+        sql = f"""
+            SELECT p.idx, z.id
+            FROM unnest(%s::double precision[], %s::double precision[])
+                WITH ORDINALITY AS p(x, y, idx)
+            CROSS JOIN LATERAL (
+                SELECT ST_SetSRID(ST_MakePoint(p.x, p.y), %s) AS geom
+            ) point
+            JOIN {table} z ON {get_zone_contains_sql("z", "point.geom")}
+            ORDER BY p.idx, z.name
+        """
+        xs = [x for x, y in locations]
+        ys = [y for x, y in locations]
+        zone_ids = [[] for _ in locations]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [xs, ys, settings.SRID])
+            for idx, zone_id in cursor.fetchall():
+                zone_ids[idx - 1].append(zone_id)
+        return zone_ids
+
+    def get_for_locations(self, locations):
+        """Resolve the zones of many (x, y) coordinates at once
+
+        The points are matched against the zones with a single spatial
+        join per chunk instead of a query per point.
+
+        Returns:
+            A list with a list of matching zones for each location, in
+            the same order as the given locations. A location outside of
+            all zones gets an empty list and a location on the border of
+            several zones gets all of them.
+        """
+        zone_ids = []
+        for index in range(0, len(locations), self.locations_chunk_size):
+            chunk = locations[index : index + self.locations_chunk_size]
+            zone_ids += self._get_zone_ids_for_locations(chunk)
+
+        unique_zone_ids = {zone_id for ids in zone_ids for zone_id in ids}
+        zones = self.in_bulk(unique_zone_ids)
+        return [[zones[zone_id] for zone_id in ids] for ids in zone_ids]
 
 
 class ParkingZone(TimestampedModelMixin, UUIDPrimaryKeyMixin):
@@ -26,16 +159,51 @@ class ParkingZone(TimestampedModelMixin, UUIDPrimaryKeyMixin):
         unique=True, editable=False, blank=True, null=True
     )
     location = models.MultiPolygonField(_("Area (2D)"), srid=settings.SRID)
+    # hash of the imported attributes and geometry, unchanged zones are
+    # not rewritten on import
+    source_hash = models.CharField(
+        _("Source hash"), max_length=64, blank=True, editable=False
+    )
+    # derived from the location for the zone lookups
+    bbox = models.PolygonField(
+        _("Bounding box"), srid=settings.SRID, null=True, blank=True, editable=False
+    )
+    simplified_location = models.MultiPolygonField(
+        _("Simplified area"),
+        srid=settings.SRID,
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     objects = ParkingZoneManager()
 
     class Meta:
+        # related zones are loaded without the geometry as well
+        base_manager_name = "objects"
         verbose_name = _("Parking zone")
         verbose_name_plural = _("Parking zones")
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if "location" not in self.get_deferred_fields() and self.location:
+            self.update_lookup_geometries()
+        super().save(*args, **kwargs)
+
+    def update_lookup_geometries(self):
+        """Derive the bounding box and the simplified geometry of the zone
+
+        Called on save, and by the importer for the bulk written zones.
+        """
+        self.bbox = Polygon.from_bbox(self.location.extent)
+        self.bbox.srid = self.location.srid
+        simplified = self.location.simplify(SIMPLIFY_TOLERANCE, preserve_topology=True)
+        if isinstance(simplified, Polygon):
+            simplified = MultiPolygon(simplified, srid=simplified.srid)
+        self.simplified_location = simplified
+
     @property
     def label(self):
         return f"{self.name} - {self.description}"
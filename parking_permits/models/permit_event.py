@@ -0,0 +1,111 @@
+import logging
+
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .parking_permit import ParkingPermit
+
+logger = logging.getLogger("db")
+
+
+class PermitEventType(models.TextChoices):
+    CREATED = "CREATED", _("Created")
+    PAID = "PAID", _("Paid")
+    ZONE_CHANGED = "ZONE_CHANGED", _("Zone changed")
+    VEHICLE_CHANGED = "VEHICLE_CHANGED", _("Vehicle changed")
+    ENDED = "ENDED", _("Ended")
+    EXPIRED = "EXPIRED", _("Expired")
+
+
+class PermitEventManager(models.Manager):
+    page_size = 1000
+    max_page_size = 10000
+    # seconds an event is held back from the readers, so that the events
+    # of transactions that commit late do not end up behind the cursor
+    settle_delay = 30
+    prune_chunk_size = 10000
+
+    def record(self, event_type, permit):
+        """Append an event of the permit to the feed
+
+        The event is written in the same transaction as the permit change,
+        so it is in the feed if and only if the change is committed.
+        """
+        return self.create(event_type=event_type, permit_id=permit.id)
+
+    def record_many(self, event_type, permit_ids):
+        return self.bulk_create(
+            [self.model(event_type=event_type, permit_id=pk) for pk in permit_ids]
+        )
+
+    def read(self, after=0, limit=None):
+        """Return the next page of events after the cursor
+
+        The cursor is the id of the last event the reader has seen. The
+        events are returned in id order, and the page ends before the
+        first event that has not settled yet. The ids and the creation
+        times are not in the same order, so skipping the unsettled events
+        would move the cursor past them.
+        """
+        limit = min(limit or self.page_size, self.max_page_size)
+        settled_at = timezone.now() - timezone.timedelta(seconds=self.settle_delay)
+        events = []
+        for event in self.filter(id__gt=after).order_by("id")[:limit]:
+            if event.created_at > settled_at:
+                break
+            events.append(event)
+        return events
+
+    def prune(self, older_than):
+        """Delete the events recorded before the given time
+
+        The events are deleted oldest first in chunks of ids, which keeps
+        the deleting transactions short.
+        """
+        deleted = 0
+        while True:
+            ids = list(
+                self.filter(created_at__lt=older_than)
+                .order_by("id")
+                .values_list("id", flat=True)[: self.prune_chunk_size]
+            )
+            if not ids:
+                break
+            self.filter(id__in=ids).delete()
+            deleted += len(ids)
+        logger.info(f"Pruned {deleted} permit events")
+        return deleted
+
+
+class PermitEvent(models.Model):
+    """Append-only feed of the permit lifecycle events
+
+    The event only refers to the permit, the consumers read the current
+    state of the permit themselves. The permit is not a constraint, so
+    the events outlive the permits removed e.g. with the customer data.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(
+        _("Event type"), max_length=16, choices=PermitEventType.choices
+    )
+    permit = models.ForeignKey(
+        ParkingPermit,
+        verbose_name=_("Permit"),
+        related_name="events",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    created_at = models.DateTimeField(_("Time created"), default=timezone.now)
+
+    objects = PermitEventManager()
+
+    class Meta:
+        verbose_name = _("Permit event")
+        verbose_name_plural = _("Permit events")
+        indexes = [BrinIndex(fields=["created_at"])]
+
+    def __str__(self):
+        return f"{self.id} {self.event_type} {self.permit_id}"
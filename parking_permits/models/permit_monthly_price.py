@@ -0,0 +1,225 @@
+import logging
+from datetime import datetime, time
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from ..exceptions import ProductCatalogError
+from .mixins import TimestampedModelMixin
+from .parking_permit import ParkingPermit
+from .parking_zone import ParkingZone
+from .product import Product
+from .vehicle import LowEmissionCriteria
+
+logger = logging.getLogger("db")
+
+
+class PermitMonthlyPriceManager(models.Manager):
+    cache_timeout = 60 * 60
+    prebilling_chunk_size = 500
+
+    def _get_cache_key(self, permit_id, month):
+        return f"permit-monthly-price:{permit_id}:{month:%Y-%m}"
+
+    def _delete_cached(self, permit_months):
+        cache.delete_many(
+            [
+                self._get_cache_key(permit_id, month)
+                for permit_id, month in permit_months
+            ]
+        )
+
+    def compute(self, permit, month, product=None, is_low_emission=None):
+        """Compute the price of the permit for the given month
+
+        The price is based on the resident product of the permit zone
+        that is valid at the beginning of the month. Batch runs can pass
+        in the product and the low emission status they have resolved.
+        """
+        if product is None:
+            product = permit.parking_zone.products.for_resident().get_for_date(month)
+        if is_low_emission is None:
+            is_low_emission = permit.vehicle.is_low_emission
+        is_secondary_vehicle = permit.is_secondary_vehicle
+        return self.model(
+            permit=permit,
+            month=month,
+            product=product,
+            unit_price=product.get_modified_unit_price(
+                is_low_emission, is_secondary_vehicle
+            ),
+            vat=product.vat,
+            is_low_emission=is_low_emission,
+            is_secondary_vehicle=is_secondary_vehicle,
+        )
+
+    def store(self, permit, month):
+        price = self.compute(permit, month)
+        price, _ = self.update_or_create(
+            permit=permit,
+            month=month,
+            defaults={
+                "product": price.product,
+                "unit_price": price.unit_price,
+                "vat": price.vat,
+                "is_low_emission": price.is_low_emission,
+                "is_secondary_vehicle": price.is_secondary_vehicle,
+            },
+        )
+        return price
+
+    def get_for_month(self, permit_id, month):
+        """Return the price of the permit for the month
+
+        The price is looked up from the cache first, then from the price
+        table and computed and stored only if neither has it.
+        """
+        key = self._get_cache_key(permit_id, month)
+        price = cache.get(key)
+        if price is None:
+            price = self.filter(permit_id=permit_id, month=month).first()
+            if price is None:
+                permit = ParkingPermit.objects.select_related(
+                    "vehicle", "parking_zone"
+                ).get(pk=permit_id)
+                price = self.store(permit, month)
+            cache.set(key, price, self.cache_timeout)
+        return price
+
+    def invalidate(self, **filters):
+        """Remove the stored and cached prices matching the filters
+
+        Without filters all the stored prices are removed. A price is only
+        cached once it is stored, so the cached prices to remove are those
+        of the stored ones.
+        """
+        prices = self.filter(**filters)
+        permit_months = list(prices.values_list("permit_id", "month"))
+        if not permit_months:
+            return
+        deleted, _ = prices.delete()
+        self._delete_cached(permit_months)
+        logger.info(f"Invalidated {deleted} permit monthly prices")
+
+    def prebill(self, month, chunk_size=None):
+        """Compute and store the prices of open-ended permits for the month
+
+        All the permits that are active at the beginning of the month are
+        walked through in chunks. The zone products and the low emission
+        criteria are loaded once for the whole run.
+
+        Returns:
+            A report with the number of priced permits, the number of
+            permits that could not be priced and the product catalog
+            errors by zone name.
+        """
+        chunk_size = chunk_size or self.prebilling_chunk_size
+        today = timezone.localdate()
+        criteria_by_power_type = {
+            criteria.power_type: criteria
+            for criteria in LowEmissionCriteria.objects.filter(
+                start_date__lte=today, end_date__gte=today
+            )
+        }
+        products_by_zone = {}
+        report = {"month": month, "priced": 0, "failed": 0, "catalog_errors": {}}
+
+        month_start = timezone.make_aware(datetime.combine(month, time.min))
+        permits = (
+            ParkingPermit.objects.active_after(month_start)
+            .open_ended()
+            .select_related("vehicle")
+            .order_by("id")
+        )
+        last_id = None
+        while True:
+            qs = permits if last_id is None else permits.filter(id__gt=last_id)
+            chunk = list(qs[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            prices = []
+            for permit in chunk:
+                zone_id = permit.parking_zone_id
+                if zone_id not in products_by_zone:
+                    products_by_zone[zone_id] = self._get_zone_product(
+                        zone_id, month, report
+                    )
+                product = products_by_zone[zone_id]
+                if product is None:
+                    report["failed"] += 1
+                    continue
+                is_low_emission = permit.vehicle.meets_low_emission_criteria(
+                    criteria_by_power_type.get(permit.vehicle.power_type)
+                )
+                prices.append(self.compute(permit, month, product, is_low_emission))
+
+            with transaction.atomic():
+                self.filter(permit__in=chunk, month=month).delete()
+                self.bulk_create(prices)
+            self._delete_cached([(permit.id, month) for permit in chunk])
+            report["priced"] += len(prices)
+
+        logger.info(
+            f"Prebilled {report['priced']} permits for {month:%Y-%m}, "
+            f"{report['failed']} permits failed"
+        )
+        return report
+
+    def _get_zone_product(self, zone_id, month, report):
+        try:
+            return (
+                Product.objects.for_resident()
+                .filter(zone_id=zone_id)
+                .get_for_date(month)
+            )
+        except ProductCatalogError as e:
+            zone_name = ParkingZone.objects.get_record(zone_id).name
+            logger.error(f"Product catalog error in zone {zone_name}: {e}")
+            report["catalog_errors"][zone_name] = str(e)
+            return None
+
+
+class PermitMonthlyPrice(TimestampedModelMixin):
+    permit = models.ForeignKey(
+        ParkingPermit,
+        verbose_name=_("Permit"),
+        related_name="monthly_prices",
+        on_delete=models.CASCADE,
+    )
+    month = models.DateField(_("Month"))
+    product = models.ForeignKey(
+        Product,
+        verbose_name=_("Product"),
+        related_name="permit_monthly_prices",
+        on_delete=models.CASCADE,
+    )
+    unit_price = models.DecimalField(_("Unit price"), max_digits=6, decimal_places=2)
+    vat = models.DecimalField(_("VAT"), max_digits=6, decimal_places=4)
+    is_low_emission = models.BooleanField(_("Is low emission"))
+    is_secondary_vehicle = models.BooleanField(_("Is secondary vehicle"))
+
+    objects = PermitMonthlyPriceManager()
+
+    class Meta:
+        unique_together = ["permit", "month"]
+        verbose_name = _("Permit monthly price")
+        verbose_name_plural = _("Permit monthly prices")
+
+    def __str__(self):
+        return f"{self.permit_id} {self.month:%Y-%m}: {self.unit_price}"
+
+    @property
+    def vat_percentage(self):
+        return self.vat * 100
+
+    @property
+    def price_vat(self):
+        return self.unit_price * self.vat
+
+    @property
+    def price_net(self):
+        return self.unit_price - self.price_vat
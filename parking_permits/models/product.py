@@ -1,15 +1,17 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
 
-import requests
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from parking_permits.exceptions import CreateTalpaProductError, ProductCatalogError
 
+from ..services.client import RateLimiter, get_client
 from ..utils import diff_months_ceil, find_next_date
 from .mixins import TimestampedModelMixin, UserStampedModelMixin, UUIDPrimaryKeyMixin
 from .parking_zone import ParkingZone
@@ -98,6 +100,59 @@ class ProductQuerySet(models.QuerySet):
 
         return products_with_quantities
 
+    def register_talpa_products(self, max_workers=None, rate=None):
+        """Register the products that are missing a Talpa product id
+
+        The requests are sent concurrently, at most rate requests per
+        second. Each received id is saved as soon as it comes in, and the
+        requests not sent yet are cancelled if the run is interrupted, so
+        an interrupted run is resumed by running it again.
+
+        Returns:
+            A list of (product, error) tuples, where error is None for
+            the registered products.
+        """
+        max_workers = max_workers or settings.TALPA_PRODUCT_REGISTRATION_WORKERS
+        rate_limiter = RateLimiter(rate or settings.TALPA_PRODUCT_REGISTRATION_RATE)
+        products = self.filter(talpa_product_id__isnull=True).order_by("start_date")
+
+        def register(data):
+            rate_limiter.wait()
+            return Product.request_talpa_product_id(data)
+
+        results = []
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            # the payloads are built here so that the worker threads
+            # do not need to touch the database
+            futures = {
+                executor.submit(register, product.get_talpa_product_data()): product
+                for product in products
+            }
+            for future in as_completed(futures):
+                product = futures[future]
+                try:
+                    product.talpa_product_id = future.result()
+                except Exception as e:
+                    logger.error(f"Registering product {product.id} failed: {e}")
+                    results.append((product, str(e)))
+                    continue
+                product.modified_at = timezone.now()
+                Product.objects.filter(pk=product.pk).update(
+                    talpa_product_id=product.talpa_product_id,
+                    modified_at=product.modified_at,
+                )
+                results.append((product, None))
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        failed = sum(1 for product, error in results if error)
+        logger.info(
+            f"Registered {len(results) - failed} products in Talpa, "
+            f"{failed} registrations failed"
+        )
+        return results
+
 
 class Product(TimestampedModelMixin, UserStampedModelMixin, UUIDPrimaryKeyMixin):
     talpa_product_id = models.UUIDField(
@@ -154,7 +209,8 @@ class Product(TimestampedModelMixin, UserStampedModelMixin, UUIDPrimaryKeyMixin)
     def name(self):
         # the product name is the same for different languages
         # so no translation needed
-        return f"Pysäköintialue {self.zone.name}"
+        zone = ParkingZone.objects.get_record(self.zone_id)
+        return f"Pysäköintialue {zone.name}"
 
     def get_modified_unit_price(self, is_low_emission, is_secondary):
         price = self.unit_price
@@ -164,37 +220,49 @@ class Product(TimestampedModelMixin, UserStampedModelMixin, UUIDPrimaryKeyMixin)
             price += price * self.secondary_vehicle_increase_rate
         return price
 
-    def create_talpa_product(self):
-        if self.talpa_product_id:
-            logger.warning("Talpa product has been created already")
-            return
-
-        data = {
+    def get_talpa_product_data(self):
+        return {
             "namespace": settings.NAMESPACE,
             "namespaceEntityId": str(self.id),
             "name": self.name,
         }
+
+    @staticmethod
+    def request_talpa_product_id(data):
+        """Register the product in Talpa and return the Talpa product id
+
+        Only the HTTP request is made here, so this is safe to call from
+        the worker threads of a bulk registration.
+        """
         headers = {
             "api-key": settings.TALPA_API_KEY,
             "Content-Type": "application/json",
         }
-        response = requests.post(
+        response = get_client("talpa").post(
             settings.TALPA_PRODUCT_EXPERIENCE_API,
             data=json.dumps(data),
             headers=headers,
         )
         if response.status_code == 201:
             logger.info("Talpa product created")
-            data = response.json()
-            self.talpa_product_id = data["productId"]
-            self.save()
-        else:
-            logger.error(
-                "Failed to create Talpa product. "
-                f"Error: {response.status_code} {response.reason}. "
-                f"Detail: {response.text}"
-            )
-            raise CreateTalpaProductError(
-                "Cannot create Talpa Product. "
-                f"Error: {response.status_code} {response.reason}."
-            )
+            return response.json()["productId"]
+
+        logger.error(
+            "Failed to create Talpa product. "
+            f"Error: {response.status_code} {response.reason}. "
+            f"Detail: {response.text}"
+        )
+        raise CreateTalpaProductError(
+            "Cannot create Talpa Product. "
+            f"Error: {response.status_code} {response.reason}."
+        )
+
+    def create_talpa_product(self):
+        if self.talpa_product_id:
+            logger.warning("Talpa product has been created already")
+            return
+
+        self.talpa_product_id = self.request_talpa_product_id(
+            self.get_talpa_product_data()
+        )
+        self.save(update_fields=["talpa_product_id", "modified_at"])
@@ -0,0 +1,76 @@
+from django.db import connection, models
+from django.utils.translation import gettext_lazy as _
+
+
+class StatisticsManager(models.Manager):
+    def refresh(self):
+        """Refresh the materialized view backing the statistics model
+
+        The views have a unique index so the refresh can be run
+        concurrently without blocking the readers.
+        """
+        table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {table}")
+
+
+class PermitStatistics(models.Model):
+    """Number of permits per zone, status and contract type"""
+
+    id = models.CharField(primary_key=True, max_length=128)
+    zone_id = models.UUIDField(_("Zone id"))
+    zone_name = models.CharField(_("Zone name"), max_length=128)
+    status = models.CharField(_("Status"), max_length=32)
+    contract_type = models.CharField(_("Contract type"), max_length=16)
+    permit_count = models.IntegerField(_("Permit count"))
+
+    objects = StatisticsManager()
+
+    class Meta:
+        managed = False
+        db_table = "parking_permits_permit_statistics"
+        ordering = ["zone_name", "status", "contract_type"]
+        verbose_name = _("Permit statistics")
+        verbose_name_plural = _("Permit statistics")
+
+
+class RevenueStatistics(models.Model):
+    """Revenue of the confirmed orders per month and zone"""
+
+    id = models.CharField(primary_key=True, max_length=128)
+    month = models.DateField(_("Month"))
+    zone_id = models.UUIDField(_("Zone id"))
+    zone_name = models.CharField(_("Zone name"), max_length=128)
+    order_item_count = models.IntegerField(_("Order item count"))
+    total_price = models.DecimalField(_("Total price"), max_digits=12, decimal_places=2)
+    total_price_vat = models.DecimalField(
+        _("Total price VAT"), max_digits=12, decimal_places=2
+    )
+
+    objects = StatisticsManager()
+
+    class Meta:
+        managed = False
+        db_table = "parking_permits_revenue_statistics"
+        ordering = ["-month", "zone_name"]
+        verbose_name = _("Revenue statistics")
+        verbose_name_plural = _("Revenue statistics")
+
+
+class RefundStatistics(models.Model):
+    """Number and total amount of refunds per status"""
+
+    status = models.CharField(_("Status"), max_length=32, primary_key=True)
+    refund_count = models.IntegerField(_("Refund count"))
+    total_amount = models.DecimalField(
+        _("Total amount"), max_digits=12, decimal_places=2
+    )
+
+    objects = StatisticsManager()
+
+    class Meta:
+        managed = False
+        db_table = "parking_permits_refund_statistics"
+        ordering = ["status"]
+        verbose_name = _("Refund statistics")
+        verbose_name_plural = _("Refund statistics")
@@ -123,6 +123,18 @@ class Vehicle(TimestampedModelMixin, UUIDPrimaryKeyMixin):
             )
         except LowEmissionCriteria.DoesNotExist:
             return False
+        return self.meets_low_emission_criteria(le_criteria)
+
+    def meets_low_emission_criteria(self, le_criteria):
+        """Check the vehicle against already loaded low emission criteria
+
+        Used when the criteria are shared by many vehicles, e.g. in batch
+        runs, to avoid a criteria query per vehicle.
+        """
+        if self.power_type == VehiclePowerType.ELECTRIC:
+            return True
+        if le_criteria is None:
+            return False
 
         if (
             not self.euro_class
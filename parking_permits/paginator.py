@@ -1,4 +1,115 @@
-from django.core.paginator import Paginator
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+
+class CountMode:
+    # exact count on every request
+    EXACT = "EXACT"
+    # exact count, cached per normalized query for a short while
+    CACHED = "CACHED"
+    # planner estimate for large unfiltered lists, cached exact count otherwise
+    ESTIMATE = "ESTIMATE"
+    # no count at all, only tells whether there are more pages
+    NONE = "NONE"
+
+
+class CountingPaginator(Paginator):
+    count_cache_timeout = 60
+    # below this many rows the estimate is unreliable and the exact count is cheap
+    estimate_threshold = 10000
+
+    def __init__(self, object_list, per_page, count_mode=CountMode.EXACT, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_mode = count_mode
+
+    @cached_property
+    def estimated_count(self):
+        """Return the planner estimate if it is used as the count, else None"""
+        if self.count_mode != CountMode.ESTIMATE:
+            return None
+        estimate = self._get_estimated_count()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return None
+
+    @cached_property
+    def count(self):
+        if self.estimated_count is not None:
+            return self.estimated_count
+        if self.count_mode in (CountMode.ESTIMATE, CountMode.CACHED):
+            return self._get_cached_count()
+        return super().count
+
+    def _get_count_cache_key(self):
+        # ordering does not affect the count, so it is left out of the key
+        sql, params = self.object_list.order_by().query.sql_with_params()
+        digest = hashlib.sha256(f"{sql}{params}".encode("utf-8")).hexdigest()
+        return f"paginator-count:{digest}"
+
+    def _get_cached_count(self):
+        key = self._get_count_cache_key()
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def _get_estimated_count(self):
+        qs = self.object_list
+        if qs.query.where:
+            # the planner estimate is only used for unfiltered lists
+            return None
+        with connections[qs.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [qs.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] > 0 else None
+
+
+class UncountedPage:
+    """Page that fetches one extra row to find out if there are more pages"""
+
+    def __init__(self, qs, number, page_size):
+        # validated like Paginator.validate_number, minus the upper bound
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        self.number = number
+        self.page_size = page_size
+        offset = (number - 1) * page_size
+        objects = list(qs[offset : offset + page_size + 1])
+        self._has_next = len(objects) > page_size
+        self.object_list = objects[:page_size]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.page_size + 1
+
+    def end_index(self):
+        return (self.number - 1) * self.page_size + len(self.object_list)
 
 
 class QuerySetPaginator:
@@ -6,9 +117,21 @@ class QuerySetPaginator:
 
     def __init__(self, qs, page_input):
         page_size = page_input.get("page_size", self.default_page_size)
-        self.paginator = Paginator(qs, page_size)
         page_index = page_input.get("page", 1)
-        self.page = self.paginator.page(page_index)
+        self.count_mode = page_input.get("count_mode") or CountMode.EXACT
+        if self.count_mode == CountMode.NONE:
+            self.paginator = None
+            self.page = UncountedPage(qs, page_index, page_size)
+        else:
+            self.paginator = CountingPaginator(
+                qs, page_size, count_mode=self.count_mode
+            )
+            if self.paginator.estimated_count is not None:
+                # the estimate may be below the real count until the next
+                # ANALYZE, so the page is not checked against it
+                self.page = UncountedPage(qs, page_index, page_size)
+            else:
+                self.page = self.paginator.page(page_index)
 
     @property
     def next_page(self):
@@ -28,8 +151,8 @@ class QuerySetPaginator:
             "next": self.next_page,
             "prev": self.prev_page,
             "page": self.page.number,
-            "num_pages": self.paginator.num_pages,
+            "num_pages": self.paginator.num_pages if self.paginator else None,
             "start_index": self.page.start_index(),
             "end_index": self.page.end_index(),
-            "count": self.paginator.count,
+            "count": self.paginator.count if self.paginator else None,
         }
@@ -17,9 +17,10 @@ from project.settings import BASE_DIR
 from .customer_permit import CustomerPermit
 from .decorators import is_authenticated
 from .exceptions import AddressError, ObjectNotFound, ParkingZoneError
-from .models import Address, Customer, Refund
+from .models import Address, Customer, PermitEvent, PermitMonthlyPrice, Refund
 from .models.order import Order, OrderStatus
 from .models.parking_permit import ParkingPermit, ParkingPermitStatus
+from .models.permit_event import PermitEventType
 from .services.hel_profile import HelsinkiProfile
 from .services.kmo import get_address_detail_from_kmo
 from .talpa.order import TalpaOrderManager
@@ -278,5 +279,11 @@ def resolve_change_address(_, info, address_id, iban=None):
     # asking permit price for next month
     open_ended_permits = permits.open_ended()
     open_ended_permits.update(parking_zone=new_zone)
+    # queryset updates bypass the model signals
+    PermitMonthlyPrice.objects.invalidate(permit__in=permits)
+    PermitEvent.objects.record_many(
+        PermitEventType.ZONE_CHANGED,
+        [permit.id for permit in permits if permit.parking_zone_id != new_zone.id],
+    )
 
     return response
@@ -0,0 +1,140 @@
+"""Scheduled jobs
+
+The jobs run through run_job, either from the crontab installed by
+django-crontab or from the run_scheduler command. A job holds a Postgres
+advisory lock while it runs, so it never overlaps itself even when it is
+started on several nodes, and every run is recorded as a JobRun.
+
+A resumable job is called with its JobRun. It saves its progress with
+JobRun.checkpoint, and a run following a failed run starts from the
+cursor of the failed run.
+"""
+import hashlib
+import logging
+import traceback
+from dataclasses import dataclass
+from typing import Callable
+
+from django.db import connection
+
+from parking_permits import cron
+from parking_permits.models import JobRun
+
+logger = logging.getLogger("db")
+
+
+@dataclass
+class Job:
+    func: Callable
+    resumable: bool = False
+
+
+JOBS = {
+    "automatic_expiration_of_permits": Job(cron.automatic_expiration_of_permits),
+    "automatic_remove_obsolete_customer_data": Job(
+        cron.automatic_remove_obsolete_customer_data, resumable=True
+    ),
+    "refresh_statistics": Job(cron.refresh_statistics),
+    "prebill_open_ended_permits": Job(cron.prebill_open_ended_permits),
+    "deliver_outbox_events": Job(cron.deliver_outbox_events),
+    "reconcile_parkkihubi_permits": Job(cron.reconcile_parkkihubi_permits),
+    "prune_permit_events": Job(cron.prune_permit_events),
+    "prune_job_runs": Job(cron.prune_job_runs),
+}
+
+CRON_FIELD_RANGES = (
+    (0, 59),  # minute
+    (0, 23),  # hour
+    (1, 31),  # day of month
+    (1, 12),  # month
+    (0, 7),  # day of week, both 0 and 7 are Sunday
+)
+
+
+def get_lock_key(job_name):
+    """Return the advisory lock key of the job as a signed 64-bit integer"""
+    digest = hashlib.sha256(f"parking_permits.job.{job_name}".encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def get_row_count(result):
+    if isinstance(result, bool):
+        return None
+    if isinstance(result, int):
+        return result
+    if isinstance(result, (list, tuple, set)):
+        return len(result)
+    return None
+
+
+def run_job(job_name):
+    """Run the job unless it is already running
+
+    Returns:
+        The JobRun of the run, or None if the job was already running.
+    """
+    job = JOBS[job_name]
+    key = get_lock_key(job_name)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+        (locked,) = cursor.fetchone()
+    if not locked:
+        logger.info(f"Job {job_name} is already running, skipping the run")
+        return None
+
+    run = None
+    try:
+        run = JobRun.objects.start(job_name)
+        try:
+            result = job.func(run) if job.resumable else job.func()
+        except Exception:
+            logger.error(f"Job {job_name} failed", exc_info=True)
+            run.fail(traceback.format_exc())
+        else:
+            run.finish(get_row_count(result))
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+    return run
+
+
+def parse_cron_field(field, min_value, max_value):
+    """Return the set of values matched by a crontab field like "*/15" or "1-5" """
+    values = set()
+    for item in field.split(","):
+        item_range, _, step = item.partition("/")
+        if item_range == "*":
+            start, end = min_value, max_value
+        elif "-" in item_range:
+            start, end = (int(value) for value in item_range.split("-"))
+        else:
+            start = int(item_range)
+            end = max_value if step else start
+        if start < min_value or end > max_value:
+            raise ValueError(f"Invalid crontab field {field}")
+        values.update(range(start, end + 1, int(step or 1)))
+    return values
+
+
+def is_due(schedule, dt):
+    """Return whether the crontab schedule matches the minute of dt"""
+    fields = schedule.split()
+    if len(fields) != 5:
+        raise ValueError(f"Invalid crontab schedule {schedule}")
+    minutes, hours, days, months, weekdays = (
+        parse_cron_field(field, *value_range)
+        for field, value_range in zip(fields, CRON_FIELD_RANGES)
+    )
+    if 7 in weekdays:
+        weekdays.add(0)
+    weekday = (dt.weekday() + 1) % 7
+    day_matches = dt.day in days
+    weekday_matches = weekday in weekdays
+    # like cron, either of the restricted day fields may match
+    if fields[2] != "*" and fields[4] != "*":
+        day_matches = day_matches or weekday_matches
+    else:
+        day_matches = day_matches and weekday_matches
+    return (
+        dt.minute in minutes and dt.hour in hours and dt.month in months and day_matches
+    )
@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from parking_permits.exceptions import IntegrationUnavailable
+
+logger = logging.getLogger("db")
+
+# server errors that are worth retrying for idempotent requests
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitBreaker:
+    """Stop calling an upstream that keeps failing
+
+    After failure_threshold consecutive failures the circuit opens and
+    the calls fail fast until reset_timeout seconds have passed. Then a
+    single trial call is let through, and the circuit closes again if it
+    succeeds.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_count = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def before_request(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise IntegrationUnavailable(
+                    f"Integration {self.name} is unavailable, calls are paused"
+                )
+            # let one trial call through and keep the others failing fast
+            self.opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Integration {self.name} recovered")
+            self.failure_count = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            if self.failure_count >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(
+                        f"Integration {self.name} failed {self.failure_count} "
+                        "times in a row, pausing calls"
+                    )
+                self.opened_at = time.monotonic()
+
+
+class RateLimiter:
+    """Space out the calls so that at most rate calls start per second
+
+    The limiter is shared by the threads of a batch run, each of which
+    calls wait() before sending its request.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.next_call_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            call_at = max(self.next_call_at, now)
+            self.next_call_at = call_at + self.interval
+        if call_at > now:
+            time.sleep(call_at - now)
+
+
+class IntegrationClient:
+    """HTTP client for a single upstream
+
+    The client keeps a pool of keep-alive connections, applies the
+    default timeouts, retries idempotent requests with backoff and stops
+    calling the upstream when it keeps failing.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.timeout = (
+            settings.INTEGRATION_CONNECT_TIMEOUT,
+            settings.INTEGRATION_READ_TIMEOUT,
+        )
+        self.circuit_breaker = CircuitBreaker(
+            name,
+            settings.INTEGRATION_CIRCUIT_FAILURE_THRESHOLD,
+            settings.INTEGRATION_CIRCUIT_RESET_TIMEOUT,
+        )
+        self.session = self._create_session()
+
+    def _create_session(self):
+        retry = Retry(
+            total=settings.INTEGRATION_MAX_RETRIES,
+            backoff_factor=settings.INTEGRATION_RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.INTEGRATION_POOL_SIZE,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, method, url, **kwargs):
+        self.circuit_breaker.before_request()
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            logger.error(f"Request to {self.name} failed: {e}")
+            self.circuit_breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Return the shared client of the named upstream"""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = IntegrationClient(name)
+        return _clients[name]
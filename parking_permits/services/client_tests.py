@@ -0,0 +1,67 @@
+import time
+
+import pytest
+import requests
+import requests_mock
+
+from parking_permits.exceptions import IntegrationUnavailable
+from parking_permits.services.client import (
+    CircuitBreaker,
+    IntegrationClient,
+    RateLimiter,
+)
+
+URL = "http://upstream.test/resource"
+
+
+@pytest.fixture
+def client(settings):
+    settings.INTEGRATION_CIRCUIT_FAILURE_THRESHOLD = 2
+    settings.INTEGRATION_CIRCUIT_RESET_TIMEOUT = 60
+    return IntegrationClient("test")
+
+
+def test_default_timeout_is_applied(client, settings):
+    with requests_mock.Mocker() as mock:
+        mock.get(URL, text="ok")
+        client.get(URL)
+        assert mock.last_request.timeout == (
+            settings.INTEGRATION_CONNECT_TIMEOUT,
+            settings.INTEGRATION_READ_TIMEOUT,
+        )
+
+
+def test_circuit_opens_after_consecutive_failures(client):
+    with requests_mock.Mocker() as mock:
+        mock.get(URL, status_code=500)
+        client.get(URL)
+        client.get(URL)
+        with pytest.raises(IntegrationUnavailable):
+            client.get(URL)
+        assert mock.call_count == 2
+
+
+def test_connection_errors_count_as_failures(client):
+    with requests_mock.Mocker() as mock:
+        mock.get(URL, exc=requests.ConnectionError)
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                client.get(URL)
+        assert client.circuit_breaker.is_open
+
+
+def test_circuit_closes_after_successful_trial_call():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.is_open
+    breaker.before_request()
+    breaker.record_success()
+    assert not breaker.is_open
+
+
+def test_rate_limiter_spaces_out_calls():
+    limiter = RateLimiter(rate=50)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - started >= 0.09
@@ -3,12 +3,19 @@ import json
 import logging
 import re
 
-import requests
 from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
 
 from parking_permits.exceptions import DVVIntegrationError
-from parking_permits.models import ParkingZone
+from parking_permits.models import Address, ParkingZone
+from parking_permits.services.client import get_client
 from parking_permits.services.kmo import get_address_detail_from_kmo
+from parking_permits.utils import (
+    decrypt_cache_data,
+    encrypt_cache_data,
+    get_hashed_cache_key,
+)
 
 logger = logging.getLogger("db")
 
@@ -45,17 +52,92 @@ def parse_address(address):
     return m.group(1), m.group(2)
 
 
+def _get_person_cache_key(hetu):
+    # the national id number must not end up in the cache as plain text
+    return get_hashed_cache_key("dvv-person", hetu)
+
+
+def get_cached_person_data(hetu):
+    token = cache.get(_get_person_cache_key(hetu))
+    if token is None:
+        return None
+    return decrypt_cache_data(token)
+
+
+def cache_person_data(hetu, person_data):
+    token = encrypt_cache_data(person_data)
+    cache.set(_get_person_cache_key(hetu), token, settings.DVV_CACHE_TIMEOUT)
+
+
+def _get_local_address_detail(street_name, street_number):
+    """Return the address detail from an address already saved locally"""
+    address = (
+        Address.objects.filter(
+            street_name=street_name,
+            street_number=street_number,
+            city__iexact="Helsinki",
+            location__isnull=False,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if not address:
+        return None
+    return {
+        "street_name_sv": address.street_name_sv,
+        "city_sv": address.city_sv,
+        "location": address.location,
+        "zone_id": address._zone_id,
+    }
+
+
+def _get_geocoded_address_detail(street_name, street_number):
+    """Return the address detail from KMO, cached as the geocode rarely changes"""
+    # the street names contain spaces and non-ASCII characters, which
+    # are not valid in memcached keys
+    cache_key = get_hashed_cache_key("kmo-address", f"{street_name}:{street_number}")
+    address_detail = cache.get(cache_key)
+    if address_detail is None:
+        kmo_detail = get_address_detail_from_kmo(street_name, street_number)
+        try:
+            zone = ParkingZone.objects.get_for_location(kmo_detail["location"])
+        except ParkingZone.DoesNotExist:
+            zone = None
+        address_detail = {
+            "street_name_sv": kmo_detail["street_name_sv"],
+            "city_sv": kmo_detail["city_sv"],
+            "location": kmo_detail["location"].coords,
+            "zone_id": zone.id if zone else None,
+        }
+        cache.set(cache_key, address_detail, settings.KMO_ADDRESS_CACHE_TIMEOUT)
+    return {
+        **address_detail,
+        "location": Point(*address_detail["location"], srid=settings.SRID),
+    }
+
+
+def get_address_detail(street_name, street_number):
+    address_detail = _get_local_address_detail(
+        street_name, street_number
+    ) or _get_geocoded_address_detail(street_name, street_number)
+    zone_id = address_detail.pop("zone_id")
+    if zone_id:
+        zone = ParkingZone.objects.filter(id=zone_id).first()
+    else:
+        try:
+            zone = ParkingZone.objects.get_for_location(address_detail["location"])
+        except ParkingZone.DoesNotExist:
+            zone = None
+    return address_detail, zone
+
+
 def format_address(address_data):
     # DVV combines the street name, street number and apartment
     # building number together in a single string. We only need
     # to use the street name and street number
 
     street_name, street_number = parse_address(address_data["LahiosoiteS"])
-    address_detail = get_address_detail_from_kmo(street_name, street_number)
-    try:
-        zone = ParkingZone.objects.get_for_location(address_detail["location"])
-    except ParkingZone.DoesNotExist:
-        zone = None
+    address_detail, zone = get_address_detail(street_name, street_number)
 
     return {
         **address_detail,
@@ -75,12 +157,17 @@ def is_valid_address(address):
     )
 
 
-def get_person_info(hetu):
+def get_person_data(hetu):
+    """Return the raw person data from DVV, using the cache when possible"""
+    person_data = get_cached_person_data(hetu)
+    if person_data is not None:
+        return person_data
+
     data = get_request_data(hetu)
     headers = get_request_headers()
-    response = requests.post(
+    response = get_client("dvv").post(
         settings.DVV_PERSONAL_INFO_URL,
-        json.dumps(data),
+        data=json.dumps(data),
         headers=headers,
     )
     if not response.ok:
@@ -91,11 +178,20 @@ def get_person_info(hetu):
     # DVV does not return a 404 code if the given hetu
     # is not found, so we need to check the response
     # content
-    person_info = response_data.get("Henkilo")
-    if not person_info:
+    person_data = response_data.get("Henkilo")
+    if not person_data:
         logger.error(f"Person info not found: {hetu}")
         return None
 
+    cache_person_data(hetu, person_data)
+    return person_data
+
+
+def get_person_info(hetu):
+    person_info = get_person_data(hetu)
+    if not person_info:
+        return None
+
     last_name = person_info["NykyinenSukunimi"]["Sukunimi"]
     first_name = person_info["NykyisetEtunimet"]["Etunimet"]
     permanent_address = person_info["VakinainenKotimainenLahiosoite"]
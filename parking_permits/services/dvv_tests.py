@@ -0,0 +1,41 @@
+import pytest
+import requests_mock
+from django.core.cache import cache
+
+from parking_permits.services.dvv import (
+    _get_person_cache_key,
+    cache_person_data,
+    get_cached_person_data,
+    get_person_data,
+)
+
+HETU = "010101-123A"
+PERSON_DATA = {
+    "NykyinenSukunimi": {"Sukunimi": "Meikäläinen"},
+    "NykyisetEtunimet": {"Etunimet": "Matti"},
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_person_data_is_cached_encrypted():
+    cache_person_data(HETU, PERSON_DATA)
+
+    raw_value = cache.get(_get_person_cache_key(HETU))
+    assert b"Meik" not in raw_value
+    assert HETU not in _get_person_cache_key(HETU)
+    assert get_cached_person_data(HETU) == PERSON_DATA
+
+
+def test_person_data_is_fetched_from_dvv_only_once(settings):
+    settings.DVV_PERSONAL_INFO_URL = "http://dvv.test/person"
+    with requests_mock.Mocker() as mock:
+        mock.post(settings.DVV_PERSONAL_INFO_URL, json={"Henkilo": PERSON_DATA})
+        assert get_person_data(HETU) == PERSON_DATA
+        assert get_person_data(HETU) == PERSON_DATA
+        assert mock.call_count == 1
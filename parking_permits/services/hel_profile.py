@@ -1,8 +1,8 @@
-import requests
 from ariadne import load_schema_from_path
 from django.conf import settings
 
 from parking_permits.models.common import SourceSystem
+from parking_permits.services.client import get_client
 from parking_permits.services.kmo import parse_street_name_and_number
 from project.settings import BASE_DIR
 
@@ -70,7 +70,7 @@ class HelsinkiProfile:
 
     def _get_profile(self):
         api_token = self.request.headers.get("X-Authorization")
-        response = requests.get(
+        response = get_client("helsinki_profile").get(
             settings.OPEN_CITY_PROFILE_GRAPHQL_API,
             json={"query": helsinki_profile_query},
             headers={"Authorization": api_token},
@@ -1,11 +1,12 @@
 import re
 
-import requests
 import xmltodict
 from django.conf import settings
 from django.contrib.gis.geos import GEOSGeometry
 from rest_framework import status
 
+from parking_permits.services.client import get_client
+
 
 def get_wfs_result(street_name="", street_number=0):
     street_address = f"katunimi=''{street_name}'' AND osoitenumero=''{street_number}''"
@@ -30,7 +31,7 @@ def get_wfs_result(street_name="", street_number=0):
         "VERSION": "2.0.0",
     }
 
-    response = requests.get(settings.KMO_URL, params=params)
+    response = get_client("kmo").get(settings.KMO_URL, params=params)
 
     if response.status_code != status.HTTP_200_OK:
         xml_response = xmltodict.parse(response.content)
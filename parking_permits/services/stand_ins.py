@@ -0,0 +1,224 @@
+"""Local stand-ins for the Talpa, Parkkihubi and Traficom APIs
+
+The stand-ins answer with the payloads that the integration code of this
+project produces and parses, so checkout can be load-tested without the
+real services. All of them are served from one threaded HTTP server:
+
+    /talpa/product/     Talpa product experience API
+    /talpa/order/       Talpa order experience API
+    /parkkihubi/permit/ Parkkihubi operator permit endpoint
+    /traficom/          Traficom vehicle and driving licence queries
+
+Latency and errors can be injected separately for each upstream.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("db")
+
+UPSTREAMS = ("talpa", "parkkihubi", "traficom")
+
+TRAFICOM_VEHICLE_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<kehys>
+  <sanoma>
+    <ajoneuvonTiedot>
+      <ajoneuvoluokka>M1</ajoneuvoluokka>
+      <merkkiSelvakielinen>Toyota</merkkiSelvakielinen>
+      <mallimerkinta>Corolla</mallimerkinta>
+    </ajoneuvonTiedot>
+    <tunnus>
+      <valmistenumero>{serial_number}</valmistenumero>
+    </tunnus>
+    <ajoneuvonPerustiedot>
+      <mkAjanLoppupvm>2030-12-31</mkAjanLoppupvm>
+    </ajoneuvonPerustiedot>
+    <moottori>
+      <kayttovoima>01</kayttovoima>
+      <kayttovoimat>
+        <kayttovoima>
+          <kulutukset>
+            <kulutus>
+              <kulutuslaji>10</kulutuslaji>
+              <maara>{emission}</maara>
+            </kulutus>
+          </kulutukset>
+        </kayttovoima>
+      </kayttovoimat>
+    </moottori>
+    <massa>
+      <teknSuurSallKokmassa>1600</teknSuurSallKokmassa>
+    </massa>
+    <omistajatHaltijat>
+      <omistajaHaltija>
+        <omistajanTunnus>{owner_id}</omistajanTunnus>
+      </omistajaHaltija>
+    </omistajatHaltijat>
+  </sanoma>
+</kehys>
+"""
+
+TRAFICOM_DRIVING_LICENCE_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<kehys>
+  <sanoma>
+    <ajokorttiluokkatieto>
+      <ajokortinMyontamisPvm>2010-01-01</ajokortinMyontamisPvm>
+      <ajooikeusluokat>
+        <ajooikeusluokka>B</ajooikeusluokka>
+      </ajooikeusluokat>
+      <viimeisinajooikeus>
+        <ajooikeusluokka>
+          <ajooikeusluokka>B</ajooikeusluokka>
+        </ajooikeusluokka>
+      </viimeisinajooikeus>
+    </ajokorttiluokkatieto>
+  </sanoma>
+</kehys>
+"""
+
+
+def get_owner_id(registration_number):
+    """Return the owner the Traficom stand-in reports for the vehicle
+
+    Load tests give their customers this national id number, so that the
+    customers pass the vehicle ownership check.
+    """
+    return f"SI-{registration_number}"
+
+
+@dataclass
+class UpstreamBehaviour:
+    """Injected latency (in seconds) and errors of a single upstream"""
+
+    latency: float = 0
+    jitter: float = 0
+    error_rate: float = 0
+    error_status: int = 503
+
+    def apply(self):
+        """Wait for the latency and return the error status to inject, if any"""
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < self.error_rate:
+            return self.error_status
+        return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "ParkingPermitsStandIn/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(f"Stand-in {self.address_string()} {format % args}")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def _dispatch(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        upstream, handler = self._get_handler(method)
+        if handler is None:
+            self._send_json(404, {"detail": "Not found"})
+            return
+
+        error_status = self.server.behaviours[upstream].apply()
+        if error_status:
+            self._send_json(error_status, {"detail": "Injected error"})
+            return
+        handler(body)
+
+    def _get_handler(self, method):
+        routes = (
+            ("POST", "/talpa/product/", "talpa", self._create_talpa_product),
+            ("POST", "/talpa/order/", "talpa", self._create_talpa_order),
+            ("POST", "/parkkihubi/permit/", "parkkihubi", self._create_permit),
+            ("PATCH", "/parkkihubi/permit/", "parkkihubi", self._update_permit),
+            ("POST", "/traficom/", "traficom", self._query_traficom),
+        )
+        for route_method, prefix, upstream, handler in routes:
+            if method == route_method and self.path.startswith(prefix):
+                return upstream, handler
+        return None, None
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data).encode("utf-8"), "application/json")
+
+    def _create_talpa_product(self, body):
+        self._send_json(201, {"productId": str(uuid.uuid4())})
+
+    def _create_talpa_order(self, body):
+        order = json.loads(body)
+        order_id = str(uuid.uuid4())
+        items = [
+            {**item, "orderId": order_id, "orderItemId": str(uuid.uuid4())}
+            for item in order.get("items", [])
+        ]
+        is_subscription = any("periodUnit" in item for item in items)
+        checkout_url = f"http://{self.headers.get('Host')}/talpa/checkout/{order_id}"
+        self._send_json(
+            201,
+            {
+                **order,
+                "orderId": order_id,
+                "subscriptionId": str(uuid.uuid4()) if is_subscription else None,
+                "checkoutUrl": checkout_url,
+                "receiptUrl": f"{checkout_url}/receipt",
+                "items": items,
+            },
+        )
+
+    def _create_permit(self, body):
+        self._send_json(201, json.loads(body))
+
+    def _update_permit(self, body):
+        self._send_json(200, json.loads(body))
+
+    def _query_traficom(self, body):
+        query = ET.fromstring(body)
+        registration_number = query.findtext(".//rekisteritunnus")
+        if registration_number:
+            response = TRAFICOM_VEHICLE_RESPONSE.format(
+                serial_number=f"SN{registration_number}",
+                emission=random.randint(40, 200),
+                owner_id=get_owner_id(registration_number),
+            )
+        else:
+            response = TRAFICOM_DRIVING_LICENCE_RESPONSE
+        self._send(200, response.encode("utf-8"), "application/xml")
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, behaviours=None):
+        super().__init__(address, StandInHandler)
+        self.behaviours = {upstream: UpstreamBehaviour() for upstream in UPSTREAMS}
+        self.behaviours.update(behaviours or {})
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread, e.g. from tests"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
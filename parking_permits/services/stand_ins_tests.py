@@ -0,0 +1,61 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from parking_permits.services.stand_ins import (
+    StandInServer,
+    UpstreamBehaviour,
+    get_owner_id,
+)
+from parking_permits.services.talpa import get_meta_value
+from parking_permits.services.traficom import Traficom
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(("127.0.0.1", 0))
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_traficom_vehicle_response_is_parsed(server):
+    with patch.object(Traficom, "url", f"{server.base_url}/traficom/"):
+        vehicle_details = Traficom()._parse_vehicle_details("ABC-123")
+
+    assert vehicle_details["registration_number"] == "ABC-123"
+    assert vehicle_details["users"] == [get_owner_id("ABC-123")]
+    assert vehicle_details["vehicle_class"] == "M1"
+    assert vehicle_details["weight"] == 1600
+
+
+def test_traficom_driving_licence_response_is_parsed(server):
+    with patch.object(Traficom, "url", f"{server.base_url}/traficom/"):
+        licence_details = Traficom()._parse_driving_licence_details("010101-123A")
+
+    assert licence_details == {"categories": ["B"], "issue_date": "2010-01-01"}
+
+
+def test_talpa_order_items_get_ids(server):
+    meta = [{"key": "sourceOrderItemId", "value": "1"}]
+    response = requests.post(
+        f"{server.base_url}/talpa/order/",
+        data=json.dumps({"items": [{"meta": meta, "periodUnit": "monthly"}]}),
+    )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["orderId"] and data["subscriptionId"] and data["checkoutUrl"]
+    assert get_meta_value(data["items"][0]["meta"], "sourceOrderItemId") == "1"
+    assert data["items"][0]["orderItemId"]
+
+
+def test_errors_are_injected(server):
+    server.behaviours["parkkihubi"] = UpstreamBehaviour(error_rate=1)
+
+    response = requests.post(f"{server.base_url}/parkkihubi/permit/", data="{}")
+
+    assert response.status_code == 503
@@ -1,8 +1,8 @@
 import logging
 import xml.etree.ElementTree as ET
 
-import requests
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone as tz
 from django.utils.translation import gettext as _
 
@@ -14,6 +14,12 @@ from parking_permits.models.vehicle import (
     VehicleClass,
     VehiclePowerType,
 )
+from parking_permits.services.client import get_client
+from parking_permits.utils import (
+    decrypt_cache_data,
+    encrypt_cache_data,
+    get_hashed_cache_key,
+)
 
 logger = logging.getLogger("db")
 
@@ -47,11 +53,59 @@ VEHICLE_SUB_CLASS_MAPPER = {
 }
 
 
+def _get_driving_licence_cache_key(hetu):
+    # the national id number must not end up in the cache as plain text
+    return get_hashed_cache_key("traficom-driving-licence", hetu)
+
+
+def _get_vehicle_cache_key(registration_number):
+    return f"traficom-vehicle:{registration_number}"
+
+
 class Traficom:
     url = settings.TRAFICOM_ENDPOINT
     headers = {"Content-type": "application/xml"}
 
     def fetch_vehicle_details(self, registration_number):
+        vehicle_details = self.get_vehicle_details(registration_number)
+        return self.save_vehicle_details(vehicle_details)
+
+    def get_vehicle_details(self, registration_number):
+        """Return the vehicle details from Traficom without saving them
+
+        Recently fetched details are reused from the cache, so checking
+        the vehicle again e.g. at checkout does not call Traficom. The
+        cached details are encrypted, as the users are national ids.
+        """
+        key = _get_vehicle_cache_key(registration_number)
+        token = cache.get(key)
+        vehicle_details = decrypt_cache_data(token) if token is not None else None
+        if vehicle_details is None:
+            vehicle_details = self._parse_vehicle_details(registration_number)
+            token = encrypt_cache_data(vehicle_details)
+            cache.set(key, token, settings.TRAFICOM_CACHE_TIMEOUT)
+        return vehicle_details
+
+    def save_vehicle_details(self, vehicle_details):
+        """Create or update the vehicle, writing only if the data changed"""
+        registration_number = vehicle_details["registration_number"]
+        vehicle = Vehicle.objects.filter(
+            registration_number=registration_number
+        ).first()
+        if vehicle is None:
+            return Vehicle.objects.create(**vehicle_details)
+
+        changed_fields = []
+        for name, value in vehicle_details.items():
+            value = Vehicle._meta.get_field(name).to_python(value)
+            if getattr(vehicle, name) != value:
+                setattr(vehicle, name, value)
+                changed_fields.append(name)
+        if changed_fields:
+            vehicle.save(update_fields=changed_fields + ["modified_at"])
+        return vehicle
+
+    def _parse_vehicle_details(self, registration_number):
         et = self._fetch_info(registration_number=registration_number)
         vehicle_detail = et.find(".//ajoneuvonTiedot")
 
@@ -116,19 +170,60 @@ class Traficom:
             "weight": int(weight.text),
             "registration_number": registration_number,
             "euro_class": 6,  # It will always be 6 class atm.
-            "emission": float(co2emission) if co2emission else None,
+            # truncated like the integer field does when saving, so the
+            # changed fields are compared with the stored value
+            "emission": int(float(co2emission)) if co2emission else None,
             "emission_type": emission_type,
             "serial_number": vehicle_serial_number.text,
             "last_inspection_date": last_inspection_date.text
             if last_inspection_date is not None
             else None,
         }
-        vehicle = Vehicle.objects.update_or_create(
-            registration_number=registration_number, defaults=vehicle_details
-        )
-        return vehicle[0]
+        return vehicle_details
 
     def fetch_driving_licence_details(self, hetu):
+        licence_details = self.get_driving_licence_details(hetu)
+        return {
+            "driving_classes": self.get_driving_classes(licence_details["categories"]),
+            "issue_date": licence_details["issue_date"],
+        }
+
+    def get_driving_licence_details(self, hetu):
+        """Return the driving licence categories and issue date from Traficom
+
+        Recently fetched details are reused from the cache.
+        """
+        key = _get_driving_licence_cache_key(hetu)
+        licence_details = cache.get(key)
+        if licence_details is None:
+            licence_details = self._parse_driving_licence_details(hetu)
+            cache.set(key, licence_details, settings.TRAFICOM_CACHE_TIMEOUT)
+        return licence_details
+
+    def get_driving_classes(self, categories):
+        """Return the driving classes of the categories, creating the missing ones"""
+        driving_classes = {
+            driving_class.identifier: driving_class
+            for driving_class in DrivingClass.objects.filter(identifier__in=categories)
+        }
+        missing_categories = [
+            category
+            for category in dict.fromkeys(categories)
+            if category not in driving_classes
+        ]
+        if missing_categories:
+            # a concurrent request may create the same classes meanwhile
+            DrivingClass.objects.bulk_create(
+                [DrivingClass(identifier=category) for category in missing_categories],
+                ignore_conflicts=True,
+            )
+            for driving_class in DrivingClass.objects.filter(
+                identifier__in=missing_categories
+            ):
+                driving_classes[driving_class.identifier] = driving_class
+        return [driving_classes[category] for category in categories]
+
+    def _parse_driving_licence_details(self, hetu):
         et = self._fetch_info(hetu=hetu)
         driving_licence_et = et.find(".//ajokorttiluokkatieto")
         if not driving_licence_et.find("ajooikeusluokat"):
@@ -144,13 +239,8 @@ class Traficom:
             for category in driving_licence_categories_et
         ]
 
-        driving_classes = []
-        for category in categories:
-            driving_class = DrivingClass.objects.get_or_create(identifier=category)
-            driving_classes.append(driving_class[0])
-
         return {
-            "driving_classes": driving_classes,
+            "categories": categories,
             "issue_date": driving_licence_et.find("ajokortinMyontamisPvm").text,
         }
 
@@ -190,7 +280,7 @@ class Traficom:
         </kehys>
         """
 
-        response = requests.post(
+        response = get_client("traficom").post(
             self.url,
             data=payload,
             headers=self.headers,
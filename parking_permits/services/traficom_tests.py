@@ -0,0 +1,58 @@
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+import pytest
+
+from parking_permits.models import Vehicle
+from parking_permits.services.traficom import Traficom
+
+REGISTRATION_NUMBER = "ABC-123"
+
+
+def get_vehicle_response(emission):
+    return ET.fromstring(
+        f"""
+        <vastaus>
+          <ajoneuvonTiedot>
+            <ajoneuvoluokka>M1</ajoneuvoluokka>
+            <merkkiSelvakielinen>Toyota</merkkiSelvakielinen>
+            <mallimerkinta>Prius</mallimerkinta>
+          </ajoneuvonTiedot>
+          <tunnus><valmistenumero>123456</valmistenumero></tunnus>
+          <moottori>
+            <kayttovoima>01</kayttovoima>
+            <kayttovoimat><kayttovoima><kulutukset><kulutus>
+              <kulutuslaji>4</kulutuslaji>
+              <maara>{emission}</maara>
+            </kulutus></kulutukset></kayttovoima></kayttovoimat>
+          </moottori>
+          <omistajatHaltijat><omistajaHaltija>
+            <omistajanTunnus>010101-123A</omistajanTunnus>
+          </omistajaHaltija></omistajatHaltijat>
+          <ajoneuvonPerustiedot>
+            <mkAjanLoppupvm>2030-01-01</mkAjanLoppupvm>
+          </ajoneuvonPerustiedot>
+          <massa><teknSuurSallKokmassa>1800</teknSuurSallKokmassa></massa>
+        </vastaus>
+        """
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("emission", ["95.6", "95.5", "95.0"])
+def test_fractional_emission_is_truncated(emission):
+    traficom = Traficom()
+    with patch.object(
+        Traficom, "_fetch_info", return_value=get_vehicle_response(emission)
+    ):
+        vehicle_details = traficom._parse_vehicle_details(REGISTRATION_NUMBER)
+    assert vehicle_details["emission"] == 95
+
+    vehicle = traficom.save_vehicle_details(vehicle_details)
+    vehicle = Vehicle.objects.get(pk=vehicle.pk)
+    assert vehicle.emission == 95
+    modified_at = vehicle.modified_at
+
+    traficom.save_vehicle_details(vehicle_details)
+    vehicle.refresh_from_db()
+    assert vehicle.modified_at == modified_at
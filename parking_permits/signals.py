@@ -0,0 +1,117 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import (
+    LowEmissionCriteria,
+    ParkingPermit,
+    ParkingZone,
+    PermitMonthlyPrice,
+    Product,
+    Vehicle,
+)
+
+PERMIT_PRICE_FIELDS = (
+    "parking_zone_id",
+    "vehicle_id",
+    "primary_vehicle",
+)
+VEHICLE_PRICE_FIELDS = (
+    "power_type",
+    "emission",
+    "emission_type",
+    "euro_class",
+)
+PRODUCT_PRICE_FIELDS = (
+    "zone_id",
+    "type",
+    "start_date",
+    "end_date",
+    "unit_price",
+    "vat",
+    "low_emission_discount",
+)
+PRICE_FIELDS = {
+    ParkingPermit: PERMIT_PRICE_FIELDS,
+    Vehicle: VEHICLE_PRICE_FIELDS,
+    Product: PRODUCT_PRICE_FIELDS,
+}
+
+
+def _get_price_values(instance):
+    # deferred fields are left out, so reading them does not query
+    return {
+        field: instance.__dict__[field]
+        for field in PRICE_FIELDS[type(instance)]
+        if field in instance.__dict__
+    }
+
+
+def _pop_changed_price_fields(instance, created, update_fields):
+    """Return the price fields changed since the instance was loaded
+
+    The loaded values are then reset to the saved values.
+    """
+    loaded_values = instance._loaded_price_values
+    instance._loaded_price_values = _get_price_values(instance)
+    if created:
+        return set()
+    fields = PRICE_FIELDS[type(instance)]
+    if update_fields is not None:
+        attnames = {instance._meta.get_field(name).attname for name in update_fields}
+        fields = [field for field in fields if field in attnames]
+    return {
+        field
+        for field in fields
+        if field not in loaded_values
+        or loaded_values[field] != instance.__dict__.get(field)
+    }
+
+
+@receiver(post_init, sender=ParkingPermit)
+@receiver(post_init, sender=Vehicle)
+@receiver(post_init, sender=Product)
+def store_loaded_price_values(sender, instance, **kwargs):
+    instance._loaded_price_values = _get_price_values(instance)
+
+
+@receiver(post_save, sender=ParkingPermit)
+def invalidate_permit_prices(sender, instance, created, update_fields, **kwargs):
+    if _pop_changed_price_fields(instance, created, update_fields):
+        PermitMonthlyPrice.objects.invalidate(permit=instance)
+
+
+@receiver(post_save, sender=Vehicle)
+def invalidate_vehicle_permit_prices(
+    sender, instance, created, update_fields, **kwargs
+):
+    if _pop_changed_price_fields(instance, created, update_fields):
+        PermitMonthlyPrice.objects.invalidate(permit__vehicle=instance)
+
+
+@receiver(post_save, sender=Product)
+def invalidate_zone_permit_prices(sender, instance, created, update_fields, **kwargs):
+    loaded_zone_id = instance._loaded_price_values.get("zone_id")
+    changed_fields = _pop_changed_price_fields(instance, created, update_fields)
+    if created or changed_fields:
+        zone_ids = {instance.zone_id}
+        if "zone_id" in changed_fields and loaded_zone_id is not None:
+            zone_ids.add(loaded_zone_id)
+        PermitMonthlyPrice.objects.invalidate(permit__parking_zone_id__in=zone_ids)
+
+
+@receiver(post_delete, sender=Product)
+def invalidate_deleted_product_prices(sender, instance, **kwargs):
+    PermitMonthlyPrice.objects.invalidate(permit__parking_zone_id=instance.zone_id)
+
+
+@receiver(post_save, sender=LowEmissionCriteria)
+@receiver(post_delete, sender=LowEmissionCriteria)
+def invalidate_all_permit_prices(sender, instance, **kwargs):
+    PermitMonthlyPrice.objects.invalidate()
+
+
+@receiver(post_save, sender=ParkingZone)
+@receiver(post_delete, sender=ParkingZone)
+def clear_zone_records(sender, instance, **kwargs):
+    # the other processes reload their records when they expire
+    ParkingZone.objects.clear_records()
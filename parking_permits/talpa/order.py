@@ -1,15 +1,16 @@
-import json
 import logging
 from collections import defaultdict
 
-import requests
+import orjson
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from parking_permits.exceptions import OrderCreationFailed
-from parking_permits.models.order import OrderType
+from parking_permits.models.order import OrderItem, OrderType
+from parking_permits.services.client import get_client
+from parking_permits.services.talpa import get_meta_value
 from parking_permits.utils import date_time_to_utc
 
 logger = logging.getLogger("db")
@@ -128,13 +129,23 @@ class TalpaOrderManager:
 
     @classmethod
     def _create_order_data(cls, order):
+        """Build the Talpa order payload
+
+        The order items are loaded together with their products, permits
+        and vehicles in a single query, and the order totals are summed in
+        the same pass over the items.
+        """
         items = []
-        order_items = order.order_items.all().select_related("product", "permit")
+        order_items = order.order_items.select_related("product", "permit__vehicle")
         order_items_by_permit = defaultdict(list)
+        total_price = total_price_net = total_price_vat = 0
         for order_item in order_items:
             order_items_by_permit[order_item.permit].append(order_item)
+            total_price += order_item.total_payment_price
+            total_price_net += order_item.total_payment_price_net
+            total_price_vat += order_item.total_payment_price_vat
 
-        for permit in set([item.permit for item in order_items]):
+        for permit in order_items_by_permit:
             order_items_of_single_permit = []
             for index, order_item in enumerate(order_items_by_permit[permit]):
                 if order_item.quantity:
@@ -158,9 +169,9 @@ class TalpaOrderManager:
         return {
             "namespace": settings.NAMESPACE,
             "user": str(order.customer.id),
-            "priceNet": float(order.total_payment_price_net),
-            "priceVat": float(order.total_payment_price_vat),
-            "priceTotal": float(order.total_payment_price),
+            "priceNet": float(total_price_net),
+            "priceVat": float(total_price_vat),
+            "priceTotal": float(total_price),
             "customer": customer,
             "items": items,
         }
@@ -169,8 +180,8 @@ class TalpaOrderManager:
     def send_to_talpa(cls, order):
         order_data = cls._create_order_data(order)
         logger.info(f"Sending order to talpa, order id: {order.id}")
-        response = requests.post(
-            cls.url, data=json.dumps(order_data), headers=cls.headers
+        response = get_client("talpa").post(
+            cls.url, data=orjson.dumps(order_data), headers=cls.headers
         )
         if response.status_code >= 300:
             logger.error(
@@ -188,14 +199,50 @@ class TalpaOrderManager:
             order.talpa_subscription_id = response_data.get("subscriptionId")
             order.talpa_checkout_url = response_data.get("checkoutUrl")
             order.talpa_receipt_url = response_data.get("receiptUrl")
-            order.save()
-            talpa_order_item_id_mapping = {
-                item["meta"][0]["value"]: item["orderItemId"]
-                for item in response_data.get("items")
-            }
-            for order_item in order.order_items.select_related("product"):
-                order_item.talpa_order_item_id = talpa_order_item_id_mapping.get(
-                    str(order_item.id)
-                )
-                order_item.save()
+            order.save(
+                update_fields=[
+                    "talpa_order_id",
+                    "talpa_subscription_id",
+                    "talpa_checkout_url",
+                    "talpa_receipt_url",
+                    "modified_at",
+                ]
+            )
+            cls._update_order_item_ids(order, response_data.get("items", []))
         return response_data.get("checkoutUrl")
+
+    @classmethod
+    def _update_order_item_ids(cls, order, response_items):
+        """Store the Talpa order item ids with a single bulk update
+
+        Every order item sent to Talpa, i.e. with a non-zero quantity,
+        should get an id. Missing and unknown ids are logged.
+        """
+        talpa_order_item_ids = {
+            get_meta_value(item.get("meta", []), "sourceOrderItemId"): item.get(
+                "orderItemId"
+            )
+            for item in response_items
+        }
+        order_items = order.order_items.only("id", "quantity", "talpa_order_item_id")
+        updated_items = []
+        missing_item_ids = []
+        for order_item in order_items:
+            talpa_order_item_id = talpa_order_item_ids.pop(str(order_item.id), None)
+            if talpa_order_item_id:
+                order_item.talpa_order_item_id = talpa_order_item_id
+                updated_items.append(order_item)
+            elif order_item.quantity:
+                missing_item_ids.append(str(order_item.id))
+
+        if missing_item_ids:
+            logger.error(
+                f"Talpa order item ids missing for order {order.id} items: "
+                f"{', '.join(missing_item_ids)}"
+            )
+        if talpa_order_item_ids:
+            logger.error(
+                f"Talpa returned unknown order items for order {order.id}: "
+                f"{', '.join(str(item_id) for item_id in talpa_order_item_ids)}"
+            )
+        OrderItem.objects.bulk_update(updated_items, ["talpa_order_item_id"])
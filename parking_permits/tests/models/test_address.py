@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.test import TestCase
+
+from parking_permits.models import Address
+from parking_permits.tests.factories.address import AddressFactory
+from parking_permits.tests.factories.zone import ParkingZoneFactory
+
+
+def generate_square(x, y, size=1.0):
+    polygon = Polygon(
+        ((x, y), (x + size, y), (x + size, y + size), (x, y + size), (x, y)),
+        srid=settings.SRID,
+    )
+    return MultiPolygon(polygon, srid=settings.SRID)
+
+
+class AddressZoneTestCase(TestCase):
+    def setUp(self):
+        self.zone_a = ParkingZoneFactory(name="A", location=generate_square(0, 0))
+        self.zone_b = ParkingZoneFactory(name="B", location=generate_square(1, 0))
+
+    def create_address(self, x, y):
+        return AddressFactory(_zone=None, location=Point(x, y, srid=settings.SRID))
+
+    def test_zone_is_assigned_on_creation(self):
+        self.assertEqual(self.create_address(0.5, 0.5)._zone, self.zone_a)
+        self.assertEqual(self.create_address(1, 0.5)._zone, self.zone_a)
+        self.assertIsNone(self.create_address(5, 5)._zone)
+
+    def test_reading_zone_does_not_write(self):
+        address_id = self.create_address(5, 5).id
+        address = Address.objects.get(id=address_id)
+        with self.assertNumQueries(0):
+            self.assertIsNone(address.zone)
+
+    def test_assign_zones_after_boundary_change(self):
+        inside_a = self.create_address(0.5, 0.5)
+        outside = self.create_address(2.5, 0.5)
+        self.zone_b.location = generate_square(2, 0)
+        self.zone_b.save()
+        self.zone_a.location = generate_square(10, 10)
+        self.zone_a.save()
+
+        self.assertEqual(Address.objects.assign_zones(), 2)
+
+        inside_a.refresh_from_db()
+        outside.refresh_from_db()
+        self.assertIsNone(inside_a.zone)
+        self.assertEqual(outside.zone, self.zone_b)
+        self.assertEqual(Address.objects.assign_zones(), 0)
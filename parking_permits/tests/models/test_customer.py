@@ -4,8 +4,11 @@ from django.test import TestCase
 from django.utils import timezone
 from freezegun import freeze_time
 
+from parking_permits.models import Customer, DrivingClass
 from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.services.traficom import Traficom
 from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.order import OrderFactory, OrderItemFactory
 from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
 
 
@@ -48,3 +51,59 @@ class TestCustomer(TestCase):
             ParkingPermitFactory(customer=customer, status=ParkingPermitStatus.VALID)
         with freeze_time(timezone.make_aware(datetime(2022, 12, 31, 0, 0, 1))):
             self.assertFalse(customer.can_be_deleted)
+
+
+class TestCustomerSerialization(TestCase):
+    def create_history(self, customer, count):
+        for _ in range(count):
+            permit = ParkingPermitFactory(customer=customer)
+            order = OrderFactory(customer=customer)
+            OrderItemFactory(order=order, permit=permit)
+            OrderItemFactory(order=order, permit=permit)
+
+    def serialize(self, customer):
+        return Customer.objects.for_serialization().get(pk=customer.pk).serialize()
+
+    def test_serialization_query_count_does_not_depend_on_history(self):
+        customer = CustomerFactory()
+        self.create_history(customer, 1)
+        # customer with addresses, orders, order items, products, permits
+        # and vehicles
+        with self.assertNumQueries(6):
+            self.serialize(customer)
+
+        self.create_history(customer, 5)
+        with self.assertNumQueries(6):
+            data = self.serialize(customer)
+
+        children = {child["key"]: child for child in data["children"]}
+        self.assertEqual(len(children["ORDERS"]["children"]), 6)
+        self.assertEqual(len(children["PERMITS"]["children"]), 6)
+
+
+class TestCustomerDrivingLicence(TestCase):
+    def setUp(self):
+        self.customer = CustomerFactory()
+        self.driving_classes = Traficom().get_driving_classes(["A", "B"])
+
+    def test_driving_licence_is_created(self):
+        driving_licence, created = self.customer.update_driving_licence(
+            {"driving_classes": self.driving_classes, "issue_date": "2010-01-01"}
+        )
+        self.assertTrue(created)
+        self.assertEqual(driving_licence.driving_classes.count(), 2)
+
+    def test_unchanged_driving_licence_is_not_written(self):
+        licence_details = {
+            "driving_classes": self.driving_classes,
+            "issue_date": "2010-01-01",
+        }
+        self.customer.update_driving_licence(licence_details)
+        customer = Customer.objects.get(id=self.customer.id)
+        # driving licence and its classes are only read
+        with self.assertNumQueries(2):
+            customer.update_driving_licence(licence_details)
+
+    def test_driving_classes_are_created_once(self):
+        Traficom().get_driving_classes(["A", "B", "C", "C"])
+        self.assertEqual(DrivingClass.objects.count(), 3)
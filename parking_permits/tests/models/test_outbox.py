@@ -0,0 +1,174 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from parking_permits.exceptions import ParkkihubiPermitError
+from parking_permits.models import OutboxEvent, ParkingPermit, ParkkihubiSyncState
+from parking_permits.models.outbox import (
+    OutboxEventStatus,
+    OutboxEventType,
+    get_payload_hash,
+)
+from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+
+
+class OutboxEventTestCase(TestCase):
+    def setUp(self):
+        self.permit = ParkingPermitFactory()
+
+    @patch.object(ParkingPermit, "create_parkkihubi_permit")
+    def test_deliver_sends_pending_events(self, mock_create):
+        event = OutboxEvent.objects.enqueue(
+            OutboxEventType.PARKKIHUBI_CREATE_PERMIT, self.permit
+        )
+        delivered, failed = OutboxEvent.objects.deliver()
+
+        self.assertEqual((delivered, failed), (1, 0))
+        mock_create.assert_called_once()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEventStatus.DELIVERED)
+
+    @patch.object(
+        ParkingPermit,
+        "create_parkkihubi_permit",
+        side_effect=ParkkihubiPermitError("Error"),
+    )
+    def test_failed_delivery_is_retried_later(self, mock_create):
+        event = OutboxEvent.objects.enqueue(
+            OutboxEventType.PARKKIHUBI_CREATE_PERMIT, self.permit
+        )
+        delivered, failed = OutboxEvent.objects.deliver()
+
+        self.assertEqual((delivered, failed), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEventStatus.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        self.assertEqual(OutboxEvent.objects.deliver(), (0, 0))
+
+    @patch.object(ParkingPermit, "sync_parkkihubi_permit")
+    @patch.object(
+        ParkingPermit,
+        "create_parkkihubi_permit",
+        side_effect=ParkkihubiPermitError("Error"),
+    )
+    def test_create_is_retried_as_sync(self, mock_create, mock_sync):
+        event = OutboxEvent.objects.enqueue(
+            OutboxEventType.PARKKIHUBI_CREATE_PERMIT, self.permit
+        )
+        OutboxEvent.objects.deliver()
+        OutboxEvent.objects.filter(id=event.id).update(next_attempt_at=timezone.now())
+
+        self.assertEqual(OutboxEvent.objects.deliver(), (1, 0))
+        mock_create.assert_called_once()
+        mock_sync.assert_called_once()
+
+    @patch.object(ParkingPermit, "create_parkkihubi_permit")
+    def test_delivered_events_stay_delivered_when_the_batch_fails(self, mock_create):
+        event = OutboxEvent.objects.enqueue(
+            OutboxEventType.PARKKIHUBI_CREATE_PERMIT, self.permit
+        )
+        OutboxEvent.objects.enqueue(
+            OutboxEventType.PARKKIHUBI_CREATE_PERMIT, ParkingPermitFactory()
+        )
+        deliver = OutboxEvent.deliver
+
+        def deliver_first_only(outbox_event):
+            if outbox_event.id != event.id:
+                raise Exception("Worker stopped")
+            return deliver(outbox_event)
+
+        with patch.object(OutboxEvent, "deliver", deliver_first_only):
+            with self.assertRaises(Exception):
+                OutboxEvent.objects.deliver()
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEventStatus.DELIVERED)
+
+    @patch.object(ParkingPermit, "update_parkkihubi_permit")
+    @patch.object(
+        ParkingPermit,
+        "create_parkkihubi_permit",
+        side_effect=ParkkihubiPermitError("Error"),
+    )
+    def test_events_of_a_permit_are_delivered_in_order(self, mock_create, mock_update):
+        OutboxEvent.objects.enqueue(
+            OutboxEventType.PARKKIHUBI_CREATE_PERMIT, self.permit
+        )
+        OutboxEvent.objects.enqueue(
+            OutboxEventType.PARKKIHUBI_UPDATE_PERMIT, self.permit
+        )
+        OutboxEvent.objects.deliver()
+
+        mock_update.assert_not_called()
+
+    @patch.object(ParkingPermit, "update_parkkihubi_permit")
+    def test_pending_updates_are_covered_by_one_delivery(self, mock_update):
+        for _ in range(3):
+            OutboxEvent.objects.enqueue(
+                OutboxEventType.PARKKIHUBI_UPDATE_PERMIT, self.permit
+            )
+        OutboxEvent.objects.deliver()
+
+        mock_update.assert_called_once()
+        self.assertFalse(
+            OutboxEvent.objects.filter(status=OutboxEventStatus.PENDING).exists()
+        )
+
+
+@override_settings(PARKKIHUBI_RECONCILIATION_RATE=1000)
+class ParkkihubiSyncStateTestCase(TestCase):
+    def setUp(self):
+        self.permits = ParkingPermitFactory.create_batch(
+            3, status=ParkingPermitStatus.VALID
+        )
+
+    @patch.object(ParkingPermit, "create_parkkihubi_permit")
+    def test_delivery_records_the_pushed_payload(self, mock_create):
+        permit = self.permits[0]
+        OutboxEvent.objects.enqueue(OutboxEventType.PARKKIHUBI_CREATE_PERMIT, permit)
+        OutboxEvent.objects.deliver()
+
+        state = ParkkihubiSyncState.objects.get(permit=permit)
+        self.assertEqual(
+            state.payload_hash, get_payload_hash(permit._get_parkkihubi_data())
+        )
+
+    @patch.object(ParkingPermit, "sync_parkkihubi_permit")
+    def test_reconcile_pushes_only_differing_permits(self, mock_sync):
+        in_sync, changed, pending = self.permits
+        ParkkihubiSyncState.objects.record(in_sync.id, in_sync._get_parkkihubi_data())
+        ParkkihubiSyncState.objects.record(changed.id, {"outdated": True})
+        OutboxEvent.objects.enqueue(OutboxEventType.PARKKIHUBI_UPDATE_PERMIT, pending)
+
+        report = ParkkihubiSyncState.objects.reconcile(chunk_size=1)
+
+        self.assertEqual(report["checked"], 2)
+        self.assertEqual(report["pushed"], 1)
+        mock_sync.assert_called_once()
+        state = ParkkihubiSyncState.objects.get(permit=changed)
+        self.assertEqual(
+            state.payload_hash, get_payload_hash(changed._get_parkkihubi_data())
+        )
+
+    @patch.object(ParkingPermit, "sync_parkkihubi_permit")
+    def test_reconcile_is_safe_to_repeat(self, mock_sync):
+        first_report = ParkkihubiSyncState.objects.reconcile()
+        second_report = ParkkihubiSyncState.objects.reconcile()
+
+        self.assertEqual(first_report["pushed"], 3)
+        self.assertEqual(second_report["pushed"], 0)
+        self.assertEqual(mock_sync.call_count, 3)
+
+    @patch.object(
+        ParkingPermit,
+        "sync_parkkihubi_permit",
+        side_effect=ParkkihubiPermitError("Error"),
+    )
+    def test_failed_pushes_are_retried_on_next_run(self, mock_sync):
+        report = ParkkihubiSyncState.objects.reconcile()
+
+        self.assertEqual(report["failed"], 3)
+        self.assertFalse(ParkkihubiSyncState.objects.exists())
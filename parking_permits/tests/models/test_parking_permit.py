@@ -18,6 +18,7 @@ from parking_permits.models.order import OrderStatus
 from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
 from parking_permits.models.product import ProductType
 from parking_permits.models.vehicle import EmissionType, VehiclePowerType
+from parking_permits.services.client import IntegrationClient
 from parking_permits.tests.factories import ParkingZoneFactory
 from parking_permits.tests.factories.customer import CustomerFactory
 from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
@@ -533,7 +534,7 @@ class TestParkingPermit(TestCase):
     def test_should_return_correct_product_name(self):
         self.assertIsNotNone(self.permit.parking_zone.name)
 
-    @patch("requests.post", return_value=MockResponse(201))
+    @patch.object(IntegrationClient, "post", return_value=MockResponse(201))
     def test_should_save_talpa_product_id_when_creating_talpa_product_successfully(
         self, mock_post
     ):
@@ -541,7 +542,7 @@ class TestParkingPermit(TestCase):
         mock_post.assert_called_once()
         self.assertEqual(mock_post.return_value.status_code, 201)
 
-    @patch("requests.post", return_value=MockResponse(400))
+    @patch.object(IntegrationClient, "post", return_value=MockResponse(400))
     def test_should_raise_error_when_creating_talpa_product_failed(self, mock_post):
         self.permit.vehicle.registration_number = ""
         with self.assertRaises(ParkkihubiPermitError):
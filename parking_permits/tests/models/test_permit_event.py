@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from parking_permits.models import PermitEvent
+from parking_permits.models.permit_event import PermitEventType
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+
+
+class PermitEventTestCase(TestCase):
+    def setUp(self):
+        self.permit = ParkingPermitFactory()
+
+    def test_read_returns_events_after_cursor_in_order(self):
+        with freeze_time(datetime(2022, 5, 1, 12)):
+            first = PermitEvent.objects.record(PermitEventType.CREATED, self.permit)
+            PermitEvent.objects.record_many(
+                PermitEventType.PAID, [self.permit.id, self.permit.id]
+            )
+
+        with freeze_time(datetime(2022, 5, 1, 13)):
+            events = PermitEvent.objects.read(limit=2)
+            self.assertEqual(len(events), 2)
+            self.assertEqual(events[0].id, first.id)
+
+            next_events = PermitEvent.objects.read(after=events[-1].id)
+            self.assertEqual(len(next_events), 1)
+            self.assertEqual(next_events[0].event_type, PermitEventType.PAID)
+            self.assertEqual(PermitEvent.objects.read(after=next_events[-1].id), [])
+
+    def test_read_holds_back_recent_events(self):
+        with freeze_time(datetime(2022, 5, 1, 12)):
+            PermitEvent.objects.record(PermitEventType.CREATED, self.permit)
+            self.assertEqual(PermitEvent.objects.read(), [])
+
+        with freeze_time(datetime(2022, 5, 1, 12, 1)):
+            self.assertEqual(len(PermitEvent.objects.read()), 1)
+
+    def test_read_stops_at_first_unsettled_event(self):
+        with freeze_time(datetime(2022, 5, 1, 12)):
+            settled = PermitEvent.objects.record(PermitEventType.CREATED, self.permit)
+        with freeze_time(datetime(2022, 5, 1, 12, 10)):
+            PermitEvent.objects.record(PermitEventType.PAID, self.permit)
+        # recorded with a lagging clock on another node
+        with freeze_time(datetime(2022, 5, 1, 12)):
+            PermitEvent.objects.record(PermitEventType.ENDED, self.permit)
+
+        with freeze_time(datetime(2022, 5, 1, 12, 10, 10)):
+            self.assertEqual(PermitEvent.objects.read(), [settled])
+
+    def test_prune_removes_old_events(self):
+        with freeze_time(datetime(2022, 1, 1)):
+            PermitEvent.objects.record(PermitEventType.CREATED, self.permit)
+        with freeze_time(datetime(2022, 5, 1)):
+            PermitEvent.objects.record(PermitEventType.ENDED, self.permit)
+
+        deleted = PermitEvent.objects.prune(timezone.make_aware(datetime(2022, 3, 1)))
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(
+            list(PermitEvent.objects.values_list("event_type", flat=True)),
+            [PermitEventType.ENDED],
+        )
@@ -0,0 +1,129 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from parking_permits.models import PermitMonthlyPrice
+from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
+from parking_permits.models.product import ProductType
+from parking_permits.models.vehicle import VehiclePowerType
+from parking_permits.tests.factories import ParkingZoneFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.vehicle import VehicleFactory
+
+MONTH = date(2021, 11, 1)
+
+
+class PermitMonthlyPriceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.zone = ParkingZoneFactory()
+        self.product = ProductFactory(
+            zone=self.zone, type=ProductType.RESIDENT, unit_price=Decimal(30)
+        )
+        self.permit = ParkingPermitFactory(
+            parking_zone=self.zone,
+            vehicle=VehicleFactory(power_type=VehiclePowerType.BENSIN),
+            primary_vehicle=True,
+        )
+
+    def test_price_is_computed_and_stored_on_first_lookup(self):
+        price = PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.assertEqual(price.product, self.product)
+        self.assertEqual(price.unit_price, Decimal(30))
+        self.assertTrue(
+            PermitMonthlyPrice.objects.filter(permit=self.permit, month=MONTH).exists()
+        )
+
+    def test_cached_price_is_returned_without_queries(self):
+        PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        with self.assertNumQueries(0):
+            PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+
+    def test_vehicle_change_invalidates_price(self):
+        PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        vehicle = self.permit.vehicle
+        vehicle.power_type = VehiclePowerType.ELECTRIC
+        vehicle.save()
+
+        price = PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.assertTrue(price.is_low_emission)
+        self.assertEqual(price.unit_price, Decimal(15))
+
+    def test_primary_vehicle_change_invalidates_price(self):
+        PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.permit.primary_vehicle = False
+        self.permit.save(update_fields=["primary_vehicle"])
+
+        price = PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.assertTrue(price.is_secondary_vehicle)
+        self.assertEqual(price.unit_price, Decimal(45))
+
+    def test_catalog_change_invalidates_zone_prices(self):
+        PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.product.unit_price = Decimal(40)
+        self.product.save()
+
+        price = PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.assertEqual(price.unit_price, Decimal(40))
+
+    def test_unrelated_changes_keep_prices(self):
+        price = PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.permit.save()
+        self.product.talpa_product_id = uuid.uuid4()
+        self.product.save()
+
+        with self.assertNumQueries(0):
+            PermitMonthlyPrice.objects.get_for_month(self.permit.id, MONTH)
+        self.assertTrue(PermitMonthlyPrice.objects.filter(pk=price.pk).exists())
+
+
+class PrebillingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.zone_a = ParkingZoneFactory(name="A")
+        self.zone_b = ParkingZoneFactory(name="B")
+        ProductFactory(zone=self.zone_a, type=ProductType.RESIDENT)
+
+    def _create_permit(self, zone, **kwargs):
+        return ParkingPermitFactory(
+            parking_zone=zone,
+            status=ParkingPermitStatus.VALID,
+            contract_type=ContractType.OPEN_ENDED,
+            **kwargs,
+        )
+
+    def test_prebill_stores_prices_for_open_ended_permits(self):
+        permits = [self._create_permit(self.zone_a) for _ in range(3)]
+        ParkingPermitFactory(
+            parking_zone=self.zone_a,
+            status=ParkingPermitStatus.VALID,
+            contract_type=ContractType.FIXED_PERIOD,
+        )
+        self._create_permit(self.zone_a, status=ParkingPermitStatus.CLOSED)
+
+        report = PermitMonthlyPrice.objects.prebill(MONTH, chunk_size=2)
+
+        self.assertEqual(report["priced"], 3)
+        self.assertEqual(report["catalog_errors"], {})
+        self.assertEqual(
+            set(
+                PermitMonthlyPrice.objects.filter(month=MONTH).values_list(
+                    "permit_id", flat=True
+                )
+            ),
+            {permit.id for permit in permits},
+        )
+
+    def test_prebill_reports_catalog_errors(self):
+        self._create_permit(self.zone_a)
+        self._create_permit(self.zone_b)
+
+        report = PermitMonthlyPrice.objects.prebill(MONTH)
+
+        self.assertEqual(report["priced"], 1)
+        self.assertEqual(report["failed"], 1)
+        self.assertEqual(list(report["catalog_errors"]), ["B"])
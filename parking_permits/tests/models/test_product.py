@@ -1,12 +1,14 @@
+import json
 import uuid
 from datetime import date
 from decimal import Decimal
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from parking_permits.exceptions import CreateTalpaProductError
 from parking_permits.models import Product
+from parking_permits.services.client import IntegrationClient
 from parking_permits.tests.factories.product import ProductFactory
 from parking_permits.tests.factories.zone import ParkingZoneFactory
 
@@ -60,7 +62,11 @@ class TestProduct(TestCase):
     def test_should_return_correct_product_name(self):
         self.assertEqual(self.product.name, "Pysäköintialue A")
 
-    @patch("requests.post", return_value=MockResponse(201, {"productId": uuid.uuid4()}))
+    @patch.object(
+        IntegrationClient,
+        "post",
+        return_value=MockResponse(201, {"productId": uuid.uuid4()}),
+    )
     def test_should_save_talpa_product_id_when_creating_talpa_product_successfully(
         self, mock_post
     ):
@@ -68,7 +74,7 @@ class TestProduct(TestCase):
         mock_post.assert_called_once()
         self.assertIsNotNone(self.product.talpa_product_id)
 
-    @patch("requests.post", return_value=MockResponse(401))
+    @patch.object(IntegrationClient, "post", return_value=MockResponse(401))
     def test_should_raise_error_when_creating_talpa_product_failed(self, mock_post):
         with self.assertRaises(CreateTalpaProductError):
             self.product.create_talpa_product()
@@ -89,3 +95,79 @@ class TestProduct(TestCase):
             True, True
         )
         self.assertEqual(secondary_vehicle_low_emission_price, Decimal(7.5))
+
+
+@override_settings(TALPA_PRODUCT_REGISTRATION_RATE=1000)
+class TestRegisterTalpaProducts(TestCase):
+    def setUp(self):
+        zone = ParkingZoneFactory(name="A")
+        self.products = [ProductFactory(zone=zone) for _ in range(3)]
+        self.failing_product = self.products[0]
+        self.failing_ids = {str(self.failing_product.id)}
+        self.registered_product = ProductFactory(
+            zone=zone, talpa_product_id=uuid.uuid4()
+        )
+
+    def mock_post(self, url, data=None, headers=None):
+        product_id = json.loads(data)["namespaceEntityId"]
+        if product_id in self.failing_ids:
+            return MockResponse(401)
+        return MockResponse(201, {"productId": str(uuid.uuid4())})
+
+    def test_should_register_products_missing_talpa_product_id(self):
+        with patch.object(IntegrationClient, "post", side_effect=self.mock_post):
+            results = Product.objects.register_talpa_products()
+
+        self.assertEqual(len(results), 3)
+        errors = {product.id: error for product, error in results}
+        self.assertIsNotNone(errors[self.failing_product.id])
+        for product in self.products[1:]:
+            self.assertIsNone(errors[product.id])
+            product.refresh_from_db()
+            self.assertIsNotNone(product.talpa_product_id)
+        self.failing_product.refresh_from_db()
+        self.assertIsNone(self.failing_product.talpa_product_id)
+
+    def test_should_resume_with_the_products_that_failed(self):
+        with patch.object(IntegrationClient, "post", side_effect=self.mock_post):
+            Product.objects.register_talpa_products()
+
+        self.failing_ids = set()
+        with patch.object(
+            IntegrationClient, "post", side_effect=self.mock_post
+        ) as mock_post:
+            results = Product.objects.register_talpa_products()
+
+        mock_post.assert_called_once()
+        self.assertEqual(results[0][0].id, self.failing_product.id)
+        self.assertIsNone(results[0][1])
+
+    def test_should_resume_after_interrupted_run(self):
+        class Interrupted(BaseException):
+            pass
+
+        posted_ids = []
+
+        def post_until_interrupted(url, data=None, headers=None):
+            posted_ids.append(json.loads(data)["namespaceEntityId"])
+            if len(posted_ids) == 2:
+                raise Interrupted()
+            return self.mock_post(url, data, headers)
+
+        self.failing_ids = set()
+        with patch.object(
+            IntegrationClient, "post", side_effect=post_until_interrupted
+        ), self.assertRaises(Interrupted):
+            Product.objects.register_talpa_products(max_workers=1)
+
+        registered = Product.objects.filter(id=posted_ids[0]).get()
+        self.assertIsNotNone(registered.talpa_product_id)
+
+        with patch.object(
+            IntegrationClient, "post", side_effect=self.mock_post
+        ) as mock_post:
+            results = Product.objects.register_talpa_products()
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertNotIn(registered.id, {product.id for product, error in results})
+        self.assertFalse(Product.objects.filter(talpa_product_id=None).exists())
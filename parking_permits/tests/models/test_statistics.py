@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from parking_permits.models import PermitStatistics, Refund, RefundStatistics
+from parking_permits.models.parking_permit import ContractType, ParkingPermitStatus
+from parking_permits.models.refund import RefundStatus
+from parking_permits.tests.factories import ParkingZoneFactory
+from parking_permits.tests.factories.order import OrderFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+
+
+class StatisticsTestCase(TestCase):
+    def test_permit_statistics_are_grouped_by_zone_status_and_contract_type(self):
+        zone = ParkingZoneFactory(name="A")
+        ParkingPermitFactory.create_batch(
+            2,
+            parking_zone=zone,
+            status=ParkingPermitStatus.VALID,
+            contract_type=ContractType.OPEN_ENDED,
+        )
+        ParkingPermitFactory(
+            parking_zone=zone,
+            status=ParkingPermitStatus.PAYMENT_IN_PROGRESS,
+            contract_type=ContractType.OPEN_ENDED,
+        )
+        PermitStatistics.objects.refresh()
+
+        stats = {
+            (stat.zone_name, stat.status): stat.permit_count
+            for stat in PermitStatistics.objects.filter(zone_id=zone.id)
+        }
+        self.assertEqual(
+            stats,
+            {
+                ("A", ParkingPermitStatus.VALID): 2,
+                ("A", ParkingPermitStatus.PAYMENT_IN_PROGRESS): 1,
+            },
+        )
+
+    def test_refund_statistics_sum_amounts_per_status(self):
+        Refund.objects.create(order=OrderFactory(), amount=Decimal("10.00"))
+        Refund.objects.create(order=OrderFactory(), amount=Decimal("5.50"))
+        Refund.objects.create(
+            order=OrderFactory(),
+            amount=Decimal("3.00"),
+            status=RefundStatus.ACCEPTED,
+        )
+        RefundStatistics.objects.refresh()
+
+        open_refunds = RefundStatistics.objects.get(status=RefundStatus.OPEN)
+        self.assertEqual(open_refunds.refund_count, 2)
+        self.assertEqual(open_refunds.total_amount, Decimal("15.50"))
+        accepted_refunds = RefundStatistics.objects.get(status=RefundStatus.ACCEPTED)
+        self.assertEqual(accepted_refunds.refund_count, 1)
@@ -1,10 +1,15 @@
+import uuid
 from datetime import date
 from decimal import Decimal
+from unittest.mock import patch
 
+from django.conf import settings
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
 from django.test import TestCase, override_settings
 from freezegun import freeze_time
 
 from parking_permits.exceptions import PriceError
+from parking_permits.models import ParkingZone
 from parking_permits.models.product import ProductType
 from parking_permits.tests.factories import ParkingZoneFactory, PriceFactory
 from parking_permits.tests.factories.product import ProductFactory
@@ -104,3 +109,105 @@ class ParkingZoneTestCase(TestCase):
                 [repr(product_1), repr(product_2), repr(product_3)],
                 ordered=False,
             )
+
+
+def generate_square(x, y, size=1.0):
+    polygon = Polygon(
+        ((x, y), (x + size, y), (x + size, y + size), (x, y + size), (x, y)),
+        srid=settings.SRID,
+    )
+    return MultiPolygon(polygon, srid=settings.SRID)
+
+
+class ParkingZoneLocationsTestCase(TestCase):
+    def setUp(self):
+        self.zone_a = ParkingZoneFactory(name="A", location=generate_square(0, 0))
+        self.zone_b = ParkingZoneFactory(name="B", location=generate_square(1, 0))
+
+    def test_get_for_locations_returns_zones_in_location_order(self):
+        locations = [(1.5, 0.5), (0.5, 0.5), (5, 5), (1, 0.5)]
+        with self.assertNumQueries(2):
+            result = ParkingZone.objects.get_for_locations(locations)
+        self.assertEqual(
+            [[zone.name for zone in zones] for zones in result],
+            [["B"], ["A"], [], ["A", "B"]],
+        )
+
+    def test_get_for_locations_in_multiple_chunks(self):
+        with patch.object(ParkingZone.objects, "locations_chunk_size", 1):
+            result = ParkingZone.objects.get_for_locations([(0.5, 0.5), (1.5, 0.5)])
+        self.assertEqual(result, [[self.zone_a], [self.zone_b]])
+
+    def test_get_for_location(self):
+        self.assertEqual(
+            ParkingZone.objects.get_for_location(Point(0.5, 0.5, srid=settings.SRID)),
+            self.zone_a,
+        )
+        with self.assertRaises(ParkingZone.DoesNotExist):
+            ParkingZone.objects.get_for_location(Point(5, 5, srid=settings.SRID))
+
+    def test_exact_geometry_is_used_near_the_boundary(self):
+        # a notch smaller than the simplify tolerance on the bottom edge
+        polygon = Polygon(
+            (
+                (10, 0),
+                (10.5, 0),
+                (10.50002, 0.00005),
+                (10.50004, 0),
+                (11, 0),
+                (11, 1),
+                (10, 1),
+                (10, 0),
+            ),
+            srid=settings.SRID,
+        )
+        zone = ParkingZoneFactory(
+            name="C", location=MultiPolygon(polygon, srid=settings.SRID)
+        )
+        zone = ParkingZone.objects.with_geometry().get(pk=zone.pk)
+        self.assertEqual(zone.bbox.extent, (10, 0, 11, 1))
+        self.assertLess(zone.simplified_location.num_points, zone.location.num_points)
+
+        result = ParkingZone.objects.get_for_locations(
+            [(10.50002, 0.00002), (10.50002, 0.001), (10.5, 0.5)]
+        )
+        self.assertEqual(result, [[], [zone], [zone]])
+
+
+class ParkingZoneGeometryTestCase(TestCase):
+    def setUp(self):
+        self.zone = ParkingZoneFactory(name="A")
+
+    def test_geometry_is_deferred_by_default(self):
+        zone = ParkingZone.objects.get(pk=self.zone.pk)
+        self.assertIn("location", zone.get_deferred_fields())
+
+    def test_geometry_is_loaded_on_request(self):
+        zone = ParkingZone.objects.with_geometry().get(pk=self.zone.pk)
+        self.assertNotIn("location", zone.get_deferred_fields())
+
+    def test_related_zone_is_loaded_without_geometry(self):
+        product = ProductFactory(zone=self.zone)
+        product.refresh_from_db()
+        self.assertIn("location", product.zone.get_deferred_fields())
+
+    def test_get_record_is_cached(self):
+        ParkingZone.objects.clear_records()
+        with self.assertNumQueries(1):
+            record = ParkingZone.objects.get_record(self.zone.pk)
+            ParkingZone.objects.get_record(self.zone.pk)
+        self.assertEqual(record.name, "A")
+
+    def test_get_record_is_reloaded_after_zone_change(self):
+        ParkingZone.objects.get_record(self.zone.pk)
+        self.zone.description = "Kamppi"
+        self.zone.save()
+        self.assertEqual(
+            ParkingZone.objects.get_record(self.zone.pk).description, "Kamppi"
+        )
+
+    def test_get_record_of_missing_zone(self):
+        with self.assertRaises(ParkingZone.DoesNotExist):
+            ParkingZone.objects.get_record(uuid.uuid4())
+        with self.assertRaises(ParkingZone.DoesNotExist):
+            ParkingZone.objects.get_record(None)
@@ -3,8 +3,11 @@ from datetime import datetime
 from django.test import TestCase
 from django.utils import timezone
 from freezegun import freeze_time
+from reversion.models import Version
 
+from parking_permits.models.outbox import OutboxEventType
 from parking_permits.models.parking_permit import ParkingPermit, ParkingPermitStatus
+from parking_permits.models.permit_event import PermitEventType
 from parking_permits.tests.factories.customer import CustomerFactory
 from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
 
@@ -12,7 +15,7 @@ from ..cron import (
     automatic_expiration_of_permits,
     automatic_remove_obsolete_customer_data,
 )
-from ..models import Customer
+from ..models import Customer, OutboxEvent, PermitEvent
 
 
 class CronTestCase(TestCase):
@@ -51,6 +54,35 @@ class CronTestCase(TestCase):
         self.assertEqual(draft_permits.count(), 2)
         self.assertEqual(closed_permits.count(), 1)
 
+    def test_expiration_writes_history_and_queues_parkkihubi_updates(self):
+        expired_permit = ParkingPermitFactory(
+            customer=self.customer,
+            end_time=timezone.now() + timezone.timedelta(days=-2),
+            status=ParkingPermitStatus.VALID,
+        )
+
+        closed_ids = automatic_expiration_of_permits(chunk_size=1)
+
+        self.assertEqual(len(closed_ids), 2)
+        self.assertIn(expired_permit.id, closed_ids)
+        self.assertEqual(
+            OutboxEvent.objects.filter(
+                permit_id__in=closed_ids,
+                event_type=OutboxEventType.PARKKIHUBI_UPDATE_PERMIT,
+            ).count(),
+            2,
+        )
+        self.assertEqual(
+            PermitEvent.objects.filter(
+                permit_id__in=closed_ids, event_type=PermitEventType.EXPIRED
+            ).count(),
+            2,
+        )
+        versions = Version.objects.get_for_object(expired_permit)
+        self.assertEqual(versions.count(), 1)
+        self.assertTrue(versions[0].revision.comment.endswith(": VALID --> CLOSED"))
+        self.assertEqual(automatic_expiration_of_permits(), [])
+
 
 class AutomaticRemoveObsoleteCustomerDataTestCase(TestCase):
     def test_should_remove_obsolete_customers(self):
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+import reversion
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+from reversion.models import Version
+
+from parking_permits.customer_data import (
+    count_customers_data,
+    remove_customers_data,
+    remove_obsolete_customers_data,
+)
+from parking_permits.models import (
+    Address,
+    Customer,
+    DrivingClass,
+    DrivingLicence,
+    Order,
+    OrderItem,
+    ParkingPermit,
+    Refund,
+)
+from parking_permits.models.parking_permit import ParkingPermitStatus
+from parking_permits.tests.factories.customer import CustomerFactory
+from parking_permits.tests.factories.order import OrderFactory, OrderItemFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+
+
+class RemoveObsoleteCustomersDataTestCase(TestCase):
+    def setUp(self):
+        with freeze_time(timezone.make_aware(datetime(2019, 6, 1))):
+            self.obsolete_customers = CustomerFactory.create_batch(3)
+            for customer in self.obsolete_customers:
+                permit = ParkingPermitFactory(
+                    customer=customer,
+                    status=ParkingPermitStatus.CLOSED,
+                    end_time=timezone.make_aware(datetime(2019, 12, 31)),
+                )
+                order = OrderFactory(customer=customer)
+                OrderItemFactory(order=order, permit=permit)
+            self.valid_customer = CustomerFactory()
+            ParkingPermitFactory(
+                customer=self.valid_customer, status=ParkingPermitStatus.VALID
+            )
+
+    def test_dry_run_only_counts_rows(self):
+        with freeze_time(timezone.make_aware(datetime(2022, 6, 1))):
+            counts = remove_obsolete_customers_data(chunk_size=2, dry_run=True)
+        self.assertEqual(counts["parking_permits.Customer"], 3)
+        self.assertEqual(counts["parking_permits.ParkingPermit"], 3)
+        self.assertEqual(counts["parking_permits.OrderItem"], 3)
+        self.assertEqual(Customer.objects.count(), 4)
+
+    def test_obsolete_customers_are_removed_in_chunks(self):
+        with freeze_time(timezone.make_aware(datetime(2022, 6, 1))):
+            removed = remove_obsolete_customers_data(chunk_size=2)
+
+        self.assertEqual(removed, 3)
+        self.assertEqual(list(Customer.objects.all()), [self.valid_customer])
+        self.assertEqual(OrderItem.objects.count(), 0)
+        self.assertEqual(Order.objects.count(), 0)
+        self.assertEqual(
+            ParkingPermit.objects.filter(customer=self.valid_customer).count(),
+            ParkingPermit.objects.count(),
+        )
+
+
+class RemoveCustomersDataTestCase(TestCase):
+    def setUp(self):
+        self.customer = CustomerFactory()
+        with reversion.create_revision():
+            self.permit = ParkingPermitFactory(customer=self.customer)
+        order = OrderFactory(customer=self.customer)
+        OrderItemFactory(order=order, permit=self.permit)
+        Refund.objects.create(order=order, amount=10)
+        driving_licence = DrivingLicence.objects.create(
+            customer=self.customer, start_date=datetime(2010, 1, 1)
+        )
+        driving_licence.driving_classes.add(DrivingClass.objects.create(identifier="B"))
+        self.other_customer = CustomerFactory(other_address=self.customer.other_address)
+        ParkingPermitFactory(customer=self.other_customer)
+
+    def test_counts_rows_by_model(self):
+        counts = count_customers_data([self.customer.id])
+        self.assertEqual(counts["parking_permits.Customer"], 1)
+        self.assertEqual(counts["parking_permits.ParkingPermit"], 1)
+        self.assertEqual(counts["parking_permits.Refund"], 1)
+        self.assertEqual(counts["parking_permits.DrivingLicence"], 1)
+        self.assertEqual(counts["parking_permits.DrivingLicence_driving_classes"], 1)
+        self.assertEqual(counts["reversion.Version"], 1)
+
+    def test_removes_protected_rows_and_history(self):
+        deleted = remove_customers_data([self.customer.id])
+
+        self.assertEqual(deleted["parking_permits.Customer"], 1)
+        self.assertEqual(deleted["reversion.Version"], 1)
+        self.assertFalse(Customer.objects.filter(id=self.customer.id).exists())
+        self.assertFalse(Refund.objects.exists())
+        self.assertFalse(DrivingLicence.objects.exists())
+        self.assertFalse(
+            Version.objects.get_for_object_reference(ParkingPermit, self.permit.id)
+        )
+        self.assertTrue(Customer.objects.filter(id=self.other_customer.id).exists())
+        self.assertEqual(ParkingPermit.objects.count(), 1)
+
+    def test_removes_unshared_addresses(self):
+        remove_customers_data([self.customer.id])
+
+        self.assertFalse(
+            Address.objects.filter(id=self.customer.primary_address_id).exists()
+        )
+        self.assertTrue(
+            Address.objects.filter(id=self.customer.other_address_id).exists()
+        )
+
+    def test_removes_national_id_from_vehicle_users(self):
+        vehicle = self.permit.vehicle
+        vehicle.users = [self.customer.national_id_number, "010101-123A"]
+        vehicle.save()
+
+        remove_customers_data([self.customer.id])
+
+        vehicle.refresh_from_db()
+        self.assertEqual(vehicle.users, ["010101-123A"])
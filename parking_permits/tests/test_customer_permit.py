@@ -14,12 +14,14 @@ from parking_permits.exceptions import (
     NonDraftPermitUpdateError,
     PermitCanNotBeDelete,
 )
+from parking_permits.models import PermitEvent
 from parking_permits.models.parking_permit import (
     ContractType,
     ParkingPermit,
     ParkingPermitStartType,
     ParkingPermitStatus,
 )
+from parking_permits.models.permit_event import PermitEventType
 from parking_permits.models.product import ProductType
 from parking_permits.models.vehicle import VehiclePowerType
 from parking_permits.tests.factories import (
@@ -292,6 +294,21 @@ class UpdateCustomerPermitTestCase(TestCase):
         for result in results:
             self.assertEqual(result.parking_zone, sec_add_zone)
 
+    def test_zone_change_of_drafts_is_recorded_in_the_feed(self):
+        data = {"zone_id": str(self.cus_a.other_address.zone.id)}
+        CustomerPermit(self.cus_a.id).update(data)
+        CustomerPermit(self.cus_a.id).update(data)
+
+        self.assertEqual(
+            set(
+                PermitEvent.objects.filter(
+                    event_type=PermitEventType.ZONE_CHANGED
+                ).values_list("permit_id", flat=True)
+            ),
+            {self.c_a_draft.id, self.c_a_draft_sec.id},
+        )
+        self.assertEqual(PermitEvent.objects.count(), 2)
+
     def test_can_not_update_zone_if_it_has_processing_or_valid_primary_permit(self):
         for status in [PROCESSING, VALID]:
             self.c_a_draft.status = status
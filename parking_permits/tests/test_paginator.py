@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
+from django.core.paginator import EmptyPage
 from django.test import TestCase
 
 from parking_permits.models import ParkingPermit
-from parking_permits.paginator import QuerySetPaginator
+from parking_permits.paginator import CountingPaginator, CountMode, QuerySetPaginator
 from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
 
 
@@ -42,3 +45,60 @@ class QuerySetPaginatorTestCase(TestCase):
             "count": 10,
         }
         self.assertEqual(paginator.page_info, expected_page_info)
+
+    def test_paginator_with_cached_count(self):
+        qs = ParkingPermit.objects.all()
+        page_input = {"page": 1, "page_size": 3, "count_mode": CountMode.CACHED}
+        self.assertEqual(QuerySetPaginator(qs, page_input).page_info["count"], 10)
+
+        ParkingPermitFactory()
+        with self.assertNumQueries(1):
+            paginator = QuerySetPaginator(qs.order_by("identifier"), page_input)
+            self.assertEqual(paginator.page_info["count"], 10)
+            self.assertEqual(len(paginator.object_list), 3)
+
+    def test_paginator_with_estimate_below_real_count(self):
+        qs = ParkingPermit.objects.all()
+        page_input = {"page": 4, "page_size": 3, "count_mode": CountMode.ESTIMATE}
+        with patch.object(CountingPaginator, "estimate_threshold", 1), patch.object(
+            CountingPaginator, "_get_estimated_count", return_value=6
+        ):
+            paginator = QuerySetPaginator(qs, page_input)
+            page_info = paginator.page_info
+
+        self.assertEqual(len(paginator.object_list), 1)
+        self.assertEqual(page_info["count"], 6)
+        self.assertEqual(page_info["page"], 4)
+        self.assertEqual(page_info["prev"], 3)
+        self.assertIsNone(page_info["next"])
+
+    def test_paginator_without_count(self):
+        qs = ParkingPermit.objects.all()
+        page_input = {"page": 3, "page_size": 4, "count_mode": CountMode.NONE}
+        with self.assertNumQueries(1):
+            paginator = QuerySetPaginator(qs, page_input)
+            self.assertEqual(len(paginator.object_list), 2)
+            expected_page_info = {
+                "num_pages": None,
+                "next": None,
+                "prev": 2,
+                "page": 3,
+                "start_index": 9,
+                "end_index": 10,
+                "count": None,
+            }
+            self.assertEqual(paginator.page_info, expected_page_info)
+
+    def test_paginator_without_count_has_next_page(self):
+        qs = ParkingPermit.objects.all()
+        page_input = {"page": 1, "page_size": 4, "count_mode": CountMode.NONE}
+        paginator = QuerySetPaginator(qs, page_input)
+        self.assertEqual(len(paginator.object_list), 4)
+        self.assertEqual(paginator.page_info["next"], 2)
+
+    def test_paginator_rejects_page_below_one(self):
+        qs = ParkingPermit.objects.all()
+        for count_mode in (CountMode.EXACT, CountMode.NONE):
+            page_input = {"page": 0, "page_size": 4, "count_mode": count_mode}
+            with self.assertRaises(EmptyPage):
+                QuerySetPaginator(qs, page_input)
@@ -0,0 +1,111 @@
+import json
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+
+from parking_permits.importers import ParkingZoneImporter
+from parking_permits.importers.wfs_importer import iter_json_array_items
+from parking_permits.models import ParkingZone
+from parking_permits.tests.factories.address import AddressFactory
+from parking_permits.tests.factories.product import ProductFactory
+from parking_permits.tests.factories.zone import ParkingZoneFactory
+
+
+def make_feature(name, description, x=24.9):
+    return {
+        "type": "Feature",
+        "properties": {"asukaspysakointitunnus": name, "alueen_nimi": description},
+        "geometry": {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [[[x, 60.1], [x + 0.01, 60.1], [x + 0.01, 60.11], [x, 60.1]]]
+            ],
+        },
+    }
+
+
+def split_bytes(data, size):
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+class IterJsonArrayItemsTestCase(TestCase):
+    def test_items_split_across_chunks(self):
+        features = [make_feature("A", "Kamppi"), make_feature("I", "Kallio/Sörnäinen")]
+        data = json.dumps(
+            {"type": "FeatureCollection", "totalFeatures": 2, "features": features},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        for size in (1, 7, 64, len(data)):
+            items = list(iter_json_array_items(split_bytes(data, size), "features"))
+            self.assertEqual(items, features)
+
+    def test_empty_array(self):
+        data = b'{"features": [], "type": "FeatureCollection"}'
+        self.assertEqual(
+            list(iter_json_array_items(split_bytes(data, 3), "features")), []
+        )
+
+    def test_truncated_document(self):
+        data = json.dumps({"features": [make_feature("A", "Kamppi")]}).encode()
+        with self.assertRaises(ValueError):
+            list(iter_json_array_items(split_bytes(data[:-20], 16), "features"))
+
+
+class ParkingZoneImporterTestCase(TestCase):
+    def import_features(self, features):
+        with patch.object(ParkingZoneImporter, "_download", return_value=features):
+            return ParkingZoneImporter().import_parking_zones()
+
+    def test_unchanged_zones_are_not_written(self):
+        features = [make_feature("A", "Kamppi"), make_feature("B", "Punavuori", 25.0)]
+        summary = self.import_features(features)
+        self.assertEqual(summary["created"], 2)
+        modified_at = dict(ParkingZone.objects.values_list("name", "modified_at"))
+
+        summary = self.import_features(features)
+
+        self.assertEqual(summary["created"], 0)
+        self.assertEqual(summary["updated"], 0)
+        self.assertEqual(summary["unchanged"], 2)
+        self.assertEqual(
+            dict(ParkingZone.objects.values_list("name", "modified_at")), modified_at
+        )
+
+    def test_changed_zones_are_updated(self):
+        self.import_features([make_feature("A", "Kamppi")])
+
+        summary = self.import_features([make_feature("A", "Kamppi", 24.8)])
+
+        self.assertEqual(summary["updated"], 1)
+        zone = ParkingZone.objects.with_geometry().get(name="A")
+        self.assertAlmostEqual(zone.location.extent[0], 24.8)
+
+    def test_only_unreferenced_missing_zones_are_deleted(self):
+        ParkingZoneFactory(name="X")
+        ProductFactory(zone=ParkingZoneFactory(name="Y"))
+
+        summary = self.import_features([make_feature("A", "Kamppi")])
+
+        self.assertEqual(summary["deleted"], 1)
+        self.assertEqual(summary["kept"], ["Y"])
+        self.assertEqual(
+            set(ParkingZone.objects.values_list("name", flat=True)), {"A", "Y"}
+        )
+
+    def test_address_zones_are_recomputed_when_zones_change(self):
+        address = AddressFactory(
+            _zone=None, location=Point(24.908, 60.101, srid=settings.SRID)
+        )
+        self.assertIsNone(address.zone)
+
+        summary = self.import_features([make_feature("A", "Kamppi")])
+
+        self.assertEqual(summary["addresses"], 1)
+        address.refresh_from_db()
+        self.assertEqual(address.zone.name, "A")
+
+        summary = self.import_features([make_feature("A", "Kamppi")])
+        self.assertEqual(summary["addresses"], 0)
@@ -0,0 +1,134 @@
+from datetime import datetime
+from functools import partial
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from parking_permits import customer_data
+from parking_permits.models import Customer, JobRun
+from parking_permits.models.job_run import JobRunStatus
+from parking_permits.scheduler import JOBS, Job, is_due, run_job
+from parking_permits.tests.factories.customer import CustomerFactory
+
+
+class IsDueTestCase(TestCase):
+    def test_every_minute(self):
+        self.assertTrue(is_due("* * * * *", datetime(2022, 5, 16, 12, 34)))
+
+    def test_step_and_fixed_fields(self):
+        self.assertTrue(is_due("*/15 * * * *", datetime(2022, 5, 16, 12, 45)))
+        self.assertFalse(is_due("*/15 * * * *", datetime(2022, 5, 16, 12, 46)))
+        self.assertTrue(is_due("30 01 * * *", datetime(2022, 5, 16, 1, 30)))
+        self.assertFalse(is_due("30 01 * * *", datetime(2022, 5, 16, 13, 30)))
+
+    def test_lists_ranges_and_weekdays(self):
+        # 2022-05-16 is a Monday
+        self.assertTrue(is_due("0 8 * * 1-5", datetime(2022, 5, 16, 8, 0)))
+        self.assertFalse(is_due("0 8 * * 0,6", datetime(2022, 5, 16, 8, 0)))
+        self.assertTrue(is_due("0 8 * * 7", datetime(2022, 5, 15, 8, 0)))
+
+    def test_either_day_field_matches_when_both_are_restricted(self):
+        self.assertTrue(is_due("0 0 1 * 1", datetime(2022, 5, 16, 0, 0)))
+        self.assertTrue(is_due("0 0 1 * 1", datetime(2022, 6, 1, 0, 0)))
+        self.assertFalse(is_due("0 0 1 * 1", datetime(2022, 5, 17, 0, 0)))
+
+    def test_invalid_schedule(self):
+        with self.assertRaises(ValueError):
+            is_due("* * *", datetime(2022, 5, 16))
+        with self.assertRaises(ValueError):
+            is_due("61 * * * *", datetime(2022, 5, 16))
+
+
+class RunJobTestCase(TestCase):
+    def test_run_is_recorded(self):
+        with patch.dict(JOBS, {"test_job": Job(lambda: [1, 2, 3])}):
+            run = run_job("test_job")
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, JobRunStatus.SUCCEEDED)
+        self.assertEqual(run.rows, 3)
+        self.assertIsNotNone(run.duration)
+
+    def test_failure_is_recorded(self):
+        def fail():
+            raise Exception("Job failed")
+
+        with patch.dict(JOBS, {"test_job": Job(fail)}):
+            run = run_job("test_job")
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, JobRunStatus.FAILED)
+        self.assertIn("Job failed", run.error)
+        self.assertIsNotNone(run.finished_at)
+
+    def test_resumable_job_continues_from_failed_run(self):
+        cursors = []
+
+        def process(run):
+            cursors.append(run.cursor)
+            run.checkpoint(10, rows=10)
+            if len(cursors) == 1:
+                raise Exception("Job failed")
+            run.checkpoint(20, rows=10)
+
+        with patch.dict(JOBS, {"test_job": Job(process, resumable=True)}):
+            failed_run = run_job("test_job")
+            resumed_run = run_job("test_job")
+            fresh_run = run_job("test_job")
+
+        self.assertEqual(cursors, ["", "10", ""])
+        failed_run.refresh_from_db()
+        self.assertEqual(failed_run.rows, 10)
+        resumed_run.refresh_from_db()
+        self.assertEqual(resumed_run.status, JobRunStatus.SUCCEEDED)
+        self.assertEqual(resumed_run.rows, 20)
+        self.assertEqual(fresh_run.cursor, "20")
+
+    def test_interrupted_runs_are_marked_failed(self):
+        interrupted_run = JobRun.objects.start("test_job")
+        interrupted_run.checkpoint(5)
+
+        with patch.dict(JOBS, {"test_job": Job(lambda run: run.cursor, True)}):
+            run = run_job("test_job")
+
+        interrupted_run.refresh_from_db()
+        self.assertEqual(interrupted_run.status, JobRunStatus.FAILED)
+        self.assertEqual(interrupted_run.error, "Interrupted")
+        self.assertEqual(run.cursor, "5")
+
+
+class ResumeCustomerDataRemovalTestCase(TestCase):
+    def setUp(self):
+        with freeze_time(timezone.make_aware(datetime(2019, 6, 1))):
+            CustomerFactory.create_batch(3)
+
+    def test_removal_resumes_after_failure(self):
+        remove_customers_data = customer_data.remove_customers_data
+        calls = []
+
+        def fail_on_second_chunk(customer_ids):
+            calls.append(customer_ids)
+            if len(calls) == 2:
+                raise Exception("Removal failed")
+            return remove_customers_data(customer_ids)
+
+        remove_in_chunks_of_one = partial(
+            customer_data.remove_obsolete_customers_data, chunk_size=1
+        )
+        with freeze_time(timezone.make_aware(datetime(2022, 6, 1))), patch(
+            "parking_permits.cron.remove_obsolete_customers_data",
+            remove_in_chunks_of_one,
+        ), patch(
+            "parking_permits.customer_data.remove_customers_data",
+            fail_on_second_chunk,
+        ):
+            failed_run = run_job("automatic_remove_obsolete_customer_data")
+            resumed_run = run_job("automatic_remove_obsolete_customer_data")
+
+        self.assertEqual(failed_run.status, JobRunStatus.FAILED)
+        self.assertEqual(failed_run.cursor, str(calls[0][0]))
+        self.assertEqual(resumed_run.status, JobRunStatus.SUCCEEDED)
+        self.assertEqual(resumed_run.rows, 2)
+        self.assertFalse(Customer.objects.exists())
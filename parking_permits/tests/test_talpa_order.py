@@ -0,0 +1,65 @@
+import uuid
+from decimal import Decimal
+
+from django.test import TestCase
+
+from parking_permits.models import Order, ParkingZone
+from parking_permits.talpa.order import TalpaOrderManager
+from parking_permits.tests.factories import ParkingZoneFactory
+from parking_permits.tests.factories.order import OrderFactory, OrderItemFactory
+from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.product import ProductFactory
+
+
+class TalpaOrderDataTestCase(TestCase):
+    def setUp(self):
+        zone = ParkingZoneFactory()
+        product = ProductFactory(zone=zone)
+        order = OrderFactory()
+        for _ in range(2):
+            permit = ParkingPermitFactory(customer=order.customer, parking_zone=zone)
+            OrderItemFactory.create_batch(
+                5,
+                order=order,
+                product=product,
+                permit=permit,
+                payment_unit_price=Decimal(30),
+                vat=Decimal("0.24"),
+                quantity=2,
+            )
+        self.order_id = order.id
+        # fill the zone record cache used for the product names
+        ParkingZone.objects.get_record(zone.id)
+
+    def test_order_data_is_built_with_fixed_number_of_queries(self):
+        order = Order.objects.get(id=self.order_id)
+        with self.assertNumQueries(2):
+            data = TalpaOrderManager._create_order_data(order)
+        self.assertEqual(len(data["items"]), 10)
+
+    def test_order_data_totals(self):
+        order = Order.objects.get(id=self.order_id)
+        data = TalpaOrderManager._create_order_data(order)
+        self.assertAlmostEqual(data["priceTotal"], float(order.total_payment_price))
+        self.assertAlmostEqual(data["priceVat"], float(order.total_payment_price_vat))
+        self.assertAlmostEqual(data["priceNet"], float(order.total_payment_price_net))
+
+    def test_order_item_ids_are_updated_in_bulk(self):
+        order = Order.objects.get(id=self.order_id)
+        order_items = list(order.order_items.all())
+        response_items = [
+            {
+                "orderItemId": str(uuid.uuid4()),
+                "meta": [{"key": "sourceOrderItemId", "value": str(item.id)}],
+            }
+            for item in order_items[1:]
+        ]
+        with self.assertNumQueries(2):
+            TalpaOrderManager._update_order_item_ids(order, response_items)
+
+        self.assertEqual(
+            order.order_items.filter(talpa_order_item_id__isnull=False).count(),
+            len(order_items) - 1,
+        )
+        order_items[0].refresh_from_db()
+        self.assertIsNone(order_items[0].talpa_order_item_id)
@@ -2,7 +2,7 @@ from datetime import date
 
 from django.test import TestCase
 
-from parking_permits.models import ParkingPermit
+from parking_permits.models import Customer, ParkingPermit
 from parking_permits.models.parking_permit import ParkingPermitStatus
 from parking_permits.tests.factories.customer import CustomerFactory
 from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
@@ -12,6 +12,8 @@ from parking_permits.utils import (
     diff_months_ceil,
     diff_months_floor,
     find_next_date,
+    get_hashed_cache_key,
+    get_serialization_lookups,
 )
 
 
@@ -140,3 +142,31 @@ class FindNextDateTestCase(TestCase):
         self.assertEqual(find_next_date(date(2021, 1, 10), 10), date(2021, 1, 10))
         self.assertEqual(find_next_date(date(2021, 1, 10), 20), date(2021, 1, 20))
         self.assertEqual(find_next_date(date(2021, 2, 10), 31), date(2021, 2, 28))
+
+
+class GetSerializationLookupsTestCase(TestCase):
+    def test_customer_serialization_lookups(self):
+        select_related, prefetch_related = get_serialization_lookups(Customer)
+        self.assertEqual(select_related, ["primary_address", "other_address"])
+        self.assertEqual(
+            prefetch_related,
+            [
+                "orders",
+                "orders__order_items",
+                "orders__order_items__product",
+                "permits",
+                "permits__vehicle",
+            ],
+        )
+
+
+class GetHashedCacheKeyTestCase(TestCase):
+    def test_key_is_a_plain_digest(self):
+        key = get_hashed_cache_key("kmo-address", "Mannerheimintie Pohjoinen:5")
+        self.assertTrue(key.startswith("kmo-address:"))
+        self.assertTrue(key.isascii())
+        self.assertNotIn(" ", key)
+        self.assertNotIn("Mannerheimintie", key)
+        self.assertEqual(
+            key, get_hashed_cache_key("kmo-address", "Mannerheimintie Pohjoinen:5")
+        )
@@ -1,4 +1,5 @@
 import datetime
+from decimal import Decimal
 
 import requests_mock
 from django.conf import settings
@@ -9,11 +10,13 @@ from helusers.settings import api_token_auth_settings
 from jose import jwt
 from rest_framework.test import APIClient, APITestCase
 
+from parking_permits.models import OutboxEvent, PermitMonthlyPrice, TalpaOrderEvent
 from parking_permits.models.order import OrderStatus
 from parking_permits.models.parking_permit import ParkingPermit, ParkingPermitStatus
 from parking_permits.tests.factories.customer import CustomerFactory
 from parking_permits.tests.factories.order import OrderFactory
 from parking_permits.tests.factories.parking_permit import ParkingPermitFactory
+from parking_permits.tests.factories.product import ProductFactory
 from users.tests.factories.user import UserFactory
 
 from ..models import Customer
@@ -21,6 +24,30 @@ from ..models.common import SourceSystem
 from .keys import rsa_key
 
 
+class ResolvePriceViewTestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    @freeze_time("2021-11-15")
+    def test_resolve_price_should_return_stored_monthly_price(self):
+        permit = ParkingPermitFactory()
+        PermitMonthlyPrice.objects.create(
+            permit=permit,
+            month=datetime.date(2021, 11, 1),
+            product=ProductFactory(zone=permit.parking_zone),
+            unit_price=Decimal(30),
+            vat=Decimal("0.24"),
+            is_low_emission=False,
+            is_secondary_vehicle=False,
+        )
+        url = reverse("parking_permits:talpa-price")
+        data = {"orderItem": {"meta": [{"key": "permitId", "value": str(permit.id)}]}}
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["priceGross"], 30.0)
+        self.assertEqual(response.data["vatPercentage"], 24.0)
+
+
 class OrderViewTestCase(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -33,6 +60,13 @@ class OrderViewTestCase(APITestCase):
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, 400)
 
+    def test_order_view_should_return_bad_request_if_event_type_missing(self):
+        url = reverse("parking_permits:order-notify")
+        data = {"orderId": "D86CA61D-97E9-410A-A1E3-4894873B1B35"}
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(TalpaOrderEvent.objects.exists())
+
     @override_settings(DEBUG=True)
     def test_order_view_should_update_order_and_permits_status(self):
         talpa_order_id = "D86CA61D-97E9-410A-A1E3-4894873B1B35"
@@ -54,6 +88,23 @@ class OrderViewTestCase(APITestCase):
         self.assertEqual(permit_1.status, ParkingPermitStatus.VALID)
         self.assertEqual(permit_1.status, ParkingPermitStatus.VALID)
 
+    @override_settings(DEBUG=False)
+    def test_order_view_should_process_duplicate_events_once(self):
+        talpa_order_id = "D86CA61D-97E9-410A-A1E3-4894873B1B35"
+        order = OrderFactory(talpa_order_id=talpa_order_id, status=OrderStatus.DRAFT)
+        permit = ParkingPermitFactory(
+            order=order, status=ParkingPermitStatus.PAYMENT_IN_PROGRESS
+        )
+        url = reverse("parking_permits:order-notify")
+        data = {"eventType": "PAYMENT_PAID", "orderId": talpa_order_id}
+        self.client.post(url, data)
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        permit.refresh_from_db()
+        self.assertEqual(permit.status, ParkingPermitStatus.VALID)
+        self.assertEqual(OutboxEvent.objects.filter(permit=permit).count(), 1)
+        self.assertEqual(TalpaOrderEvent.objects.count(), 1)
+
 
 @override_settings(
     OIDC_API_TOKEN_AUTH={
@@ -1,12 +1,23 @@
+import base64
 import calendar
+import hashlib
+import hmac
+import json
+import logging
 import operator
 from functools import reduce
+from itertools import islice
 
+from cryptography.fernet import Fernet, InvalidToken
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import Q
 from django.utils import timezone
 from pytz import utc
 
+logger = logging.getLogger("db")
+
 
 def apply_ordering(queryset, order_by):
     fields = order_by["order_fields"]
@@ -80,3 +91,84 @@ def date_time_to_utc(dt):
     return (
         dt.replace(microsecond=0).astimezone(utc).replace(tzinfo=None).isoformat() + "Z"
     )
+
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most the given size
+
+    The iterable is consumed lazily, so it can be used for streams
+    and query set iterators that do not fit in memory.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_serialization_lookups(model):
+    """Return the lookups loading the relations that serialization follows
+
+    The relations are collected from the serialize_fields of the model and
+    of the related models recursively. The relations reached only through
+    foreign keys and one-to-one relations can be joined with
+    select_related, the rest are returned for prefetch_related.
+
+    Returns:
+        A tuple of the select_related and prefetch_related lookups.
+    """
+    select_related = []
+    prefetch_related = []
+
+    def collect(model, prefix, to_many):
+        for serialize_field in getattr(model, "serialize_fields", ()):
+            name = serialize_field["name"]
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # e.g. a property
+                continue
+            if not field.is_relation:
+                continue
+            lookup = f"{prefix}{name}"
+            is_to_many = to_many or field.one_to_many or field.many_to_many
+            if is_to_many:
+                prefetch_related.append(lookup)
+            else:
+                select_related.append(lookup)
+            collect(field.related_model, f"{lookup}__", is_to_many)
+
+    collect(model, "", False)
+    return select_related, prefetch_related
+
+
+def get_hashed_cache_key(prefix, value):
+    """Return a cache key that is safe for any value and does not reveal it"""
+    digest = hmac.new(
+        settings.SECRET_KEY.encode("utf-8"), value.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def _get_cache_fernet():
+    key = hashlib.sha256(settings.SECRET_KEY.encode("utf-8")).digest()
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def encrypt_cache_data(data):
+    """Return the data as an encrypted token, for caching personal data"""
+    return _get_cache_fernet().encrypt(json.dumps(data).encode("utf-8"))
+
+
+def decrypt_cache_data(token):
+    """Return the data of a token from encrypt_cache_data
+
+    None is returned if the token cannot be decrypted, e.g. after the
+    secret key has changed.
+    """
+    try:
+        return json.loads(_get_cache_fernet().decrypt(token))
+    except InvalidToken:
+        logger.warning("Cannot decrypt cached data")
+        return None
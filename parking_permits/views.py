@@ -1,9 +1,11 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, connections, transaction
 from django.http import Http404
+from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from helsinki_gdpr.views import DeletionNotAllowed, DryRunSerializer, GDPRAPIView
@@ -11,10 +13,20 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Customer, Order
+from .customer_data import remove_customers_data
+from .models import (
+    Customer,
+    Order,
+    OutboxEvent,
+    PermitEvent,
+    PermitMonthlyPrice,
+    TalpaOrderEvent,
+)
 from .models.common import SourceSystem
 from .models.order import OrderStatus
+from .models.outbox import OutboxEventType
 from .models.parking_permit import ParkingPermit, ParkingPermitStatus
+from .models.permit_event import PermitEventType
 from .serializers import (
     MessageResponseSerializer,
     OrderSerializer,
@@ -25,10 +37,23 @@ from .serializers import (
     TalpaPayloadSerializer,
 )
 from .services import talpa
+from .services.traficom import Traficom
 
 logger = logging.getLogger("db")
 
 
+def run_in_worker(func, *args):
+    """Run the function in a worker thread
+
+    The function may use the database, e.g. through a database cache, and
+    the connection of the worker thread is closed when it is done.
+    """
+    try:
+        return func(*args)
+    finally:
+        connections.close_all()
+
+
 class TalpaResolveAvailability(APIView):
     @swagger_auto_schema(
         operation_description="Resolve product availability.",
@@ -76,27 +101,21 @@ class TalpaResolvePrice(APIView):
             )
 
         try:
-            permit = ParkingPermit.objects.get(pk=permit_id)
-            products_with_quantity = permit.get_products_with_quantities()
-            product, quantity, date_range = products_with_quantity[0]
-            price = product.get_modified_unit_price(
-                permit.vehicle.is_low_emission, permit.is_secondary_vehicle
-            )
-            vat = product.vat
-            price_vat = price * vat
+            month = timezone.localdate().replace(day=1)
+            permit_price = PermitMonthlyPrice.objects.get_for_month(permit_id, month)
         except Exception as e:
             logger.error(f"Resolve price error = {str(e)}")
             return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         response = talpa.snake_to_camel_dict(
             {
-                "row_price_net": float(price - price_vat),
-                "row_price_vat": float(price_vat),
-                "row_price_total": float(price),
-                "price_net": float(price - price_vat),
-                "price_vat": float(price_vat),
-                "price_gross": float(price),
-                "vat_percentage": float(product.vat_percentage),
+                "row_price_net": float(permit_price.price_net),
+                "row_price_vat": float(permit_price.price_vat),
+                "row_price_total": float(permit_price.unit_price),
+                "price_net": float(permit_price.price_net),
+                "price_vat": float(permit_price.price_vat),
+                "price_gross": float(permit_price.unit_price),
+                "vat_percentage": float(permit_price.vat_percentage),
             }
         )
         logger.info(f"Resolve price response = {json.dumps(response)}")
@@ -123,10 +142,35 @@ class TalpaResolveRightOfPurchase(APIView):
         user_id = request.data.get("userId")
 
         try:
-            permit = ParkingPermit.objects.get(pk=permit_id)
+            permit = ParkingPermit.objects.select_related("customer", "vehicle").get(
+                pk=permit_id
+            )
             customer = permit.customer
-            customer.fetch_driving_licence_detail()
-            vehicle = customer.fetch_vehicle_detail(permit.vehicle.registration_number)
+            traficom = Traficom()
+            # the Traficom lookups run in parallel, and the results are
+            # saved afterwards on the request thread
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                licence_future = executor.submit(
+                    run_in_worker,
+                    traficom.get_driving_licence_details,
+                    customer.national_id_number,
+                )
+                vehicle_future = executor.submit(
+                    run_in_worker,
+                    traficom.get_vehicle_details,
+                    permit.vehicle.registration_number,
+                )
+                licence_details = licence_future.result()
+                vehicle_details = vehicle_future.result()
+            customer.update_driving_licence(
+                {
+                    "driving_classes": traficom.get_driving_classes(
+                        licence_details["categories"]
+                    ),
+                    "issue_date": licence_details["issue_date"],
+                }
+            )
+            vehicle = traficom.save_vehicle_details(vehicle_details)
             is_user_of_vehicle = customer.is_user_of_vehicle(vehicle)
             has_valid_driving_licence = customer.has_valid_driving_licence_for_vehicle(
                 vehicle
@@ -167,7 +211,6 @@ class OrderView(APIView):
         },
         tags=["Order"],
     )
-    @transaction.atomic
     def post(self, request, format=None):
         logger.info(f"Order received. Data = {json.dumps(request.data)}")
         talpa_order_id = request.data.get("orderId")
@@ -175,25 +218,60 @@ class OrderView(APIView):
         if not talpa_order_id:
             logger.error("Talpa order id is missing from request data")
             return Response({"message": "No order id is provided"}, status=400)
+        if not event_type:
+            logger.error("Event type is missing from request data")
+            return Response({"message": "No event type is provided"}, status=400)
+
+        events = TalpaOrderEvent.objects.filter(
+            talpa_order_id=talpa_order_id, event_type=event_type
+        )
+        if events.exists():
+            logger.info(f"Duplicate {event_type} for Talpa order {talpa_order_id}")
+            return Response({"message": "Order received"}, status=200)
+
+        with transaction.atomic():
+            try:
+                # a concurrent delivery of the same event waits here until
+                # the first one is committed and then fails on the unique key
+                with transaction.atomic():
+                    TalpaOrderEvent.objects.create(
+                        talpa_order_id=talpa_order_id, event_type=event_type
+                    )
+            except IntegrityError:
+                logger.info(f"Duplicate {event_type} for Talpa order {talpa_order_id}")
+                return Response({"message": "Order received"}, status=200)
+
+            if event_type == "PAYMENT_PAID":
+                self._confirm_order(talpa_order_id)
 
-        if event_type == "PAYMENT_PAID":
-            order = Order.objects.get(talpa_order_id=talpa_order_id)
-            order.status = OrderStatus.CONFIRMED
-            order.save()
-            for permit in order.permits.all():
-                permit.status = ParkingPermitStatus.VALID
-                permit.save()
-                if not settings.DEBUG:
-                    permit.create_parkkihubi_permit()
-
-        logger.info(f"{order} is confirmed and order permits are set to VALID ")
         return Response({"message": "Order received"}, status=200)
 
+    def _confirm_order(self, talpa_order_id):
+        order = Order.objects.get(talpa_order_id=talpa_order_id)
+        order.status = OrderStatus.CONFIRMED
+        order.save(update_fields=["status", "modified_at"])
+        permit_ids = list(order.permits.values_list("id", flat=True))
+        ParkingPermit.objects.filter(id__in=permit_ids).update(
+            status=ParkingPermitStatus.VALID, modified_at=timezone.now()
+        )
+        PermitEvent.objects.record_many(PermitEventType.PAID, permit_ids)
+        if not settings.DEBUG:
+            # delivered by the outbox worker after the commit
+            OutboxEvent.objects.enqueue_many(
+                OutboxEventType.PARKKIHUBI_CREATE_PERMIT, permit_ids
+            )
+        logger.info(f"{order} is confirmed and order permits are set to VALID")
+
 
 class ParkingPermitsGDPRAPIView(GDPRAPIView):
+    def get_queryset(self):
+        if self.request.method == "GET":
+            return Customer.objects.for_serialization()
+        return Customer.objects.all()
+
     def get_object(self) -> Customer:
         try:
-            customer = Customer.objects.get(
+            customer = self.get_queryset().get(
                 source_system=SourceSystem.HELSINKI_PROFILE, source_id=self.kwargs["id"]
             )
         except Customer.DoesNotExist:
@@ -206,13 +284,14 @@ class ParkingPermitsGDPRAPIView(GDPRAPIView):
         customer = self.get_object()
         if not customer.can_be_deleted:
             raise DeletionNotAllowed()
-        customer.delete_all_data()
+        return remove_customers_data([customer.id])
 
     def delete(self, request, *args, **kwargs):
         dry_run_serializer = DryRunSerializer(data=request.data)
         dry_run_serializer.is_valid(raise_exception=True)
         with transaction.atomic():
-            self._delete()
+            deleted = self._delete()
             if dry_run_serializer.data["dry_run"]:
+                logger.info(f"GDPR deletion dry run, rows to delete: {deleted}")
                 transaction.set_rollback(True)
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -10,6 +10,7 @@ env = environ.Env(
     DJANGO_SECRET_KEY=(str, ""),
     ALLOWED_HOSTS=(list, ["*"]),
     DATABASE_URL=(str, "sqlite:////tmp/my-tmp-sqlite.db"),
+    CACHE_URL=(str, "locmemcache://"),
     TALPA_PRODUCT_EXPERIENCE_API=(str, ""),
     TALPA_ORDER_EXPERIENCE_API=(str, ""),
     OPEN_CITY_PROFILE_GRAPHQL_API=(str, "https://profile-api.test.hel.ninja/graphql/"),
@@ -21,13 +22,19 @@ env = environ.Env(
     ALLOWED_ADMIN_AD_GROUPS=(list, None),
     TALPA_API_KEY=(str, ""),
     TALPA_NAMESPACE=(str, "asukaspysakointi"),
+    TALPA_PRODUCT_REGISTRATION_WORKERS=(int, 4),
+    TALPA_PRODUCT_REGISTRATION_RATE=(float, 5),
     GDPR_API_QUERY_SCOPE=(str, ""),
     GDPR_API_DELETE_SCOPE=(str, ""),
     PARKKIHUBI_DOMAIN=(str, ""),
     PARKKIHUBI_PERMIT_SERIES=(str, ""),
     PARKKIHUBI_TOKEN=(str, ""),
     PARKKIHUBI_OPERATOR_ENDPOINT=(str, ""),
+    PARKKIHUBI_RECONCILIATION_WORKERS=(int, 8),
+    PARKKIHUBI_RECONCILIATION_RATE=(float, 20),
     TRAFICOM_ENDPOINT=(str, ""),
+    PERMIT_EVENT_RETENTION_DAYS=(int, 180),
+    JOB_RUN_RETENTION_DAYS=(int, 90),
     TRAFICOM_USERNAME=(str, ""),
     TRAFICOM_PASSWORD=(str, ""),
     TRAFICOM_SANOMA_TYYPPI=(str, ""),
@@ -42,6 +49,16 @@ env = environ.Env(
     DVV_PASSWORD=(str, ""),
     DVV_SOSONIMI=(str, ""),
     DVV_LOPPUKAYTTAJA=(str, ""),
+    DVV_CACHE_TIMEOUT=(int, 300),
+    KMO_ADDRESS_CACHE_TIMEOUT=(int, 60 * 60 * 24),
+    TRAFICOM_CACHE_TIMEOUT=(int, 60 * 15),
+    INTEGRATION_CONNECT_TIMEOUT=(float, 5),
+    INTEGRATION_READ_TIMEOUT=(float, 30),
+    INTEGRATION_MAX_RETRIES=(int, 3),
+    INTEGRATION_RETRY_BACKOFF=(float, 0.5),
+    INTEGRATION_POOL_SIZE=(int, 10),
+    INTEGRATION_CIRCUIT_FAILURE_THRESHOLD=(int, 5),
+    INTEGRATION_CIRCUIT_RESET_TIMEOUT=(float, 30),
 )
 
 if path.exists(".env"):
@@ -119,6 +136,8 @@ WSGI_APPLICATION = "project.wsgi.application"
 
 DATABASES = {"default": dj_database_url.parse(env("DATABASE_URL"))}
 
+CACHES = {"default": env.cache("CACHE_URL")}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -157,12 +176,19 @@ NAMESPACE = env("TALPA_NAMESPACE")
 TALPA_PRODUCT_EXPERIENCE_API = env("TALPA_PRODUCT_EXPERIENCE_API")
 TALPA_ORDER_EXPERIENCE_API = env("TALPA_ORDER_EXPERIENCE_API")
 TALPA_API_KEY = env("TALPA_API_KEY")
+# concurrent requests and requests per second used when the products
+# missing a Talpa product id are registered in bulk
+TALPA_PRODUCT_REGISTRATION_WORKERS = env("TALPA_PRODUCT_REGISTRATION_WORKERS")
+TALPA_PRODUCT_REGISTRATION_RATE = env("TALPA_PRODUCT_REGISTRATION_RATE")
 
 # PARKKIHUBI
 PARKKIHUBI_DOMAIN = env("PARKKIHUBI_DOMAIN")
 PARKKIHUBI_PERMIT_SERIES = env("PARKKIHUBI_PERMIT_SERIES")
 PARKKIHUBI_TOKEN = env("PARKKIHUBI_TOKEN")
 PARKKIHUBI_OPERATOR_ENDPOINT = env("PARKKIHUBI_OPERATOR_ENDPOINT")
+# concurrent requests and requests per second of the nightly reconciliation
+PARKKIHUBI_RECONCILIATION_WORKERS = env("PARKKIHUBI_RECONCILIATION_WORKERS")
+PARKKIHUBI_RECONCILIATION_RATE = env("PARKKIHUBI_RECONCILIATION_RATE")
 
 # TRAFICOM
 TRAFICOM_ENDPOINT = env("TRAFICOM_ENDPOINT")
@@ -219,10 +245,28 @@ LOGGING = {
     },
 }
 
+# Schedules of the jobs in parking_permits.scheduler.JOBS. The jobs are run
+# either by the crontab installed with django-crontab or by the
+# run_scheduler command, not both.
+SCHEDULED_JOBS = [
+    ("*/5 * * * *", "automatic_expiration_of_permits"),
+    ("59 23 * * *", "automatic_remove_obsolete_customer_data"),
+    ("*/15 * * * *", "refresh_statistics"),
+    ("30 01 * * *", "prebill_open_ended_permits"),
+    ("* * * * *", "deliver_outbox_events"),
+    ("45 02 * * *", "reconcile_parkkihubi_permits"),
+    ("15 04 * * *", "prune_permit_events"),
+    ("30 04 * * *", "prune_job_runs"),
+]
 CRONJOBS = [
-    ("22 00 * * *", "parking_permits.cron.automatic_expiration_of_permits"),
-    ("59 23 * * *", "parking_permits.cron.automatic_remove_obsolete_customer_data"),
+    (schedule, "parking_permits.scheduler.run_job", [job_name])
+    for schedule, job_name in SCHEDULED_JOBS
 ]
+# Days the job run history is retained
+JOB_RUN_RETENTION_DAYS = env("JOB_RUN_RETENTION_DAYS")
+
+# Days the permit change feed is retained for its consumers
+PERMIT_EVENT_RETENTION_DAYS = env("PERMIT_EVENT_RETENTION_DAYS")
 
 # GDPR API
 GDPR_API_MODEL = "parking_permits.Customer"
@@ -236,3 +280,22 @@ DVV_USERNAME = env("DVV_USERNAME")
 DVV_PASSWORD = env("DVV_PASSWORD")
 DVV_SOSONIMI = env("DVV_SOSONIMI")
 DVV_LOPPUKAYTTAJA = env("DVV_LOPPUKAYTTAJA")
+# DVV person data is cached encrypted for a short while to avoid
+# repeated lookups while the permit form is being filled in
+DVV_CACHE_TIMEOUT = env("DVV_CACHE_TIMEOUT")
+KMO_ADDRESS_CACHE_TIMEOUT = env("KMO_ADDRESS_CACHE_TIMEOUT")
+# Traficom vehicle and driving licence data fetched when the permit is
+# created is reused e.g. in the right of purchase check at checkout
+TRAFICOM_CACHE_TIMEOUT = env("TRAFICOM_CACHE_TIMEOUT")
+
+# Outbound integrations (Talpa, Parkkihubi, Traficom, DVV, KMO, Helsinki profile)
+INTEGRATION_CONNECT_TIMEOUT = env("INTEGRATION_CONNECT_TIMEOUT")
+INTEGRATION_READ_TIMEOUT = env("INTEGRATION_READ_TIMEOUT")
+# retries are only done for idempotent methods
+INTEGRATION_MAX_RETRIES = env("INTEGRATION_MAX_RETRIES")
+INTEGRATION_RETRY_BACKOFF = env("INTEGRATION_RETRY_BACKOFF")
+INTEGRATION_POOL_SIZE = env("INTEGRATION_POOL_SIZE")
+# consecutive failures after which calls to an upstream are stopped
+# for the reset timeout (in seconds)
+INTEGRATION_CIRCUIT_FAILURE_THRESHOLD = env("INTEGRATION_CIRCUIT_FAILURE_THRESHOLD")
+INTEGRATION_CIRCUIT_RESET_TIMEOUT = env("INTEGRATION_CIRCUIT_RESET_TIMEOUT")